@@ -6,11 +6,30 @@
     PyScaffold helps you to put up the scaffold of your new Python project.
     Learn more under: https://pyscaffold.org/
 """
+import importlib.util
+from pathlib import Path
+
 from setuptools import setup
+from setuptools.command.build_py import build_py
+
+
+class BuildPyWithTemplates(build_py):
+    """Also write the Vue templates into one bundle, see hubbleds.template_bundle"""
+
+    def run(self):
+        super().run()
+        # Load the module from its file, as importing hubbleds needs its dependencies
+        source = Path(__file__).parent / "src" / "hubbleds" / "template_bundle.py"
+        spec = importlib.util.spec_from_file_location("_template_bundle", source)
+        template_bundle = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(template_bundle)
+        template_bundle.build_bundle(Path(self.build_lib) / "hubbleds")
+
 
 if __name__ == "__main__":
     try:
-        setup(use_scm_version={"version_scheme": "no-guess-dev"})
+        setup(use_scm_version={"version_scheme": "no-guess-dev"},
+              cmdclass={"build_py": BuildPyWithTemplates})
     except:  # noqa
         print(
             "\n\nAn error occurred while building the project, "
@@ -1,4 +1,3 @@
-import ipyvue
 from pathlib import Path
 from cosmicds import STORY_PATHS
 from .story import *
@@ -6,15 +5,10 @@ from .stages import *
 from .tools import *
 from .viewers import *
 from .components import *
+from .template_bundle import register_components
 
 
 STORY_PATHS['hubble'] = Path(__file__).parent / "HubbleDS.ipynb"
 
 # Register any custom Vue components
-comp_dir = Path(__file__).parent / "components" / "generic_state_components"
-
-for comp_path in comp_dir.rglob("*.vue"):
-    if comp_path.is_file:
-        ipyvue.register_component_from_string(
-            name=comp_path.stem.replace('_', '-'),
-            value=comp_path.read_text())
+register_components(Path(__file__).parent / "components" / "generic_state_components")
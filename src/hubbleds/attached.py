@@ -0,0 +1,17 @@
+__all__ = ['attached']
+
+
+def attached(owner, attribute, factory):
+    """
+    The object kept on ``owner`` as ``attribute``, made with
+    ``factory(owner)`` the first time it's asked for.
+
+    Keeping a per-session helper on the hub, figure or state it serves,
+    rather than in a module-level registry, means it is freed along with
+    its owner.
+    """
+    value = getattr(owner, attribute, None)
+    if value is None:
+        value = factory(owner)
+        setattr(owner, attribute, value)
+    return value
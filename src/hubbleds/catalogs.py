@@ -0,0 +1,130 @@
+"""
+The immutable catalogs every Hubble's Law session starts from.
+
+Each catalog is loaded once per process and kept as a dict of read-only
+column arrays, which each story wraps in its own glue `~glue.core.data.Data`.
+Numeric columns are used as they are rather than copied, so sessions in one
+process share them, and so do kernels forked from a process that loaded the
+catalogs beforehand (see `hubbleds.warm_start`). Since the arrays are never
+written to, the pages holding them stay shared after a fork.
+"""
+
+from pathlib import Path
+from threading import Lock
+
+from glue.core.data_factories import load_data
+import numpy as np
+from numpy.random import Generator, PCG64, SeedSequence
+import requests
+
+from .data_management import *
+from .utils import hubble_api_url
+
+__all__ = ['CSV_CATALOGS', 'catalog', 'csv_catalog', 'example_galaxy',
+           'example_galaxy_seed_data', 'preload_catalogs', 'sdss_galaxies']
+
+DATA_DIR = Path(__file__).parent / "data"
+SIMULATION_OUTPUT_DIR = DATA_DIR / "hubble_simulation" / "output"
+
+# Simulated measurements and summaries, and the historical datasets
+CSV_CATALOGS = [
+    f"{dataset}.csv" for dataset in (
+        DATA_DIR / "galaxy_data",
+        DATA_DIR / "Hubble 1929-Table 1",
+        DATA_DIR / "HSTkey2001",
+        DATA_DIR / "dummy_student_data",
+        SIMULATION_OUTPUT_DIR / "HubbleData_ClassSample",
+        SIMULATION_OUTPUT_DIR / "HubbleData_All",
+        SIMULATION_OUTPUT_DIR / "HubbleSummary_ClassSample",
+        SIMULATION_OUTPUT_DIR / "HubbleSummary_Students",
+        SIMULATION_OUTPUT_DIR / "HubbleSummary_Classes",
+    )
+]
+
+_catalogs = {}
+_lock = Lock()
+
+
+def catalog(key, loader):
+    """
+    The catalog stored under ``key``, loading it with ``loader()`` the
+    first time. The loader returns a dict of columns, which are made into
+    read-only arrays.
+    """
+    with _lock:
+        columns = _catalogs.get(key, None)
+        if columns is None:
+            columns = {}
+            for name, values in loader().items():
+                array = np.asarray(values)
+                array.setflags(write=False)
+                columns[name] = array
+            _catalogs[key] = columns
+        return columns
+
+
+def csv_catalog(path):
+    """The columns of a CSV file, as glue's loader reads them"""
+    def load():
+        data = load_data(str(path))
+        return {cid.label: data[cid] for cid in data.main_components}
+    return catalog(str(path), load)
+
+
+def sdss_galaxies(name_ext=".fits"):
+    """
+    The spiral galaxies students can choose from, with ``name_ext`` cut
+    from the end of their names
+    """
+    def load():
+        galaxies = requests.get(f"{hubble_api_url()}/galaxies?types=Sp").json()
+        galaxies_dict = {k: [x[k] for x in galaxies] for k in galaxies[0]}
+        galaxies_dict["name"] = [x[:len(x) - len(name_ext)] for x in galaxies_dict["name"]]
+        return galaxies_dict
+    return catalog((SDSS_DATA_LABEL, name_ext), load)
+
+
+def example_galaxy():
+    """The galaxy that every student measures in the first stages"""
+    def load():
+        data = requests.get(f"{hubble_api_url()}/sample-galaxy").json()
+        data = {k: [data[k]] for k in data}
+        data['name'] = [name.replace('.fits', '') for name in data['name']]
+        return data
+    return catalog(EXAMPLE_GALAXY_DATA, load)
+
+
+def example_galaxy_seed_data():
+    """
+    Earlier students' measurements of the example galaxy. The same 40 pairs
+    of measurements are chosen every time.
+    """
+    def load():
+        seed_data = requests.get(f"{hubble_api_url()}/sample-measurements").json()
+        seed_data = {k: np.array([record[k] for record in seed_data]) for k in seed_data[0]}
+        good = seed_data[DB_VELOCITY_FIELD] != None
+
+        # Uncomment this and comment out next block to get all seed galaxies
+        # seed_data = {k: np.array(v)[good] for k,v in seed_data.items()}
+
+        # This block chooses a subset of size N from the seed data
+        seq = SeedSequence(42)
+        gen = Generator(PCG64(seq))
+        indices = np.arange(len(good))
+        indices = indices[1::2][:85] # we need to keep the first 85 so that it always selects the same galaxies "randomly"
+        random_subset = gen.choice(indices[good[1::2][:85]], size=40, replace=False)
+        random_subset = np.ravel(np.column_stack((random_subset, random_subset+1)))
+        seed_data = {k: np.array(v)[random_subset] for k, v in seed_data.items()}
+
+        seed_data[DB_VELOCITY_FIELD] = np.array(seed_data[DB_VELOCITY_FIELD], dtype=type(seed_data[DB_VELOCITY_FIELD][0]))
+        return seed_data
+    return catalog(EXAMPLE_GALAXY_SEED_DATA, load)
+
+
+def preload_catalogs():
+    """Load every catalog that isn't loaded yet"""
+    for path in CSV_CATALOGS:
+        csv_catalog(path)
+    sdss_galaxies()
+    example_galaxy()
+    example_galaxy_seed_data()
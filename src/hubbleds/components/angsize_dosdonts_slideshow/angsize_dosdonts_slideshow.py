@@ -1,9 +1,10 @@
 import ipyvuetify as v
 from pathlib import Path
 from traitlets import Int, Bool, Unicode, List
-from cosmicds.utils import load_template
 from glue_jupyter.state_traitlets_helpers import GlueState
 
+from ...template_bundle import load_template
+
 
 # theme_colors()
 
@@ -1,9 +1,10 @@
 import ipyvuetify as v
-from cosmicds.utils import load_template
 from echo import add_callback
 from glue_jupyter.state_traitlets_helpers import GlueState
 from traitlets import Unicode
 
+from ...template_bundle import load_template
+
 
 class DistanceSidebar(v.VuetifyTemplate):
     template = load_template("distance_sidebar.vue", __file__,
@@ -1,14 +1,18 @@
-from datetime import datetime
+import asyncio
+import time
+from threading import Timer
 
 import astropy.units as u
 import ipyvue as v
 import requests
 from astropy.coordinates import Angle, SkyCoord
-from cosmicds.utils import RepeatedTimer, load_template, API_URL
+from cosmicds.utils import API_URL
 from ipywidgets import DOMWidget, widget_serialization
 from pywwt.jupyter import WWTJupyterWidget
 from traitlets import Instance, Bool, Float, Int, Unicode, observe, Dict
 
+from ...template_bundle import load_template
+from ...imagery_prefetch import ImageryLookahead, TileLoadTimings
 from ...utils import GALAXY_FOV, HUBBLE_ROUTE_PATH, angle_to_json, \
     angle_from_json
 
@@ -34,12 +38,15 @@ class DistanceTool(v.VueTemplate):
     ruler_click_count = Int().tag(sync=True)
     measurement_count = Int().tag(sync=True)
     galaxy_selected = Bool(False).tag(sync=True)
-    _ra = Angle(0 * u.deg)
-    _dec = Angle(0 * u.deg)
+    visible = Bool(True).tag(sync=True)
+    _ra = 0.0
+    _dec = 0.0
+    _fov = 60.0
     wwtStyle = Dict().tag(sync=True)
     reset_style = Bool(False).tag(sync=True)
 
     UPDATE_TIME = 1  # seconds
+    VIEW_TOLERANCE = 1e-5  # degrees
     START_COORDINATES = SkyCoord(180 * u.deg, 25 * u.deg, frame='icrs')
 
     def __init__(self, *args, **kwargs):
@@ -50,8 +57,11 @@ class DistanceTool(v.VueTemplate):
         self.angular_height = Angle(60, u.deg)
         self.widget._set_message_type_callback('wwt_view_state',
                                                self._handle_view_message)
-        self.last_update = datetime.now()
-        self._rt = RepeatedTimer(self.UPDATE_TIME, self._check_view_changing)
+        self._settle_handle = None
+        self._settle_deadline = 0
+        self._lookahead = None
+        self._lookahead_view = None
+        self._located_at = time.monotonic()
         self.update_text()
         super().__init__(*args, **kwargs)
 
@@ -72,14 +82,70 @@ class DistanceTool(v.VueTemplate):
         return int(s[:-2])  # Remove the 'px' from the end
 
     # We aren't always guaranteed to get an update from the WWT viewer
-    # so every second, if the view is marked as changing, 
-    # we check when the last update that we got is
-    # If it's more than a second old, mark the view as not changing
-    def _check_view_changing(self):
-        if self.view_changing:
-            delta = datetime.now() - self.last_update
-            if delta.total_seconds() >= self.UPDATE_TIME:
-                self.view_changing = False
+    # once it stops moving, so the view is marked as not changing
+    # once no change has been seen for UPDATE_TIME seconds
+    def _schedule_settle(self):
+        self._settle_deadline = time.monotonic() + self.UPDATE_TIME
+        if self._settle_handle is None:
+            self._call_settle(self.UPDATE_TIME)
+
+    def _call_settle(self, delay):
+        # Without a running event loop (e.g. outside of a kernel), fall back
+        # to a timer thread so that view_changing is still cleared
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._settle_handle = Timer(delay, self._settle)
+            self._settle_handle.daemon = True
+            self._settle_handle.start()
+        else:
+            self._settle_handle = loop.call_later(delay, self._settle)
+
+    def _settle(self):
+        remaining = self._settle_deadline - time.monotonic()
+        if remaining > 0:
+            self._call_settle(remaining)
+            return
+        self._settle_handle = None
+        self.view_changing = False
+
+    def _cancel_settle(self):
+        if self._settle_handle is not None:
+            self._settle_handle.cancel()
+            self._settle_handle = None
+
+    @observe('visible')
+    def _on_visible_changed(self, change):
+        if not change["new"]:
+            self._cancel_settle()
+            self.view_changing = False
+            if self._lookahead is not None:
+                self._lookahead_view = (self._ra, self._dec, self._fov)
+                self._lookahead.start()
+        elif self._lookahead is not None and self._lookahead.stop():
+            # Put back the view the student left
+            ra, dec, fov = self._lookahead_view
+            self.go_to_location(ra, dec, fov=fov * u.deg)
+
+    @property
+    def lookahead(self):
+        if self._lookahead is None:
+            self._lookahead = ImageryLookahead(self.widget, TileLoadTimings(TileLoadTimings.DEFAULT_PATH))
+            if not self.visible:
+                self._lookahead_view = (self._ra, self._dec, self._fov)
+                self._lookahead.start()
+        return self._lookahead
+
+    def warm_imagery(self, galaxies):
+        """
+        Queue the imagery around ``galaxies`` to be loaded, in order, the
+        next time the tool is out of sight
+        """
+        self.lookahead.warm(galaxies)
+
+    def record_load_failure(self, name):
+        """Record how long the student waited before flagging ``name``'s imagery"""
+        self.lookahead.timings.record(name, time.monotonic() - self._located_at)
 
     def vue_toggle_measuring(self, _args=None):
         self.measuring = not self.measuring
@@ -115,20 +181,33 @@ class DistanceTool(v.VueTemplate):
             self.fov_text = f"{s}\""
         self.update_text()
 
+    def _close(self, new, old, period=None):
+        """Whether two angles in degrees agree, modulo ``period`` if given"""
+        difference = new - old
+        if period is not None:
+            difference = (difference + period / 2) % period - period / 2
+        return abs(difference) <= self.VIEW_TOLERANCE
+
     def _handle_view_message(self, wwt, _updated):
-        fov = Angle(self.widget.get_fov())
+        fov = self.widget.get_fov().to_value(u.deg)
         center = self.widget.get_center()
-        ra = Angle(center.ra)
-        dec = Angle(center.dec)
-        changing = not u.allclose([fov, ra, dec],
-                                  [self.angular_height, self._ra, self._dec])
-        self.angular_height = fov
+        ra = center.ra.deg
+        dec = center.dec.deg
+        changing = not (self._close(fov, self._fov) and self._close(ra, self._ra, period=360)
+                        and self._close(dec, self._dec))
+        if fov != self._fov:
+            self.angular_height = Angle(fov, u.deg)
+        self._fov = fov
         self._ra = ra
         self._dec = dec
-        self.view_changing = changing
-        self.last_update = datetime.now()
+        self.view_changing = changing and self.visible
+        if self.view_changing:
+            self._schedule_settle()
+        else:
+            self._cancel_settle()
 
     def go_to_location(self, ra, dec, fov=GALAXY_FOV):
+        self._located_at = time.monotonic()
         coordinates = SkyCoord(ra * u.deg, dec * u.deg, frame='icrs')
         self.widget.center_on_coordinates(coordinates, fov=fov, instant=True)
     
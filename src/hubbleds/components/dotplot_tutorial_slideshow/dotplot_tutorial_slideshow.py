@@ -1,11 +1,13 @@
 import ipyvuetify as v
 from pathlib import Path
 from traitlets import Int, Bool, Unicode, List, Instance
-from cosmicds.utils import load_template, extend_tool
+from cosmicds.utils import extend_tool
 from glue_jupyter.state_traitlets_helpers import GlueState
 from ipywidgets import widget_serialization, DOMWidget
 from functools import partial
 
+from ...template_bundle import load_template
+
 
 # theme_colors()
 
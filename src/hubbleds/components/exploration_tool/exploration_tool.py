@@ -3,11 +3,13 @@ from datetime import datetime
 import astropy.units as u
 import ipyvue as v
 from astropy.coordinates import Angle
-from cosmicds.utils import RepeatedTimer, load_template
+from cosmicds.utils import RepeatedTimer
 from ipywidgets import DOMWidget, widget_serialization
 from pywwt.jupyter import WWTJupyterWidget
 from traitlets import Bool, Instance, Int
 
+from ...template_bundle import load_template
+
 
 class ExplorationTool(v.VueTemplate):
     template = load_template("exploration_tool.vue", __file__,
@@ -1,10 +1,11 @@
 import ipyvuetify as v
 from pathlib import Path
 from traitlets import Int, Bool, Unicode, List, Instance
-from cosmicds.utils import load_template
 from glue_jupyter.state_traitlets_helpers import GlueState
 from ipywidgets import widget_serialization, DOMWidget
 
+from ...template_bundle import load_template
+
 
 # theme_colors()
 
@@ -3,7 +3,8 @@ from echo.callback_container import CallbackContainer
 from numpy import where
 from traitlets import observe, Float, Int, List, Unicode
 
-from cosmicds.utils import load_template
+from ...template_bundle import load_template
+
 
 class IDSlider(VuetifyTemplate):
     template = load_template("id_slider.vue", __file__,
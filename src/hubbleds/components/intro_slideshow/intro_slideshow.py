@@ -1,9 +1,9 @@
 import astropy.units as u
 import ipyvuetify as v
 from astropy.coordinates import SkyCoord
-from cosmicds.utils import load_template
 from traitlets import Int, Bool, Unicode, Dict
 
+from ...template_bundle import load_template
 from ...components.exploration_tool import ExplorationTool
 from ...utils import GALAXY_FOV
 
@@ -3,16 +3,15 @@ import ipyvue as v
 import requests
 from astropy.coordinates import SkyCoord
 from astropy.table import Table
-from cosmicds.utils import API_URL
-from cosmicds.utils import load_template
 from glue_jupyter.state_traitlets_helpers import GlueState
 from ipywidgets import DOMWidget, widget_serialization
-from pandas import DataFrame, concat
 from pywwt.jupyter import WWTJupyterWidget
 from traitlets import Dict, Instance, Int, Bool, observe
 
+from ...template_bundle import load_template
 from ...utils import FULL_FOV, GALAXY_FOV
-from ...utils import HUBBLE_ROUTE_PATH
+from ...utils import hubble_api_url
+from ...wwt_layers import ColumnarBuffer, IncrementalTableLayer, ViewportCatalogLayer
 
 
 class SelectionTool(v.VueTemplate):
@@ -29,37 +28,48 @@ class SelectionTool(v.VueTemplate):
 
     UPDATE_TIME = 1  # seconds
     START_COORDINATES = SkyCoord(180 * u.deg, 25 * u.deg, frame='icrs')
+    START_FOV = 6 * u.arcmin
+    MAX_SHOWN_GALAXIES = 1500
 
     def __init__(self, data, *args, **kwargs):
         self.widget = WWTJupyterWidget(hide_all_chrome=True)
         self.widget.background = 'SDSS: Sloan Digital Sky Survey (Optical)'
         self.widget.foreground = 'SDSS: Sloan Digital Sky Survey (Optical)'
-        self.widget.center_on_coordinates(self.START_COORDINATES, fov= 6 * u.arcmin, #start in close enough to see galaxies
+        self.widget.center_on_coordinates(self.START_COORDINATES, fov=self.START_FOV, #start in close enough to see galaxies
                                           instant=False)
+        self._view = (self.START_COORDINATES.ra.deg, self.START_COORDINATES.dec.deg,
+                      self.START_FOV.to_value(u.deg))
+        self.widget._set_message_type_callback('wwt_view_state',
+                                               self._handle_view_message)
 
         df = data.to_dataframe()
         self.table = Table.from_pandas(df)
         self.motions_left = 2
         self.gals_max = kwargs.get("galaxies_max", 5)
         
-        self.sdss_layer = None
+        self.sdss_layer = ViewportCatalogLayer(self.widget, self.table,
+                                               max_sources=self.MAX_SHOWN_GALAXIES,
+                                               marker_type="gaussian",
+                                               size_scale=100, color="#00FF00")
         show_galaxy_layer = kwargs.get("show_galaxies", False)
         if show_galaxy_layer:
             self.show_galaxies()
 
-        self.selected_layer = None
-        self.selected_data = kwargs.get("selected_data", None)
-        if self.selected_data is None:
-            self.selected_data = DataFrame()
-        if self.selected_data.shape[0] > 0:
-            self._create_selected_layer()
+        # This will mix with #00FF00 above to make yellow
+        self.selected_layer = IncrementalTableLayer(self.widget, marker_type="gaussian",
+                                                    size_scale=100, color="#FF0000")
+        self._selected = ColumnarBuffer(capacity=self.gals_max)
+        self._selected_frame = None
+        selected_data = kwargs.get("selected_data", None)
+        if selected_data is not None:
+            self.selected_data = selected_data
         self.current_galaxy = {}
         self.candidate_galaxy = {}
         self._on_galaxy_selected = None
 
         def wwt_cb(wwt, updated):
             if ('most_recent_source' not in updated or
-                    self.selected_data.shape[0] >= self.gals_max):
+                    len(self._selected) >= self.gals_max):
                 return
 
             source = wwt.most_recent_source
@@ -75,11 +85,8 @@ class SelectionTool(v.VueTemplate):
             self.current_galaxy = galaxy
             self.candidate_galaxy = galaxy
 
-            if not self.selected_data.empty:
-                gal_names = [k for k in self.selected_data["name"]]
-
-                if self.current_galaxy["name"] in gal_names:
-                    self.candidate_galaxy = {}
+            if self._selected.index_of("name", self.current_galaxy["name"]) is not None:
+                self.candidate_galaxy = {}
 
             self.selected = True
 
@@ -88,15 +95,31 @@ class SelectionTool(v.VueTemplate):
         super().__init__(*args, **kwargs)
 
     def show_galaxies(self, show=True):
-        if show and self.sdss_layer is None:
-            layer = self.widget.layers.add_table_layer(self.table)
-            layer.marker_type = "gaussian"
-            layer.size_scale = 100
-            layer.color = "#00FF00"
-            self.sdss_layer = layer
+        if show and not self.sdss_layer.visible:
+            self.sdss_layer.show()
+            self.sdss_layer.update(*self._view)
         elif not show:
-            self.widget.layers.remove_layer(self.sdss_layer)
-            self.sdss_layer = None
+            self.sdss_layer.hide()
+
+    def _handle_view_message(self, wwt, _updated):
+        center = wwt.get_center()
+        self._view = (center.ra.deg, center.dec.deg, wwt.get_fov().to_value(u.deg))
+        self.sdss_layer.update(*self._view)
+
+    @property
+    def selected_data(self):
+        # The frame is rebuilt only after the selected galaxies change
+        version = self._selected.version
+        if self._selected_frame is None or self._selected_frame[0] != version:
+            self._selected_frame = (version, self._selected.to_dataframe())
+        return self._selected_frame[1]
+
+    @selected_data.setter
+    def selected_data(self, df):
+        self._selected = ColumnarBuffer.from_dataframe(df, capacity=self.gals_max)
+        self._selected_frame = None
+        self.selected_count = len(self._selected)
+        self.selected_layer.replace(self._selected.to_table())
 
     @property
     def on_galaxy_selected(self):
@@ -107,24 +130,13 @@ class SelectionTool(v.VueTemplate):
         self._on_galaxy_selected = cb
 
     def select_galaxy(self, galaxy):
-        galaxy_df = DataFrame({k: [v] for k, v in galaxy.items()})
-        self.selected_data = concat([self.selected_data, galaxy_df], ignore_index=True)
-        self.selected_count = self.selected_data.shape[0]
-        self._create_selected_layer()
+        self._selected.append(galaxy)
+        self.selected_count = len(self._selected)
+        self.selected_layer.append(self._selected.to_table(start=self.selected_count - 1))
         if self._on_galaxy_selected is not None:
             self._on_galaxy_selected(galaxy)
         self.selected = False
 
-    def _create_selected_layer(self):
-        self.table = Table.from_pandas(self.selected_data)
-        layer = self.widget.layers.add_table_layer(self.table)
-        layer.marker_type = "gaussian"
-        layer.size_scale = 100
-        layer.color = "#FF0000" # This will mix with #00FF00 above to make yellow
-        if self.selected_layer is not None:
-            self.widget.layers.remove_layer(self.selected_layer)
-        self.selected_layer = layer
-
     def vue_select_current_galaxy(self, _args=None):
         self.select_galaxy(self.current_galaxy)
         self.current_galaxy = {}
@@ -156,5 +168,5 @@ class SelectionTool(v.VueTemplate):
             if not name.endswith(".fits"):
                 name += ".fits"
             data = {"galaxy_name": name}
-        requests.put(f"{API_URL}/{HUBBLE_ROUTE_PATH}/mark-galaxy-bad",
+        requests.put(f"{hubble_api_url()}/mark-galaxy-bad",
                      json=data)
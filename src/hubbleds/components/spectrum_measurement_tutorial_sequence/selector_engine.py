@@ -0,0 +1,109 @@
+import asyncio
+
+import numpy as np
+
+from ...viewers.dotplot_binning import LinkedDotPlotBinning
+
+__all__ = ['SelectorEngine']
+
+
+class SelectorEngine:
+    """
+    Keeps the measuring lines of the tutorial's dot plots and spectrum
+    viewer in step with the cursor.
+
+    The bin edges of each dot plot are kept until its binning changes, so
+    placing a value in its bin is a lookup rather than a rebinning. Cursor
+    moves only record the latest position; the lines are updated at most
+    once per display frame, with each mark synced once.
+
+    Parameters
+    ----------
+    dotplots : list of viewers
+        The dot plot viewers, with x in velocity
+    spectrum_viewer : viewer
+        The spectrum viewer, with x in wavelength
+    v2w, w2v : callable
+        Conversions between velocity and wavelength
+    """
+
+    FRAME_TIME = 1 / 60  # seconds
+
+    def __init__(self, dotplots, spectrum_viewer, v2w, w2v):
+        self.dotplots = list(dotplots)
+        self.spectrum_viewer = spectrum_viewer
+        self.v2w = v2w
+        self.w2v = w2v
+        self._bins = {}
+        self._pending = None
+        self._handle = None
+        self.moves = 0
+        self.frames = 0
+
+    @staticmethod
+    def _bins_key(state):
+        return tuple(getattr(state, name, None) for name in ('hist_x_min', 'hist_x_max', 'hist_n_bin'))
+
+    def bins(self, viewer):
+        """
+        The bin edges of a dot plot, recomputed only when its binning
+        changes, or None if the viewer isn't binned
+        """
+        key = self._bins_key(viewer.state)
+        if None in key:
+            return None
+        cached = self._bins.get(viewer, None)
+        if cached is None or cached[0] != key:
+            cached = (key, np.asarray(viewer.state.bins))
+            self._bins[viewer] = cached
+        return cached[1]
+
+    def bin_center(self, viewer, x):
+        bins = self.bins(viewer)
+        if bins is None:
+            return x
+        return LinkedDotPlotBinning.bin_center(bins, x)
+
+    def move(self, source, x):
+        """Record a cursor move to ``x``, in the units of ``source``"""
+        velocity = self.w2v(x) if source is self.spectrum_viewer else x
+        self._pending = (source, velocity)
+        self.moves += 1
+        if self._handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self._handle = loop.call_later(self.FRAME_TIME, self.flush)
+
+    def cancel(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._pending = None
+
+    @staticmethod
+    def _place_line(viewer, x):
+        if hasattr(viewer, 'place_hover_line'):
+            viewer.place_hover_line(x)
+            return
+        with viewer.line.hold_sync(), viewer.line_label.hold_sync():
+            viewer.line.x = [x, x]
+            viewer._update_x_locations()
+            viewer.line_label.text = [viewer._label_text(x)]
+
+    def flush(self):
+        self._handle = None
+        if self._pending is None:
+            return
+        source, velocity = self._pending
+        self._pending = None
+        self.frames += 1
+        for viewer in self.dotplots:
+            if viewer is not source:
+                self._place_line(viewer, velocity)
+        if source is not self.spectrum_viewer:
+            self._place_line(self.spectrum_viewer, self.v2w(velocity))
+
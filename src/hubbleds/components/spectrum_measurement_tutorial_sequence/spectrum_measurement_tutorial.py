@@ -2,7 +2,6 @@ from fsspec import Callback
 # from hubbleds.stages.stage_1 import print_log
 import ipyvuetify as v
 from traitlets import Int, Bool, Unicode, Instance, Dict
-from cosmicds.utils import load_template
 from ipywidgets import widget_serialization, DOMWidget
 
 from cosmicds.utils import extend_tool
@@ -18,12 +17,18 @@ from cosmicds.utils import vertical_line_mark
 
 
 from hubbleds.data_management import VELOCITY_COMPONENT
+from hubbleds.viewers.dotplot_binning import LinkedDotPlotBinning
 from glue.core.message import NumericalDataChangedMessage, SubsetUpdateMessage
 from glue.core import HubListener
 from glue.core.subset import RangeSubsetState
 
 from itertools import cycle
 from functools import partial
+import numpy as np
+
+from ...mark_manager import FigureMarkManager
+from ...template_bundle import load_template
+from .selector_engine import SelectorEngine
 # theme_colors()
 from IPython.display import Javascript, display
 
@@ -106,6 +111,8 @@ class SpectrumMeasurementTutorialSequence(v.VuetifyTemplate, HubListener):
         self.dotplot_viewer_2 = self.dotplot_viewer_2_widget.viewer
         self.spectrum_viewer = self.spectrum_viewer_widget.viewer
         self.viewers = [self.dotplot_viewer, self.dotplot_viewer_2, self.spectrum_viewer]
+        self.selectors = SelectorEngine([self.dotplot_viewer, self.dotplot_viewer_2],
+                                        self.spectrum_viewer, self.v2w, self.w2v)
         
         
         self.glue_data = self.dotplot_viewer.state.layers[0].layer
@@ -466,16 +473,7 @@ class SpectrumMeasurementTutorialSequence(v.VuetifyTemplate, HubListener):
         """ 
         returns the right most index of the array that is less than x
         """
-        if len(arr) == 0:
-            return 0
-        if arr[-1] < x:
-            return len(arr)
-        if arr[0] > x:
-            return 0
-        for i in range(len(arr)):
-            if arr[i] > x:
-                return i
-        return len(arr)
+        return int(np.searchsorted(arr, x, side='right'))
         
     @staticmethod
     def vertical_line_mark(viewer, x, color, label=None):
@@ -492,84 +490,55 @@ class SpectrumMeasurementTutorialSequence(v.VuetifyTemplate, HubListener):
                          labels=[label], opacities = [1],
                          default_size = size,marker='circle',)
     
-    def _update_selector_tool_dp(self, event = None):
+    def _update_selector_tool(self, source, event = None):
         if not self.show_selector_lines:
             return
         if event is not None:
-            new_x = event['domain']['x']
-            self.dotplot_viewer_2.line.x = [new_x, new_x]
-            self.dotplot_viewer_2._update_x_locations()
-            self.dotplot_viewer_2.line_label.text = [self.dotplot_viewer_2._label_text(new_x)]
-            
-            w = self.v2w(new_x)
-            self.spectrum_viewer.line.x = [w,w]
-            self.spectrum_viewer._update_x_locations()  
-            self.spectrum_viewer.line_label.text = [self.spectrum_viewer._label_text(w)]
+            self.selectors.move(source, event['domain']['x'])
+
+    def _update_selector_tool_dp(self, event = None):
+        self._update_selector_tool(self.dotplot_viewer, event)
     
     def _update_selector_tool_dp2(self, event = None):
-        if not self.show_selector_lines:
-            return
-        if event is not None:
-            new_x = event['domain']['x']
-            self.dotplot_viewer.line.x = [new_x, new_x]
-            self.dotplot_viewer._update_x_locations()
-            self.dotplot_viewer.line_label.text = [self.dotplot_viewer._label_text(new_x)]
-            
-            w = self.v2w(new_x)
-            if w is None:
-                return
-            self.spectrum_viewer.line.x = [w,w]
-            self.spectrum_viewer._update_x_locations()
-            self.spectrum_viewer.line_label.text = [self.spectrum_viewer._label_text(w)]
-            
+        self._update_selector_tool(self.dotplot_viewer_2, event)
 
     def _update_selector_tool_sv(self, event = None):
-        if not self.show_selector_lines:
-            return
-        if event is not None:
-            new_x = self.w2v(event['domain']['x'])
-            self.dotplot_viewer.line.x = [new_x, new_x]
-            self.dotplot_viewer._update_x_locations()
-            self.dotplot_viewer.line_label.text = [self.dotplot_viewer._label_text(new_x)]
-            
-            self.dotplot_viewer.line_label.x = [new_x]
-            self.dotplot_viewer_2._update_x_locations()
-            self.dotplot_viewer_2.line_label.text = [self.dotplot_viewer_2._label_text(new_x)]
+        self._update_selector_tool(self.spectrum_viewer, event)
 
     @staticmethod
     def get_bin(bins, x):
-        bin_width = bins[1] - bins[0]
-        index = int((x - bins[0])/bin_width)
-        return bins[0] + bin_width * (index + 1/2)
+        return LinkedDotPlotBinning.bin_center(bins, x)
     
+    def _plot_measurement(self, mark, viewer, velocity):
+        x = self.selectors.bin_center(viewer, velocity)
+        size = viewer.layers[0].bars.default_size * 5
+        with mark.hold_sync():
+            if mark.x[0] != x:
+                mark.x = [x,x]
+            if mark.default_size != size:
+                mark.default_size = size
+
     def plot_measurements(self, data):
         """ data should be a glue data"""
-        vel = data.to_dataframe()[VELOCITY_COMPONENT]
+        vel = data[VELOCITY_COMPONENT]
         
         if self.show_first_measurment and (vel[0] is not None):
-            viewer = self.dotplot_viewer
-            x = self.get_bin(viewer.state.bins, vel[0])
-            self.first_meas_line.x = [x,x]
-            self.first_meas_line.default_size = self.dotplot_viewer.layers[0].bars.default_size * 5
+            self._plot_measurement(self.first_meas_line, self.dotplot_viewer, vel[0])
             self.first_meas_plotted = True
         else:
             self.first_meas_plotted = False
         
         if self.show_second_measurment and (vel[1] is not None):
-            viewer = self.dotplot_viewer_2
-            bins = viewer.state.bins
-            x = self.get_bin(viewer.state.bins, vel[1])
-            self.second_meas_line.x = [x,x]
-            self.second_meas_line.default_size = self.dotplot_viewer_2.layers[0].bars.default_size * 5
+            self._plot_measurement(self.second_meas_line, self.dotplot_viewer_2, vel[1])
             self.second_meas_plotted = True
         else:
             self.second_meas_plotted = False
         
-        if self.first_meas_plotted and self.first_meas_line not in self.dotplot_viewer.figure.marks:
-            self.dotplot_viewer.figure.marks = self.dotplot_viewer.figure.marks + [self.first_meas_line]
+        if self.first_meas_plotted:
+            FigureMarkManager.for_figure(self.dotplot_viewer.figure).add(self.first_meas_line)
         
-        if self.second_meas_plotted and self.second_meas_line not in self.dotplot_viewer_2.figure.marks:
-            self.dotplot_viewer_2.figure.marks = self.dotplot_viewer_2.figure.marks + [self.second_meas_line]
+        if self.second_meas_plotted:
+            FigureMarkManager.for_figure(self.dotplot_viewer_2.figure).add(self.second_meas_line)
         
 
         self.show_measurements_on_specviewer()
@@ -577,6 +546,7 @@ class SpectrumMeasurementTutorialSequence(v.VuetifyTemplate, HubListener):
     def show_measurements_on_specviewer(self):
         
         viewer = self.spectrum_viewer
+        manager = FigureMarkManager.for_figure(viewer.figure)
         
         new_marks = []
         d = 0.2 # fraction of the y range to use for the line
@@ -613,15 +583,11 @@ class SpectrumMeasurementTutorialSequence(v.VuetifyTemplate, HubListener):
                     v['line'].y = [ymin, ymax]
                     v['label'].y = [v['line'].y[1]]
                 
-                if v['line'] not in viewer.figure.marks:
-                    new_marks = new_marks + [v['line']] + [v['label']]
-            else:
-                if v['line'] in viewer.figure.marks:
-                    new_marks = new_marks + [v['line']] + [v['label']]
+                new_marks = new_marks + [v['line']] + [v['label']]
         
         
         if len(new_marks) > 0:
-            self.spectrum_viewer.figure.marks = self.spectrum_viewer.figure.marks + new_marks
+            manager.add(new_marks)
         
     
     def toggle_specview_mouse_interaction(self, change):
@@ -675,7 +641,7 @@ class SpectrumMeasurementTutorialSequence(v.VuetifyTemplate, HubListener):
                self.spec_view_first_label, 
                self.spec_view_second_label
                ]
-        marks = [m for m in self.spectrum_viewer.figure.marks if m in marks_to_remove]
+        marks = [m for m in FigureMarkManager.for_figure(self.spectrum_viewer.figure).marks if m in marks_to_remove]
         for mark in marks:
             mark.visible = False
         # self.spectrum_viewer.figure.marks = marks
@@ -686,6 +652,7 @@ class SpectrumMeasurementTutorialSequence(v.VuetifyTemplate, HubListener):
         except:
             print_log('could not remove _update_selector_tool_sv callback')
             pass
+        self.selectors.cancel()
 
 
     def print_log(self, *args, **kwargs):
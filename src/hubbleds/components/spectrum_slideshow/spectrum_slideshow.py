@@ -1,7 +1,8 @@
 import ipyvuetify as v
-from cosmicds.utils import load_template
 from traitlets import Int, Bool, Unicode
 
+from ...template_bundle import load_template
+
 
 class SpectrumSlideshow(v.VuetifyTemplate):
     template = load_template("spectrum_slideshow.vue", __file__,
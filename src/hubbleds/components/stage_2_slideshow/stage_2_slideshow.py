@@ -1,7 +1,7 @@
 import ipyvuetify as v
-from cosmicds.utils import load_template
 from traitlets import Int, Bool, Unicode, List, Float
 
+from ...template_bundle import load_template
 from ...utils import DISTANCE_CONSTANT
 
 
@@ -1,13 +1,26 @@
 import json
+from copy import deepcopy
+from functools import lru_cache
 from os.path import exists, dirname, join, realpath
 
-def load_style(name):
+STYLES_DIRECTORY = dirname(realpath(__file__))
+
+
+@lru_cache(maxsize=None)
+def _read_style(name):
     filename = f"{name}.json"
-    directory = dirname(realpath(__file__))
-    filepath = join(directory, filename)
+    filepath = join(STYLES_DIRECTORY, filename)
     try:
         if exists(filepath):
             with open(filepath, 'r') as f:
                 return json.load(f)
     except:
         return None
+
+
+def load_style(name):
+    # Each style file is only read once per process; callers get a copy
+    # so that they can't modify the cached style
+    style = _read_style(name)
+    return deepcopy(style) if style is not None else None
+
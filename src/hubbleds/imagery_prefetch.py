@@ -0,0 +1,195 @@
+import asyncio
+import json
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+import astropy.units as u
+from astropy.coordinates import SkyCoord
+
+from .utils import GALAXY_FOV
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+__all__ = ['ImageryLookahead', 'TileLoadTimings']
+
+logger = logging.getLogger(__name__)
+
+
+class TileLoadTimings:
+    """
+    Per-galaxy imagery load times, kept in a small JSON file so that they
+    carry over between sessions on the same machine.
+
+    Kernels on the same machine share the file, so each update is made
+    under an exclusive lock on a companion ``.lock`` file: the latest
+    samples are read back, the new one is added, and the file is replaced
+    with a complete temporary copy. No kernel's samples are lost, and
+    readers never see a partial file. Where file locks aren't available
+    the file is still replaced atomically, but concurrent updates may
+    drop each other's samples.
+
+    Parameters
+    ----------
+    path : str or `~pathlib.Path`, optional
+        The file to keep the timings in. If None, they're only kept in
+        memory.
+    slow_seconds : float
+        The mean load time above which a galaxy counts as slow
+    max_samples : int
+        The number of recent timings to keep per galaxy
+    """
+
+    DEFAULT_PATH = Path.home() / ".cache" / "hubbleds" / "tile_timings.json"
+
+    def __init__(self, path=None, slow_seconds=5, max_samples=5):
+        self.path = Path(path) if path is not None else None
+        self.slow_seconds = slow_seconds
+        self.max_samples = max_samples
+        self._timings = self._load() if self.path is not None else {}
+
+    def record(self, name, seconds):
+        if self.path is not None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self._locked():
+                    self._timings = self._load()
+                    self._add(name, seconds)
+                    self._save()
+                return
+            except OSError:
+                logger.warning("Unable to save tile load timings to %s", self.path)
+        self._add(name, seconds)
+
+    def _add(self, name, seconds):
+        samples = self._timings.setdefault(name, [])
+        samples.append(seconds)
+        del samples[:-self.max_samples]
+
+    @contextmanager
+    def _locked(self):
+        with open(self.path.with_name(self.path.name + ".lock"), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        with NamedTemporaryFile('w', dir=self.path.parent, prefix=self.path.name,
+                                suffix='.tmp', delete=False) as f:
+            json.dump(self._timings, f)
+        os.replace(f.name, self.path)
+
+    def mean(self, name):
+        samples = self._timings.get(name, None)
+        if not samples:
+            return None
+        return sum(samples) / len(samples)
+
+    def is_slow(self, name):
+        mean = self.mean(name)
+        return mean is not None and mean > self.slow_seconds
+
+
+class ImageryLookahead:
+    """
+    Warms the browser's imagery cache for galaxies the student is likely to
+    visit next.
+
+    While the student can't see the distance tool, its WWT widget is moved
+    to each queued galaxy in turn and held there for ``dwell`` seconds so
+    that WWT requests the galaxy's tiles. When the student comes back, the
+    view they left is restored, and the galaxies they visit next are found
+    in the cache. Galaxies known to load slowly are warmed last, so that
+    the lead time goes to the galaxies it helps most. Moves are scheduled
+    on the kernel's event loop, so an idle lookahead costs nothing.
+
+    Parameters
+    ----------
+    widget : `~pywwt.jupyter.WWTJupyterWidget`
+        The widget to warm the imagery with
+    timings : `TileLoadTimings`
+        The load times used to order the queue
+    dwell : float
+        The number of seconds to stay at each galaxy
+    fov : `~astropy.units.Quantity`
+        The field of view galaxies are shown at
+    """
+
+    def __init__(self, widget, timings, dwell=3, fov=GALAXY_FOV):
+        self.widget = widget
+        self.timings = timings
+        self.dwell = dwell
+        self.fov = fov
+        self.warmed = set()
+        self.active = False
+        self.moved = False
+        self._queue = []
+        self._handle = None
+
+    @property
+    def running(self):
+        return self._handle is not None
+
+    @property
+    def queued(self):
+        return [galaxy["name"] for galaxy in self._queue]
+
+    def warm(self, galaxies):
+        """
+        Replace the queue with ``galaxies``, dicts with ``name``, ``ra``
+        and ``decl`` entries, skipping any that have already been warmed
+        """
+        galaxies = [g for g in galaxies if g["name"] not in self.warmed]
+        slow = [g for g in galaxies if self.timings.is_slow(g["name"])]
+        self._queue = [g for g in galaxies if g not in slow] + slow
+        if self.active and self._handle is None:
+            self._next()
+
+    def start(self):
+        """Start moving the widget through the queue"""
+        self.active = True
+        self.moved = False
+        if self._handle is None:
+            self._next()
+
+    def stop(self):
+        """
+        Stop moving the widget, keeping the rest of the queue. Returns
+        whether the widget was moved since `start`.
+        """
+        self.active = False
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        return self.moved
+
+    def _next(self):
+        self._handle = None
+        if not (self.active and self._queue):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        galaxy = self._queue.pop(0)
+        self.warmed.add(galaxy["name"])
+        coordinates = SkyCoord(galaxy["ra"] * u.deg, galaxy["decl"] * u.deg, frame='icrs')
+        self.widget.center_on_coordinates(coordinates, fov=self.fov, instant=True)
+        self.moved = True
+        self._handle = loop.call_later(self.dwell, self._next)
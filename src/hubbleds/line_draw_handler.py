@@ -3,6 +3,8 @@ from bqplot_image_gl import LinesGL
 from bqplot_image_gl.interacts import MouseInteraction, mouse_events
 from echo.core import add_callback
 
+from .mark_manager import FigureMarkManager
+
 
 class LineDrawHandler:
     """
@@ -19,7 +21,7 @@ class LineDrawHandler:
 
         figure = viewer.figure
         self._original_interaction = figure.interaction
-        scales_image = figure.marks[0].scales
+        scales_image = FigureMarkManager.for_figure(figure).marks[0].scales
         self._interaction = MouseInteraction(x_scale=scales_image['x'],
                                              y_scale=scales_image['y'],
                                              move_throttle=70,
@@ -43,7 +45,7 @@ class LineDrawHandler:
     def _handle_mousemove(self, data):
 
         figure = self._viewer.figure
-        image = figure.marks[0]
+        image = FigureMarkManager.for_figure(figure).marks[0]
 
         # Note that, since the image scales of the glue-jupyter scatter viewer
         # are from 0 to 1 we don't need to worry about any normalization
@@ -59,7 +61,7 @@ class LineDrawHandler:
             self._drawn_line = LinesGL(x=[0, self._viewer.state.x_max],
                                        y=[0, 0], scales=image.scales,
                                        colors=['black'])
-            figure.marks = figure.marks + [self._drawn_line]
+            FigureMarkManager.for_figure(figure).add(self._drawn_line)
             self._follow_cursor = True
 
         if self._follow_cursor:
@@ -73,11 +75,11 @@ class LineDrawHandler:
             # Clear the old endpoint
             domain = data['domain']
             x, y = domain['x'], domain['y']
-            figure.marks = [mark for mark in figure.marks if
-                            mark is not self._endpt]
+            manager = FigureMarkManager.for_figure(figure)
+            manager.remove(self._endpt)
 
             # Add a new one
-            image = figure.marks[0]
+            image = manager.marks[0]
             endpt = Scatter(x=[x],
                             y=[y],
                             colors=['black'],
@@ -91,7 +93,7 @@ class LineDrawHandler:
             # endpt.opacities = [0]
             endpt.hovered_style = {'cursor': 'grab'}
             endpt.enable_move = True
-            figure.marks = figure.marks + [endpt]
+            manager.add(endpt)
             self._endpt = endpt
 
             # End drawing
@@ -178,7 +180,7 @@ class LineDrawHandler:
         figure = self._viewer.figure
         to_remove = [x for x in [self._drawn_line, self._endpt] if
                      x is not None]
-        figure.marks = [mark for mark in figure.marks if mark not in to_remove]
+        FigureMarkManager.for_figure(figure).remove(to_remove)
         self._drawn_line = None
         self._endpt = None
         self._app.state.draw_on = False
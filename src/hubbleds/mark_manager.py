@@ -0,0 +1,109 @@
+import asyncio
+
+from .attached import attached
+
+__all__ = ['FigureMarkManager']
+
+
+class FigureMarkManager:
+    """
+    Batches changes to the marks of a bqplot figure.
+
+    Every assignment to ``figure.marks`` sends the whole mark list to the
+    frontend. The manager instead records add, remove and reorder
+    operations and applies them together, with one assignment per tick of
+    the event loop. Operations are replayed onto the figure's marks at that
+    time, so marks set directly on the figure in the meantime are kept, and
+    no mark ever appears twice. Without a running event loop, each operation
+    is applied immediately.
+
+    Use `for_figure` to get the manager of a figure, and `marks` rather than
+    ``figure.marks`` to see the marks including any pending changes.
+
+    ``syncs`` counts the assignments made to ``figure.marks``, and
+    ``syncs_avoided`` the operations that changed the marks but were merged
+    into another operation's sync.
+    """
+
+    _FIGURE_ATTRIBUTE = "_hubbleds_mark_manager"
+
+    def __init__(self, figure):
+        self.figure = figure
+        self._pending = []
+        self._scheduled = False
+        self.operations = 0
+        self.syncs = 0
+        self.syncs_avoided = 0
+
+    @classmethod
+    def for_figure(cls, figure):
+        return attached(figure, cls._FIGURE_ATTRIBUTE, cls)
+
+    @staticmethod
+    def _apply(marks, operations):
+        marks = list(marks)
+        for kind, targets in operations:
+            if kind == 'remove' or kind == 'front':
+                marks = [m for m in marks if not any(m is t for t in targets)]
+            if kind == 'add' or kind == 'front':
+                for mark in targets:
+                    if not any(m is mark for m in marks):
+                        marks.append(mark)
+        return marks
+
+    @property
+    def marks(self):
+        """The figure's marks once the pending operations are applied"""
+        return self._apply(self.figure.marks, self._pending)
+
+    def _queue(self, kind, marks):
+        if not isinstance(marks, (list, tuple)):
+            marks = [marks]
+        marks = [m for m in marks if m is not None]
+        if not marks:
+            return
+        self.operations += 1
+        self._pending.append((kind, marks))
+        if self._scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self._scheduled = True
+        loop.call_soon(self.flush)
+
+    def add(self, marks):
+        """Add marks that aren't already on the figure, in order"""
+        self._queue('add', marks)
+
+    def remove(self, marks):
+        self._queue('remove', marks)
+
+    def bring_to_front(self, marks):
+        """Move marks to the end of the mark list, adding them if needed"""
+        self._queue('front', marks)
+
+    def flush(self):
+        """Apply the pending operations, syncing the figure at most once"""
+        self._scheduled = False
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        marks = self.figure.marks
+        changes = 0
+        for operation in pending:
+            applied = self._apply(marks, [operation])
+            if not self._same(applied, marks):
+                changes += 1
+            marks = applied
+        if self._same(marks, self.figure.marks):
+            return
+        self.syncs += 1
+        self.syncs_avoided += changes - 1
+        self.figure.marks = marks
+
+    @staticmethod
+    def _same(marks, other):
+        return len(marks) == len(other) and all(m is o for m, o in zip(marks, other))
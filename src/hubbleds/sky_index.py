@@ -0,0 +1,104 @@
+import numpy as np
+
+__all__ = ['SkyZoneIndex', 'angular_separation']
+
+
+def angular_separation(ra1, dec1, ra2, dec2):
+    """The angular separation, in degrees, of points given in degrees"""
+    ra1, dec1, ra2, dec2 = map(np.radians, (ra1, dec1, ra2, dec2))
+    sdec = np.sin((dec2 - dec1) / 2)
+    sra = np.sin((ra2 - ra1) / 2)
+    a = sdec ** 2 + np.cos(dec1) * np.cos(dec2) * sra ** 2
+    return np.degrees(2 * np.arcsin(np.sqrt(np.clip(a, 0, 1))))
+
+
+class SkyZoneIndex:
+    """
+    A spatial index of points on the sky for cone searches.
+
+    The sky is cut into declination zones of equal height, and the points
+    are sorted by zone and then by RA. A cone search only looks at the
+    zones the cone overlaps, and within each of those at the RA range the
+    cone covers, which is found by bisection. Candidates are then checked
+    against the exact angular distance. A query costs O(log n) plus the
+    number of points near the cone, whatever the size of the catalog.
+
+    Parameters
+    ----------
+    ra, dec : array-like
+        The coordinates of the points, in degrees
+    zone_height : float
+        The height of the declination zones, in degrees
+    """
+
+    def __init__(self, ra, dec, zone_height=0.5):
+        ra = np.mod(np.asarray(ra, dtype=float), 360)
+        dec = np.asarray(dec, dtype=float)
+        self.zone_height = zone_height
+        self.n_zones = int(np.ceil(180 / zone_height))
+        zones = self._zone(dec)
+        self._order = np.lexsort((ra, zones))
+        self._ra = ra[self._order]
+        self._dec = dec[self._order]
+        ra_rad, dec_rad = np.radians(self._ra), np.radians(self._dec)
+        self._xyz = np.column_stack((np.cos(dec_rad) * np.cos(ra_rad),
+                                     np.cos(dec_rad) * np.sin(ra_rad),
+                                     np.sin(dec_rad)))
+        self._zone_starts = np.searchsorted(zones[self._order], np.arange(self.n_zones + 1))
+
+    def __len__(self):
+        return len(self._order)
+
+    def _zone(self, dec):
+        zone = np.floor((np.asarray(dec) + 90) / self.zone_height).astype(int)
+        return np.clip(zone, 0, self.n_zones - 1)
+
+    @staticmethod
+    def _ra_half_width(dec, radius):
+        # The largest RA offset of a point of the cone from its centre
+        if abs(dec) + radius >= 90:
+            return 180
+        sin_ratio = np.sin(np.radians(radius)) / np.cos(np.radians(dec))
+        if sin_ratio >= 1:
+            return 180
+        return np.degrees(np.arcsin(sin_ratio))
+
+    def _ra_slices(self, start, stop, ra, half_width):
+        ras = self._ra[start:stop]
+        if half_width >= 180:
+            return [(start, stop)]
+        low, high = ra - half_width, ra + half_width
+        ranges = [(max(low, 0), min(high, 360))]
+        if low < 0:
+            ranges.append((low + 360, 360))
+        if high > 360:
+            ranges.append((0, high - 360))
+        return [(start + np.searchsorted(ras, a, side='left'),
+                 start + np.searchsorted(ras, b, side='right')) for a, b in ranges]
+
+    def query(self, ra, dec, radius):
+        """
+        Return the indices, in the original order of the points, of the
+        points within ``radius`` degrees of (``ra``, ``dec``)
+        """
+        ra = ra % 360
+        if radius >= 180:
+            return np.arange(len(self._order))
+        first = self._zone(max(dec - radius, -90))
+        last = self._zone(min(dec + radius, 90))
+        half_width = self._ra_half_width(dec, radius)
+        slices = []
+        for zone in range(first, last + 1):
+            start, stop = self._zone_starts[zone], self._zone_starts[zone + 1]
+            if start == stop:
+                continue
+            slices.extend(self._ra_slices(start, stop, ra, half_width))
+        if not slices:
+            return np.empty(0, dtype=int)
+        candidates = np.concatenate([np.arange(a, b) for a, b in slices])
+        ra_rad, dec_rad = np.radians(ra), np.radians(dec)
+        centre = np.array([np.cos(dec_rad) * np.cos(ra_rad),
+                           np.cos(dec_rad) * np.sin(ra_rad),
+                           np.sin(dec_rad)])
+        inside = self._xyz[candidates] @ centre >= np.cos(np.radians(radius))
+        return np.sort(self._order[candidates[inside]])
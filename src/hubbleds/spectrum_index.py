@@ -0,0 +1,106 @@
+from glue.core.exceptions import IncompatibleAttribute
+import numpy as np
+
+from .attached import attached
+
+__all__ = ['SpectrumRangeIndex', 'attach_range_index', 'range_index_for']
+
+_DATA_ATTRIBUTE = "_hubbleds_range_indices"
+
+
+class SpectrumRangeIndex:
+    """
+    A sparse table for O(1) minimum and maximum queries of ``y`` over a
+    contiguous range of ``x``, e.g. the flux of a spectrum over a
+    wavelength window. The range itself is found with a binary search.
+
+    Unsorted x values are sorted once, and ``order`` keeps the permutation
+    from the sorted values back to the given ones.
+
+    Parameters
+    ----------
+    x : array-like
+        The x values
+    y : array-like
+        The y values. NaNs are ignored.
+    """
+
+    def __init__(self, x, y):
+        x = np.asarray(x)
+        y = np.asarray(y, dtype=float)
+        self.order = None
+        if not self.is_sorted(x):
+            self.order = np.argsort(x, kind='stable')
+            x, y = x[self.order], y[self.order]
+        self.x = x
+        nan = np.isnan(y)
+        mins = [np.where(nan, np.inf, y)]
+        maxes = [np.where(nan, -np.inf, y)]
+        width = 1
+        while 2 * width <= y.size:
+            mins.append(np.minimum(mins[-1][:-width], mins[-1][width:]))
+            maxes.append(np.maximum(maxes[-1][:-width], maxes[-1][width:]))
+            width *= 2
+        self._mins = mins
+        self._maxes = maxes
+
+    @staticmethod
+    def is_sorted(x):
+        x = np.asarray(x)
+        return x.size < 2 or bool(np.all(x[1:] >= x[:-1]))
+
+    def index_range(self, xmin, xmax):
+        """
+        Return the half-open range of indices into the sorted x values of
+        the values in [xmin, xmax]
+        """
+        start = np.searchsorted(self.x, xmin, side='left')
+        stop = np.searchsorted(self.x, xmax, side='right')
+        return int(start), int(stop)
+
+    def extrema(self, xmin, xmax):
+        """
+        Return the (min, max) of y for x in [xmin, xmax], or None if that
+        window contains no finite y values.
+        """
+        start, stop = self.index_range(xmin, xmax)
+        if stop <= start:
+            return None
+        level = (stop - start).bit_length() - 1
+        width = 1 << level
+        mins, maxes = self._mins[level], self._maxes[level]
+        ymin = min(mins[start], mins[stop - width])
+        ymax = max(maxes[start], maxes[stop - width])
+        if not np.isfinite(ymin):
+            return None
+        return ymin, ymax
+
+
+def attach_range_index(data, x_att='lambda', y_att='flux'):
+    """
+    Build the range index of ``y_att`` over ``x_att`` for ``data`` and keep
+    it on the data.
+    """
+    x = data[x_att]
+    y = data[y_att]
+    index = SpectrumRangeIndex(x, y)
+    indices = attached(data, _DATA_ATTRIBUTE, lambda data: {})
+    indices[(str(x_att), str(y_att))] = (x, y, index)
+    return index
+
+
+def range_index_for(data, x_att, y_att):
+    """
+    Return the range index for ``data``, building it if the data has none
+    or its values have been replaced since it was built.
+    """
+    try:
+        x = data[x_att]
+        y = data[y_att]
+    except IncompatibleAttribute:
+        return None
+    indices = getattr(data, _DATA_ATTRIBUTE, None) or {}
+    entry = indices.get((str(x_att), str(y_att)), None)
+    if entry is not None and entry[0] is x and entry[1] is y:
+        return entry[2]
+    return attach_range_index(data, x_att, y_att)
@@ -0,0 +1,133 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import logging
+
+from astropy.io import fits
+from glue.core.data_factories.fits import fits_reader
+import requests
+
+from .spectrum_index import attach_range_index
+from .utils import hubble_api_url
+
+__all__ = ['SpectrumPrefetcher', 'fetch_spectrum']
+
+logger = logging.getLogger(__name__)
+
+SPECTRUM_FOLDERS = {"Sp": "spiral", "E": "elliptical", "Ir": "irregular"}
+
+_executor = None
+
+
+def _shared_executor():
+    # One small pool per process, shared by every story
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hubbleds-spectra")
+    return _executor
+
+
+def fetch_spectrum(name, filename, gal_type):
+    """
+    Download and parse the spectrum in ``filename`` for a galaxy of type
+    ``gal_type``. Returns a `~glue.core.data.Data` labelled ``name``, with a
+    ``lambda`` component and its range index, or None if the file has no
+    coadded spectrum. The data isn't added to any collection, so this is
+    safe to call off the main thread.
+    """
+    folder = SPECTRUM_FOLDERS[gal_type]
+    url = f"{hubble_api_url()}/spectra/{folder}/{filename}"
+    response = requests.get(url)
+    f = BytesIO(response.content)
+    f.name = name
+    hdulist = fits.open(f)
+    data_name = name + '[COADD]'
+    data = next((d for d in fits_reader(hdulist) if d.label == data_name), None)
+    if data is None:
+        return None
+    data.label = name
+    data['lambda'] = 10 ** data['loglam']
+    # Imported here, as the story module imports this one
+    from .story import HubblesLaw
+    HubblesLaw.make_data_writeable(data)
+    attach_range_index(data, 'lambda', 'flux')
+    return data
+
+
+class SpectrumPrefetcher:
+    """
+    Downloads and parses spectra on a background worker so that they are
+    ready by the time they are shown.
+
+    A completed spectrum is passed to ``deliver`` on the event loop that
+    requested it, i.e. on the kernel's main thread, along with any callbacks
+    waiting on it. If the background fetch fails, the spectrum is fetched
+    again there, as it would have been without prefetching. `take` delivers
+    a spectrum that is still in flight right away, blocking until it's
+    fetched, for callers that need it now.
+
+    Parameters
+    ----------
+    deliver : callable
+        Called with each fetched `~glue.core.data.Data`
+    """
+
+    def __init__(self, deliver):
+        self.deliver = deliver
+        self._pending = {}
+        self._requests = {}
+        self._callbacks = {}
+
+    def pending(self, name):
+        return name in self._pending
+
+    def prefetch(self, name, filename, gal_type, callback=None):
+        """
+        Start fetching a spectrum unless it's already in flight. If given,
+        ``callback`` is called with the data once it has been delivered.
+        Returns False if there's no event loop to deliver the result on.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if callback is not None and loop is not None:
+            self._callbacks.setdefault(name, []).append(callback)
+        if name in self._pending:
+            return loop is not None
+        future = _shared_executor().submit(fetch_spectrum, name, filename, gal_type)
+        self._pending[name] = future
+        self._requests[name] = (filename, gal_type)
+        if loop is not None:
+            future.add_done_callback(lambda _f: loop.call_soon_threadsafe(self._complete, name))
+        return loop is not None
+
+    def _result(self, name, future, filename, gal_type):
+        try:
+            return future.result()
+        except Exception:
+            logger.warning("Unable to prefetch the spectrum of %s, loading it now",
+                           name, exc_info=True)
+        return fetch_spectrum(name, filename, gal_type)
+
+    def _complete(self, name):
+        future = self._pending.pop(name, None)
+        request = self._requests.pop(name, None)
+        callbacks = self._callbacks.pop(name, [])
+        if future is None:
+            return None
+        data = self._result(name, future, *request)
+        if data is None:
+            return None
+        self.deliver(data)
+        for callback in callbacks:
+            callback(data)
+        return data
+
+    def take(self, name):
+        """
+        Deliver the spectrum being fetched for ``name`` now, waiting for it
+        if needed. Returns the data, or None if there's none in flight or the
+        file has no spectrum.
+        """
+        return self._complete(name)
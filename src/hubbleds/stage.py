@@ -4,17 +4,19 @@ import ipyvuetify as v
 import requests
 from cosmicds.components import Table
 from cosmicds.phases import Stage
-from cosmicds.utils import API_URL, CDSJSONEncoder
+from cosmicds.utils import CDSJSONEncoder
 from echo import add_callback
 
 from .data_management import *
-from .utils import HUBBLE_ROUTE_PATH, distance_from_angular_size, velocity_from_wavelengths
+from .theme import ThemeService
+from .utils import hubble_api_url, distance_from_angular_size, velocity_from_wavelengths
 
 
 class HubbleStage(Stage):
 
     def __init__(self, session, story_state, app_state, *args, **kwargs):
         super().__init__(session, story_state, app_state, *args, **kwargs)
+        story_state.stage_instances[self.index] = self
 
         # Respond to dark/light mode change
         add_callback(self.app_state, 'dark_mode', self._on_dark_mode_change)
@@ -50,13 +52,13 @@ class HubbleStage(Stage):
     def submit_measurement(self, measurement):
         if self.app_state.update_db:
             prepared = self._prepare_measurement(measurement)
-            requests.put(f"{API_URL}/{HUBBLE_ROUTE_PATH}/submit-measurement",
+            requests.put(f"{hubble_api_url()}/submit-measurement",
                         json=prepared)
    
     def submit_example_galaxy_measurement(self, measurement):
         if self.app_state.update_db:
             prepared = self._prepare_sample_measurement(measurement)
-            endpoint = f"{API_URL}/{HUBBLE_ROUTE_PATH}/sample-measurement"
+            endpoint = f"{hubble_api_url()}/sample-measurement"
             requests.put(endpoint, json=prepared)
 
     def remove_measurement(self, galaxy_name):
@@ -69,7 +71,7 @@ class HubbleStage(Stage):
         user = self.app_state.student
         if self.app_state.update_db and user.get("id", None) is not None:
             requests.delete(
-                f"{API_URL}/{HUBBLE_ROUTE_PATH}/measurement/{user['id']}/{galaxy_name}")
+                f"{hubble_api_url()}/measurement/{user['id']}/{galaxy_name}")
 
     def update_data_value(self, dc_name, comp_name, value, index, block_submit=False):
         super().update_data_value(dc_name, comp_name, value, index)
@@ -121,6 +123,10 @@ class HubbleStage(Stage):
         if self.app_state.update_db and dc_name == STUDENT_MEASUREMENTS_LABEL:
             self.submit_measurement(values)
 
+    @property
+    def theme(self):
+        return ThemeService.for_app_state(self.app_state)
+
     def table_selected_color(self, dark):
         theme = v.theme.themes.dark if dark else v.theme.themes.light
         return theme.info
@@ -1,10 +1,10 @@
 from cosmicds.phases import CDSState
 from cosmicds.phases import Stage
 from cosmicds.registries import register_stage
-from cosmicds.utils import load_template
 from echo import CallbackProperty
 from traitlets import default
 
+from ..template_bundle import load_template
 from ..components.intro_slideshow import IntroSlideshow
 from ..utils import IMAGE_BASE_URL
 
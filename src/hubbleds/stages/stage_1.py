@@ -9,7 +9,7 @@ from astropy.coordinates import SkyCoord
 from cosmicds.components.table import Table
 from cosmicds.phases import CDSState
 from cosmicds.registries import register_stage
-from cosmicds.utils import load_template, update_figure_css, debounce, extend_tool
+from cosmicds.utils import debounce, extend_tool
 from echo import add_callback, ignore_callback, CallbackProperty, \
     DictCallbackProperty, ListCallbackProperty, delay_callback, \
     callback_property
@@ -18,8 +18,8 @@ from glue.core.message import NumericalDataChangedMessage, SubsetUpdateMessage
 from numpy import isin, zeros
 from traitlets import Bool, default, validate
 
+from ..template_bundle import load_template
 from ..components import SpectrumSlideshow, SelectionTool, SpectrumMeasurementTutorialSequence, DotplotTutorialSlideshow
-from ..data.styles import load_style
 from ..data_management import *
 from ..stage import HubbleStage
 from ..utils import GALAXY_FOV, H_ALPHA_REST_LAMBDA, IMAGE_BASE_URL, \
@@ -459,6 +459,8 @@ class StageOne(HubbleStage):
                                names=['flagged'])
         selection_tool.observe(self._on_selection_tool_selected,
                                names=['selected'])
+        selection_tool.observe(self._on_candidate_galaxy_changed,
+                               names=['candidate_galaxy'])
 
         spectrum_slideshow = SpectrumSlideshow(self.stage_state.image_location)
         self.add_component(spectrum_slideshow, label='py-spectrum-slideshow')
@@ -709,7 +711,7 @@ class StageOne(HubbleStage):
 
     def _on_galaxy_update(self, galaxy):
         if galaxy:
-            self.story_state.load_spectrum_data(galaxy["name"], galaxy["type"])
+            self.story_state.prefetch_spectrum_data(galaxy["name"], galaxy["type"])
             if not self._filling_data:
                 if galaxy[NAME_COMPONENT] in self.example_galaxy_table._glue_data[NAME_COMPONENT]:
                     self.example_galaxy_table.selected = [galaxy]
@@ -734,10 +736,16 @@ class StageOne(HubbleStage):
             gal_type = galaxy['type']
             if not self._filling_data:
                 galaxy.pop("element")
-            self.story_state.load_spectrum_data(filename, gal_type)
+            self.story_state.prefetch_spectrum_data(filename, gal_type)
             self.add_data_values(STUDENT_MEASUREMENTS_LABEL, galaxy)
             self.stage_state.galaxy = galaxy
 
+    def _on_candidate_galaxy_changed(self, change):
+        # Start loading the spectrum while the student decides
+        galaxy = change["new"]
+        if galaxy and galaxy.get("type", None) is not None:
+            self.story_state.prefetch_spectrum_data(galaxy["name"], galaxy["type"])
+
     def _on_lambda_used(self, used):
         self.stage_state.lambda_used = used
 
@@ -849,14 +857,11 @@ class StageOne(HubbleStage):
         self.selection_tool.current_galaxy = galaxy
         self.stage_state.galaxy = galaxy
 
-        # Load the spectrum data, if necessary
-        filename = name
-        spec_data = self.story_state.load_spectrum_data(filename, gal_type)
+        # Show the spectrum once it's loaded, which is right away if it was prefetched
+        self.story_state.prefetch_spectrum_data(
+            name, gal_type,
+            callback=lambda spec_data: self._show_galaxy_spectrum(galaxy, spec_data, table))
 
-        z = galaxy["z"]
-        self.story_state.update_data(SPECTRUM_DATA_LABEL, spec_data)
-        self.update_spectrum_viewer(name, z,  table )
-        
         if self.stage_state.marker_reached('cho_row1'):
             self.stage_state.spec_viewer_reached = True
 
@@ -1047,25 +1052,15 @@ class StageOne(HubbleStage):
 
     def update_spectrum_style(self, dark):
         spectrum_viewer = self.get_viewer("spectrum_viewer")
-        theme_name = "dark" if dark else "light"
-        style = load_style(f"default_spectrum_{theme_name}")
-        update_figure_css(spectrum_viewer, style_dict=style)
+        self.theme.style_viewers([spectrum_viewer], ["spectrum"], dark)
 
 
     def _update_viewer_style(self, dark):
         viewers = ['dotplot_viewer','dotplot_viewer_2','dotplot_viewer_3']
         viewer_type = ["histogram","histogram","histogram"]
-        theme_name = "dark" if dark else "light"
-        for viewer, vtype in zip(viewers, viewer_type):
-            viewer = self.get_viewer(viewer)
-            style = load_style(f"default_{vtype}_{theme_name}")
-            update_figure_css(viewer, style_dict=style)
-
-    def _on_dark_mode_change(self, dark):
-        super()._on_dark_mode_change(dark)
-        self.update_spectrum_style(dark)
-        self._update_viewer_style(dark)
-    
+        viewers = [self.get_viewer(viewer) for viewer in viewers]
+        self.theme.style_viewers(viewers, viewer_type, dark)
+
     #@print_function_name
     def _empty_spectrum_viewer(self):
         dc_name = SPECTRUM_DATA_LABEL
@@ -1137,10 +1132,20 @@ class StageOne(HubbleStage):
             tool["disabled"] = False
             self.galaxy_table.update_tool(tool)
 
+    def _show_galaxy_spectrum(self, galaxy, spec_data, table):
+        # Another galaxy may have been chosen while this one loaded
+        if self.stage_state.galaxy.get("name", None) != galaxy["name"]:
+            return
+        self.story_state.update_data(SPECTRUM_DATA_LABEL, spec_data)
+        self.update_spectrum_viewer(galaxy["name"], galaxy["z"], table)
+
     #@print_function_name
     def initialize_spectrum_data(self, label):
         data = self.get_data(label)
         if data.size > 0:
+            for index in range(1, data.size):
+                self.story_state.prefetch_spectrum_data(data[data.id['name']][index],
+                                                        data[data.id['type']][index])
             name = data[data.id['name']][0]
             spectype = data[data.id['type']][0]
             self.story_state.load_spectrum_data(name, spectype)
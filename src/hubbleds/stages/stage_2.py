@@ -1,9 +1,9 @@
 from cosmicds.phases import Stage
 from cosmicds.registries import register_stage
-from cosmicds.utils import load_template
 from echo import add_callback, CallbackProperty 
 from glue.core.state_objects import State
 from traitlets import default
+from ..template_bundle import load_template
 from ..utils import IMAGE_BASE_URL
 
 from ..components import Stage2SlideShow
@@ -6,23 +6,23 @@ from astropy.coordinates import SkyCoord
 from cosmicds.components.table import Table
 from cosmicds.phases import CDSState
 from cosmicds.registries import register_stage
-from cosmicds.utils import extend_tool, load_template, API_URL
+from cosmicds.utils import extend_tool
 from echo import CallbackProperty, add_callback, ignore_callback, callback_property, delay_callback, ListCallbackProperty
 from traitlets import default, Bool
 
+from ..template_bundle import load_template
 from ..components import DistanceSidebar, DistanceTool, DosDontsSlideShow
 from ..data_management import *
+from ..mark_manager import FigureMarkManager
 from ..stage import HubbleStage
-from ..utils import DISTANCE_CONSTANT, GALAXY_FOV, HUBBLE_ROUTE_PATH, IMAGE_BASE_URL, distance_from_angular_size, format_fov
+from ..utils import DISTANCE_CONSTANT, GALAXY_FOV, hubble_api_url, IMAGE_BASE_URL, distance_from_angular_size, format_fov
 
 from ..viewers import HubbleDotPlotView
-from ..data.styles import load_style
-from cosmicds.utils import  update_figure_css
+from ..viewers.dotplot_binning import LinkedDotPlotBinning
 from numpy import searchsorted
 
 from bqplot.marks import Scatter
 
-from glue_jupyter.link import link
 from glue.core.message import NumericalDataChangedMessage
 from functools import partial
 
@@ -432,17 +432,15 @@ class StageTwo(HubbleStage):
             viewer.state.viewer_height = 150
             viewer.layer_artist_for_data(data).state.color = '#787878'
         
-        def d_a(x):
-            return DISTANCE_CONSTANT / x
-        
-        link((dist_dotplots[0].state, 'x_min'), (ang_dotplots[0].state, 'x_max'), d_a, d_a)
-        link((dist_dotplots[0].state, 'x_max'), (ang_dotplots[0].state, 'x_min'), d_a, d_a)
-        link((dist_dotplots[0].state, 'x_min'), (dist_dotplots[1].state, 'x_min'))
-        link((dist_dotplots[0].state, 'x_max'), (dist_dotplots[1].state, 'x_max'))
+        # d = C / \theta, so the angular size axis is the reciprocal of the distance axis
+        self.dotplot_binning = LinkedDotPlotBinning(dist_dotplots[0].state, DISTANCE_CONSTANT)
+        self.dotplot_binning.link(dist_dotplots[1].state)
+        self.dotplot_binning.link(ang_dotplots[0].state, reciprocal=True)
         
         def set_x_lim(viewer):
-            xmin = min(min(m.x) for m in viewer.figure.marks if len(m.x))
-            xmax = max(max(m.x) for m in viewer.figure.marks if len(m.x))
+            marks = FigureMarkManager.for_figure(viewer.figure).marks
+            xmin = min(min(m.x) for m in marks if len(m.x))
+            xmax = max(max(m.x) for m in marks if len(m.x))
             padding = (xmax-xmin) * 0.05
             with delay_callback(viewer.state, 'x_min', 'x_max'):
                 viewer.state.x_min = xmin - padding
@@ -550,27 +548,16 @@ class StageTwo(HubbleStage):
 
     @staticmethod
     def add_mark(viewer, mark, label = None):
-        marks = viewer.figure.marks
-        # function to flatten list of lists
-        def flatten(l):
-            for item in l:
-                if len(item.labels) > 0:
-                    yield item.labels[0]
-                else:
-                    yield 'no label'
-            # return [item for sublist in l for item in (sublist if len(sublist) > 0 else [None])]
-        labels = list(flatten(marks))
-        marks = [m for i, m in enumerate(marks) if label != labels[i]]
-        viewer.figure.marks = marks + [mark]
+        manager = FigureMarkManager.for_figure(viewer.figure)
+        # replace any mark with the same label
+        labelled = [m for m in manager.marks if (m.labels[0] if len(m.labels) > 0 else 'no label') == label]
+        manager.remove(labelled)
+        manager.add(mark)
 
         
     @staticmethod  
     def binned_x(bins, x):
-        # index = searchsorted(bins, x, side='right')
-        # return (bins[index] + bins[index-1]) / 2
-        bin_width = bins[1] - bins[0]
-        index = int((x - bins[0])/bin_width)
-        return bins[0] + bin_width * (index + 1/2)
+        return LinkedDotPlotBinning.bin_center(bins, x)
     
     def plot_measurement(self, viewer, index, distance = False, color = 'black', label = None):
         viewer = self.get_viewer(viewer)
@@ -579,7 +566,7 @@ class StageTwo(HubbleStage):
             x = distance_from_angular_size(x)
             label = label + ' (distance)'
         # x needs to be in a bin
-        x_bin = self.binned_x(viewer.state.bins, x)
+        x_bin = self.dotplot_binning.binned_x(viewer.state, x)
         mark = self.add_point(viewer, x_bin, color, label)
         self.add_mark(viewer, mark, label)
 
@@ -630,6 +617,7 @@ class StageTwo(HubbleStage):
         self.distance_tool.reset_canvas()
         self.distance_tool.go_to_location(galaxy["ra"], galaxy["decl"],
                                           fov=GALAXY_FOV)
+        self.distance_tool.warm_imagery(self._upcoming_galaxies(table, index))
 
         self.distance_tool.reset_brightness_contrast() # reset the style of viewer
         
@@ -650,6 +638,14 @@ class StageTwo(HubbleStage):
                 self.stage_state.marker = 'dot_seq5b'
         self._update_viewer_style(dark=self.app_state.dark_mode)
     
+    def _upcoming_galaxies(self, table, index):
+        # The unmeasured rows after this one, wrapping around the table
+        data = table.glue_data
+        rows = list(range(index + 1, data.size)) + list(range(index))
+        return [{"name": data[NAME_COMPONENT][row], "ra": data[RA_COMPONENT][row],
+                 "decl": data[DEC_COMPONENT][row]}
+                for row in rows if data[DISTANCE_COMPONENT][row] is None]
+
     #@print_function_name
     def _angular_size_update(self, change):
         new_ang_size = change["new"]
@@ -784,8 +780,9 @@ class StageTwo(HubbleStage):
             if not name.endswith(".fits"):
                 name += ".fits"
             data = {"galaxy_name": name}
-        requests.post(f"{API_URL}/{HUBBLE_ROUTE_PATH}/mark-tileload-bad",
+        requests.post(f"{hubble_api_url()}/mark-tileload-bad",
                       json=data)
+        self.distance_tool.record_load_failure(galaxy["name"])
 
         index = self.distance_table.index
         if index is None:
@@ -863,15 +860,8 @@ class StageTwo(HubbleStage):
     def _update_viewer_style(self, dark):
         viewers = ['dotplot_viewer_ang','dotplot_viewer_dist','dotplot_viewer_dist_2']
         viewer_type = ["histogram","histogram","histogram"]
-        theme_name = "dark" if dark else "light"
-        for viewer, vtype in zip(viewers, viewer_type):
-            viewer = self.get_viewer(viewer)
-            style = load_style(f"default_{vtype}_{theme_name}")
-            update_figure_css(viewer, style_dict=style)
-    
-    def _on_dark_mode_change(self, dark):
-        super()._on_dark_mode_change(dark)
-        self._update_viewer_style(dark)
+        viewers = [self.get_viewer(viewer) for viewer in viewers]
+        self.theme.style_viewers(viewers, viewer_type, dark)
     
     @property
     def distance_sidebar(self):
@@ -7,15 +7,15 @@ from cosmicds.components.layer_toggle import LayerToggle
 from cosmicds.components.table import Table
 from cosmicds.phases import CDSState
 from cosmicds.registries import register_stage
-from cosmicds.utils import extend_tool, load_template, update_figure_css
+from cosmicds.utils import extend_tool
 from echo import CallbackProperty, add_callback, remove_callback, DictCallbackProperty, ListCallbackProperty
 from glue.core.message import NumericalDataChangedMessage
 from glue.core.data import Data
 from glue_jupyter.link import link
 from hubbleds.utils import IMAGE_BASE_URL, AGE_CONSTANT
 from traitlets import default, Bool
-from ..data.styles import load_style
 
+from ..template_bundle import load_template
 from ..components import HubbleExpUniverseSlideshow
 
 from ..data_management import *
@@ -444,15 +444,8 @@ class StageThree(HubbleStage):
         viewer_type = ["scatter",
                        "scatter",]
 
-        theme_name = "dark" if dark else "light"
-        for viewer, vtype in zip(viewers, viewer_type):
-            viewer = self.get_viewer(viewer)
-            style = load_style(f"default_{vtype}_{theme_name}")
-            update_figure_css(viewer, style_dict=style)
-
-    def _on_dark_mode_change(self, dark):
-        super()._on_dark_mode_change(dark)
-        self._update_viewer_style(dark)
+        viewers = [self.get_viewer(viewer) for viewer in viewers]
+        self.theme.style_viewers(viewers, viewer_type, dark)
 
     def table_selected_color(self, dark):
         return "colors.lightBlue.darken4"
@@ -5,15 +5,15 @@ from numpy import where
 from cosmicds.components.table import Table
 from cosmicds.phases import CDSState
 from cosmicds.registries import register_stage
-from cosmicds.utils import extend_tool, load_template, update_figure_css
+from cosmicds.utils import extend_tool
 from echo import CallbackProperty, DictCallbackProperty, add_callback, callback_property, ListCallbackProperty, delay_callback
 from glue.core.message import NumericalDataChangedMessage
 from glue_jupyter.link import link
 from hubbleds.components.id_slider import IDSlider
 from hubbleds.utils import IMAGE_BASE_URL, AGE_CONSTANT
 from traitlets import default, Bool
-from ..data.styles import load_style
 
+from ..template_bundle import load_template
 from ..data_management import *
 from ..histogram_listener import HistogramListener
 from ..stage import HubbleStage
@@ -21,6 +21,10 @@ from ..viewers import HubbleScatterView
 from ..viewers.viewers import \
     HubbleClassHistogramView, HubbleHistogramView
 
+# glue's 'auto' points mode only draws a density map above 100000 points,
+# far more than the all-data layer has, so it switches sooner
+ALL_DATA_DENSITY_POINTS = 5000
+
 
 class StageState(CDSState):
     relage_response = CallbackProperty(False)
@@ -599,6 +603,7 @@ class StageFour(HubbleStage):
         all_layer.state.zorder = 0
         all_layer.state.color = "#78909C"
         all_layer.state.size = 2
+        self._update_all_points_mode()
         all_layer.state.visible = False
         all_viewer.state.x_att = all_data.id[DISTANCE_COMPONENT]
         all_viewer.state.y_att = all_data.id[VELOCITY_COMPONENT]
@@ -685,11 +690,8 @@ class StageFour(HubbleStage):
                            handler=_update_bins)
 
 
-        theme = "dark" if self.app_state.dark_mode else "light"
-        style_name = f"default_histogram_{theme}"
-        style = load_style(style_name)
-        update_figure_css(all_distr_viewer_student, style_dict=style)
-        update_figure_css(all_distr_viewer_class, style_dict=style)
+        self.theme.style_viewers([all_distr_viewer_student, all_distr_viewer_class],
+                                 ["histogram", "histogram"], self.app_state.dark_mode)
         
         class_distr_viewer.state.show_measuring_line()
         all_distr_viewer_student.state.show_measuring_line()
@@ -729,11 +731,8 @@ class StageFour(HubbleStage):
                        "histogram",
                        "histogram",]
 
-        theme_name = "dark" if dark else "light"
-        for viewer, vtype in zip(viewers, viewer_type):
-            viewer = self.get_viewer(viewer)
-            style = load_style(f"default_{vtype}_{theme_name}")
-            update_figure_css(viewer, style_dict=style)
+        viewers = [self.get_viewer(viewer) for viewer in viewers]
+        self.theme.style_viewers(viewers, viewer_type, dark)
 
     def table_selected_color(self, dark):
         return "colors.lightBlue.darken4"
@@ -790,8 +789,18 @@ class StageFour(HubbleStage):
         self._reset_limits_for_data(CLASS_DATA_LABEL)
         self._reset_limits_for_data(CLASS_SUMMARY_LABEL)
     
+    def _update_all_points_mode(self):
+        all_data = self.get_data(ALL_DATA_LABEL)
+        all_layer = self.get_viewer("all_viewer").layer_artist_for_data(all_data)
+        if all_layer is None:
+            return
+        dense = all_data.size >= ALL_DATA_DENSITY_POINTS
+        all_layer.state.points_mode = 'density' if dense else 'auto'
+
     def _on_data_change(self, msg):
         label = msg.data.label
+        if label == ALL_DATA_LABEL:
+            self._update_all_points_mode()
         if self.story_state.stage_index == self.index:
             if label == STUDENT_DATA_LABEL:
                 self.get_component("py-student-slider").refresh()
@@ -809,10 +818,6 @@ class StageFour(HubbleStage):
     def _on_student_data_update(self, *args):
         self.reset_viewer_limits()
     
-    def _on_dark_mode_change(self, dark):
-        super()._on_dark_mode_change(dark)
-        self._update_viewer_style(dark)
-        
     def age_calc_update_guesses(self, responses):
         key = str(self.index)
         state = self.stage_state.age_calc_state
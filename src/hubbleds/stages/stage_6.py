@@ -11,11 +11,10 @@ from traitlets import Bool, default
 from cosmicds.components.layer_toggle import LayerToggle
 from cosmicds.phases import CDSState
 from cosmicds.registries import register_stage
-from cosmicds.utils import (RepeatedTimer, extend_tool, load_template,
-                            update_figure_css)
+from cosmicds.utils import RepeatedTimer, extend_tool
 from hubbleds.utils import HST_KEY_AGE, IMAGE_BASE_URL, AGE_CONSTANT
 
-from ..data.styles import load_style
+from ..template_bundle import load_template
 from ..data_management import *
 from ..stage import HubbleStage
 
@@ -241,16 +240,9 @@ class StageFive(HubbleStage):
 
         viewer_type = ["scatter"]
 
-        theme_name = "dark" if dark else "light"
-        for viewer, vtype in zip(viewers, viewer_type):
-            viewer = self.get_viewer(viewer)
-            style = load_style(f"default_{vtype}_{theme_name}")
-            update_figure_css(viewer, style_dict=style)
+        viewers = [self.get_viewer(viewer) for viewer in viewers]
+        self.theme.style_viewers(viewers, viewer_type, dark)
 
-    def _on_dark_mode_change(self, dark):
-        super()._on_dark_mode_change(dark)
-        self._update_viewer_style(dark)
-    
     def reset_viewer_limits(self):
         prodata_viewer = self.get_viewer("prodata_viewer")
         prodata_viewer.state.reset_limits()
@@ -1,30 +1,28 @@
 from collections import defaultdict, Counter
 from datetime import datetime
-from io import BytesIO
 from math import floor
 from pathlib import Path
 import requests
 
 import ipyvuetify as v
 import numpy as np
-from numpy.random import Generator, PCG64, SeedSequence
-from astropy.io import fits
 from cosmicds.phases import Story
 from cosmicds.registries import story_registry
-from cosmicds.utils import API_URL, RepeatedTimer
+from cosmicds.utils import RepeatedTimer
 from dateutil.parser import isoparse
 from echo import DictCallbackProperty, CallbackProperty
 from echo.callback_container import CallbackContainer
 from glue.core import Data
 from glue.core.component import CategoricalComponent, Component
-from glue.core.data_factories.fits import fits_reader
 from glue.core.message import NumericalDataChangedMessage
-from glue.core.subset import CategorySubsetState
+from glue.core.subset import ElementSubsetState
 
 from hubbleds.data.hubble_simulation.simulate import H0
 
+from .catalogs import CSV_CATALOGS, csv_catalog, example_galaxy, example_galaxy_seed_data, sdss_galaxies
 from .data_management import *
-from .utils import AGE_CONSTANT, H_ALPHA_REST_LAMBDA, HUBBLE_ROUTE_PATH, age_in_gyr_simple, fit_line, MG_REST_LAMBDA
+from .spectrum_prefetch import SpectrumPrefetcher, fetch_spectrum
+from .utils import AGE_CONSTANT, H_ALPHA_REST_LAMBDA, hubble_api_url, age_in_gyr_simple, fit_line, MG_REST_LAMBDA
 
 @story_registry(name="hubbles_law")
 class HubblesLaw(Story):
@@ -37,6 +35,10 @@ class HubblesLaw(Story):
 
     name_ext = ".fits"
 
+    # The best-fit galaxy subset and the row that it currently selects
+    _best_fit_subset = None
+    _best_fit_index = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -44,42 +46,26 @@ class HubblesLaw(Story):
 
         self._on_timer_cbs = CallbackContainer()
 
+        # The stages of this story, keyed by index, as they're created
+        self.stage_instances = {}
+        self.spectrum_prefetcher = SpectrumPrefetcher(self._add_spectrum_data)
+
         self.add_callback('has_best_fit_galaxy', self.update_student_data)
 
         self.hub.subscribe(self, NumericalDataChangedMessage,
                            filter=lambda msg: msg.data.label == CLASS_DATA_LABEL,
                            handler=self._on_class_data_updated)
 
-        # Load data needed for Hubble's Law
-        data_dir = Path(__file__).parent / "data"
-        output_dir = data_dir / "hubble_simulation" / "output"
-
-        # Load some simulated measurements as summary data
-        self.app.load_data([
-            f"{dataset}.csv" for dataset in (
-                data_dir / "galaxy_data",
-                data_dir / "Hubble 1929-Table 1",
-                data_dir / "HSTkey2001",
-                data_dir / "dummy_student_data",
-                output_dir / "HubbleData_ClassSample",
-                output_dir / "HubbleData_All",
-                output_dir / "HubbleSummary_ClassSample",
-                output_dir / "HubbleSummary_Students",
-                output_dir / "HubbleSummary_Classes",
-            )
-        ])
+        # The immutable catalogs are loaded once per process and shared
+        self.catalog_labels = set()
+        for path in CSV_CATALOGS:
+            self._add_catalog_data(Path(path).stem, csv_catalog(path))
 
         # Load in the galaxy data
-        galaxies = requests.get(f"{API_URL}/{HUBBLE_ROUTE_PATH}/galaxies?types=Sp").json()
-        galaxies_dict = { k : [x[k] for x in galaxies] for k in galaxies[0] }
-        galaxies_dict["name"] = [x[:-len(self.name_ext)] for x in galaxies_dict["name"]]
-        self.data_collection.append(Data(
-            label=SDSS_DATA_LABEL,
-            **galaxies_dict
-        ))
+        self._add_catalog_data(SDSS_DATA_LABEL, sdss_galaxies(self.name_ext))
 
         # Load in the overall data
-        all_json = requests.get(f"{API_URL}/{HUBBLE_ROUTE_PATH}/all-data").json()
+        all_json = requests.get(f"{hubble_api_url()}/all-data").json()
         all_measurements = all_json["measurements"]
         for measurement in all_measurements:
             measurement.update({"galaxy_id": measurement["galaxy"]["id"]})
@@ -144,14 +130,21 @@ class HubblesLaw(Story):
         for comp in [DISTANCE_COMPONENT, VELOCITY_COMPONENT, STUDENT_ID_COMPONENT]:
             self.app.add_link(student_measurements, comp, example_galaxy_meas, comp)
             self.app.add_link(student_measurements, comp, example_galaxy_meas, comp)
-        # Make all data writeable
+        # Make all data writeable, other than the shared catalogs
         for data in self.data_collection:
-            HubblesLaw.make_data_writeable(data)
+            if data.label not in self.catalog_labels:
+                HubblesLaw.make_data_writeable(data)
 
         self.class_last_modified = None
         self.class_data_timer = RepeatedTimer(30, self._on_timer)
         self.class_data_timer.start()
 
+    def _add_catalog_data(self, label, columns):
+        data = Data(label=label, **columns)
+        self.data_collection.append(data)
+        self.catalog_labels.add(label)
+        return data
+
     def _on_timer(self):
         self.fetch_class_data()
         for cb in self._on_timer_cbs:
@@ -176,33 +169,47 @@ class HubblesLaw(Story):
         #Alt Palette 1:  Y:FFBE0B, O:FB5607, Pi:FF006E, Pu:8338EC, Bl:3A86FF, LiBl:619EFF
 
 
-    def load_spectrum_data(self, name, gal_type):
+    def _spectrum_names(self, name):
         if not name.endswith(self.name_ext):
-            filename = name + self.name_ext
-        else:
-            filename = name
-            name = name[:-len(self.name_ext)]
+            return name, name + self.name_ext
+        return name[:-len(self.name_ext)], name
+
+    def _add_spectrum_data(self, data):
+        if data.label not in self.data_collection:
+            self.data_collection.append(data)
+
+    def load_spectrum_data(self, name, gal_type):
+        name, filename = self._spectrum_names(name)
 
         # Don't load data that we've already loaded
         dc = self.data_collection
         if name not in dc:
-            data_name = name + '[COADD]'
-            type_folders = { "Sp" : "spiral", "E" : "elliptical", "Ir" : "irregular" }
-            folder = type_folders[gal_type]
-            url = f"{API_URL}/{HUBBLE_ROUTE_PATH}/spectra/{folder}/{filename}"
-            response = requests.get(url)
-            f = BytesIO(response.content)
-            f.name = name
-            hdulist = fits.open(f)
-            data = next((d for d in fits_reader(hdulist) if d.label == data_name), None)
+            # A prefetched spectrum may still be on its way
+            data = self.spectrum_prefetcher.take(name)
             if data is None:
-                return
-            data.label = name
-            dc.append(data)
-            data['lambda'] = 10 ** data['loglam']
-            HubblesLaw.make_data_writeable(data)
+                data = fetch_spectrum(name, filename, gal_type)
+                if data is None:
+                    return
+                self._add_spectrum_data(data)
         return dc[name]
 
+    def prefetch_spectrum_data(self, name, gal_type, callback=None):
+        """
+        Start loading a spectrum in the background. If given, ``callback``
+        is called with the data on the main thread once it's loaded, which
+        is right away if it already was. Without an event loop to hand the
+        data back on, the spectrum is loaded before returning.
+        """
+        name, filename = self._spectrum_names(name)
+        if name in self.data_collection:
+            if callback is not None:
+                callback(self.data_collection[name])
+            return
+        if not self.spectrum_prefetcher.prefetch(name, filename, gal_type, callback=callback):
+            data = self.load_spectrum_data(name, gal_type)
+            if data is not None and callback is not None:
+                callback(data)
+
     def _best_fit_galaxy(self, measurements):
         distances = measurements[DISTANCE_COMPONENT]
         velocities = measurements[VELOCITY_COMPONENT]
@@ -233,37 +240,10 @@ class HubblesLaw(Story):
         Load in the example galaxy data and seed data for the example galaxy
         Create empty Data for student measurements of example galaxy
         """
-        # Load in the galaxy data
-        example_galaxy_data = requests.get(f"{API_URL}/{HUBBLE_ROUTE_PATH}/sample-galaxy").json()
-        example_galaxy_data = { k : [example_galaxy_data[k]] for k in example_galaxy_data }
-        example_galaxy_data['name'] = [name.replace('.fits','') for name in example_galaxy_data['name']]
-        self.data_collection.append(Data(label=EXAMPLE_GALAXY_DATA, **example_galaxy_data))
-        
-        # load the seed data for the example galaxy to populate
-        # parse the json into a dictionary of arrays
-        # create glue Data object [each dictionary item becomes a component]
-        example_galaxy_seed_data = requests.get(f"{API_URL}/{HUBBLE_ROUTE_PATH}/sample-measurements").json()
-        example_galaxy_seed_data = {k: np.array([record[k] for record in example_galaxy_seed_data]) for k in example_galaxy_seed_data[0]}
-        good = example_galaxy_seed_data[DB_VELOCITY_FIELD] != None
-
-        # Uncomment this and comment out next block to get all seed galaxies
-        # example_galaxy_seed_data = {k: np.array(v)[good] for k,v in example_galaxy_seed_data.items()}
-
-        # This block chooses a subset of size N from the seed data
-        seq = SeedSequence(42)
-        gen = Generator(PCG64(seq))
-        indices = np.arange(len(good))
-        indices = indices[1::2][:85] # we need to keep the first 85 so that it always selects the same galaxies "randomly"
-        random_subset = gen.choice(indices[good[1::2][:85]], size=40, replace=False)
-        random_subset = np.ravel(np.column_stack((random_subset, random_subset+1)))
-        example_galaxy_seed_data = {k: np.array(v)[random_subset] for k,v in example_galaxy_seed_data.items()}
-
-        example_galaxy_seed_data[DB_VELOCITY_FIELD] = np.array(example_galaxy_seed_data[DB_VELOCITY_FIELD], dtype = type(example_galaxy_seed_data[DB_VELOCITY_FIELD][0]))
-        example_galaxy_seed_data = Data(label=EXAMPLE_GALAXY_SEED_DATA, **example_galaxy_seed_data)
-        
-        self.data_collection.append(example_galaxy_seed_data)
-        
-        
+        example_galaxy_data = example_galaxy()
+        self._add_catalog_data(EXAMPLE_GALAXY_DATA, example_galaxy_data)
+        seed_data = self._add_catalog_data(EXAMPLE_GALAXY_SEED_DATA, example_galaxy_seed_data())
+
         # Create empty Data for student measurements of example galaxy
         single_gal_student_cols = [SAMPLE_ID_COMPONENT, NAME_COMPONENT, RA_COMPONENT, DEC_COMPONENT, Z_COMPONENT,
                              GALTYPE_COMPONENT, MEASWAVE_COMPONENT, RESTWAVE_COMPONENT,
@@ -300,11 +280,11 @@ class HubblesLaw(Story):
         self.data_collection.append(example_galaxy_measurements)
         self.add_new_row(data=example_galaxy_measurements, changes={MEASUREMENT_NUMBER_COMPONENT : 'second'})
 
-        self.app.add_link(example_galaxy_seed_data, DB_STUDENT_ID_FIELD, example_galaxy_measurements, STUDENT_ID_COMPONENT)
-        self.app.add_link(example_galaxy_seed_data, DB_DISTANCE_FIELD, example_galaxy_measurements, DISTANCE_COMPONENT)
-        self.app.add_link(example_galaxy_seed_data, DB_VELOCITY_FIELD, example_galaxy_measurements, VELOCITY_COMPONENT)
-        self.app.add_link(example_galaxy_seed_data, DB_MEASNUM_FIELD, example_galaxy_measurements, MEASUREMENT_NUMBER_COMPONENT)
-        self.app.add_link(example_galaxy_seed_data, DB_ANGSIZE_FIELD, example_galaxy_measurements, ANGULAR_SIZE_COMPONENT)
+        self.app.add_link(seed_data, DB_STUDENT_ID_FIELD, example_galaxy_measurements, STUDENT_ID_COMPONENT)
+        self.app.add_link(seed_data, DB_DISTANCE_FIELD, example_galaxy_measurements, DISTANCE_COMPONENT)
+        self.app.add_link(seed_data, DB_VELOCITY_FIELD, example_galaxy_measurements, VELOCITY_COMPONENT)
+        self.app.add_link(seed_data, DB_MEASNUM_FIELD, example_galaxy_measurements, MEASUREMENT_NUMBER_COMPONENT)
+        self.app.add_link(seed_data, DB_ANGSIZE_FIELD, example_galaxy_measurements, ANGULAR_SIZE_COMPONENT)
         
         return example_galaxy_measurements
     
@@ -414,19 +394,31 @@ class HubblesLaw(Story):
 
         # Make sure that the best-fit galaxy subset is correct
         if self.has_best_fit_galaxy:
-            c = student_data.get_component(NAME_COMPONENT)
-            indices = np.where(c.labels == bfg[NAME_COMPONENT])[0]
-            codes = c.codes[indices]
-            subset_state = CategorySubsetState(student_data.id[NAME_COMPONENT], codes)
+            # The best-fit galaxy is always the last row
+            self._update_best_fit_subset(student_data, new_data.size - 1)
+
+    def _update_best_fit_subset(self, student_data, index):
+        """
+        Point the best-fit galaxy subset at row ``index`` of the student
+        data, or at no rows if ``index`` is negative, as it is for empty
+        data. The subset state is only replaced when the row moves, so that
+        layers depending on the subset aren't recomputed needlessly.
+        """
+        indices = [index] if index >= 0 else []
+        subset = self._best_fit_subset
+        if subset is None or subset not in student_data.subsets:
             subset = next((s for s in student_data.subsets if s.label == BEST_FIT_SUBSET_LABEL), None)
-            if subset is not None:
-                subset.subset_state = subset_state
-            else:
-                student_data.new_subset(label=BEST_FIT_SUBSET_LABEL,
-                                                 subset=subset_state,
-                                                 color="blue",
-                                                 alpha=1,
-                                                 markersize=10)
+            self._best_fit_index = None
+        if subset is None:
+            subset = student_data.new_subset(label=BEST_FIT_SUBSET_LABEL,
+                                             subset=ElementSubsetState(indices=indices, data=student_data),
+                                             color="blue",
+                                             alpha=1,
+                                             markersize=10)
+        elif index != self._best_fit_index:
+            subset.subset_state = ElementSubsetState(indices=indices, data=student_data)
+        self._best_fit_subset = subset
+        self._best_fit_index = index
     
     def update_example_galaxy_data(self, *args):
         dc = self.data_collection
@@ -581,12 +573,12 @@ class HubblesLaw(Story):
         data.update_values_from_data(new_data)
 
     def fetch_student_data(self):
-        student_meas_url = f"{API_URL}/{HUBBLE_ROUTE_PATH}/measurements/{self.student_user['id']}"
+        student_meas_url = f"{hubble_api_url()}/measurements/{self.student_user['id']}"
         self.fetch_measurement_data_and_update(student_meas_url, STUDENT_MEASUREMENTS_LABEL, make_writeable=True)
         self.update_student_data()
         
     def fetch_example_galaxy_data(self):
-        example_data_url = f"{API_URL}/{HUBBLE_ROUTE_PATH}/sample-measurements/{self.student_user['id']}"
+        example_data_url = f"{hubble_api_url()}/sample-measurements/{self.student_user['id']}"
         self.fetch_measurement_data_and_update(example_data_url, EXAMPLE_GALAXY_MEASUREMENTS, make_writeable=True, update_if_empty=False)
         # self.update_example_galaxy_data() # not implemented
 
@@ -608,7 +600,7 @@ class HubblesLaw(Story):
             if need_update and last_modified is not None:
                 self.class_last_modified = last_modified
             return need_update
-        class_data_url = f"{API_URL}/{HUBBLE_ROUTE_PATH}/stage-3-data/{self.student_user['id']}/{self.classroom['id']}"
+        class_data_url = f"{hubble_api_url()}/stage-3-data/{self.student_user['id']}/{self.classroom['id']}"
         if self.class_last_modified is not None:
             timestamp = floor(self.class_last_modified.timestamp() * 1000)
             class_data_url = f"{class_data_url}?last_checked={timestamp}"
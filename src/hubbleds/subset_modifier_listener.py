@@ -1,8 +1,76 @@
+from collections import defaultdict
+
 from glue.core import HubListener
 from glue.core.message import SubsetMessage
 from glue.core.subset import SubsetState
 from glue.core.subset_group import SubsetGroup
 
+from .attached import attached
+
+
+class SubsetMessageRouter(HubListener):
+    """
+    Routes subset messages on a hub to the listeners interested in them.
+
+    Rather than every listener subscribing to every ``SubsetMessage`` and
+    filtering it, the router subscribes once and looks up the listeners
+    for a message by its (data, subset) key. A subset that belongs to a
+    subset group is also routed under (data, group). Use `for_hub` to get
+    the router of a hub.
+    """
+
+    _HUB_ATTRIBUTE = "_hubbleds_subset_router"
+
+    def __init__(self, hub):
+        self._routes = defaultdict(list)
+        self._listener_keys = {}
+        hub.subscribe(self, SubsetMessage, handler=self._route)
+
+    @classmethod
+    def for_hub(cls, hub):
+        return attached(hub, cls._HUB_ATTRIBUTE, cls)
+
+    @staticmethod
+    def route_keys(subset):
+        keys = [(subset.data, subset)]
+        group = getattr(subset, "group", None)
+        if group is not None:
+            keys.append((subset.data, group))
+        return keys
+
+    def register(self, listener):
+        self.unregister(listener)
+        key = (listener.source_data, listener.source_subset)
+        self._routes[key].append(listener)
+        self._listener_keys[listener] = key
+
+    def unregister(self, listener):
+        key = self._listener_keys.pop(listener, None)
+        if key is None:
+            return
+        listeners = self._routes[key]
+        listeners.remove(listener)
+        if not listeners:
+            del self._routes[key]
+
+    def is_registered(self, listener):
+        return listener in self._listener_keys
+
+    def listeners_for(self, subset):
+        listeners = []
+        for key in self.route_keys(subset):
+            listeners.extend(self._routes.get(key, ()))
+        return listeners
+
+    def message_counts(self):
+        return {listener: listener.message_count
+                for listener in self._listener_keys}
+
+    def _route(self, message):
+        for listener in self.listeners_for(message.subset):
+            listener.message_count += 1
+            listener._handle_message(message)
+
 
 class SubsetModifierListener(HubListener):
 
@@ -22,16 +90,20 @@ class SubsetModifierListener(HubListener):
                                                "source_subset") if self._source_subset is None else self._source_subset.label
         self._modify_subset_label = kwargs.get("modify_subset_label",
                                                "modify_subset") if self._modify_subset is None else self._modify_subset.label
+        self.message_count = 0
 
         if kwargs.get("listen", True):
             self.listen()
 
+    @property
+    def router(self):
+        return SubsetMessageRouter.for_hub(self.hub)
+
     def listen(self):
-        self.hub.subscribe(self, SubsetMessage, handler=self._handle_message,
-                           filter=self._should_listen)
+        self.router.register(self)
 
     def ignore(self):
-        self.hub.unsubscribe(self, SubsetMessage)
+        self.router.unregister(self)
 
     def clear_subset(self):
         self._source_subset.subset_state = SubsetState()
@@ -40,7 +112,10 @@ class SubsetModifierListener(HubListener):
     def _should_listen(self, message):
         """
         This method checks that a message is of the right type (SubsetMessage)
-        and that it was sent by the subset that we care about
+        and that it was sent by the subset that we care about.
+        Message dispatch goes through the `SubsetMessageRouter`, which
+        makes the same check with a key lookup; this is kept for callers
+        that want to test a message directly.
         """
 
         if (self._source_subset is None or
@@ -48,13 +123,9 @@ class SubsetModifierListener(HubListener):
                 message.subset.data != self._source_data):
             return False
 
-        if message.subset.data == self._source_data:
-            if self._is_source_group:
-                listen = message.subset in self._source_subset.subsets
-            else:
-                listen = message.subset == self._source_subset
-
-        return listen
+        if self._is_source_group:
+            return message.subset.group is self._source_subset
+        return message.subset == self._source_subset
 
     def _create_subset_state(self, message):
         raise NotImplementedError(
@@ -112,6 +183,9 @@ class SubsetModifierListener(HubListener):
         self._source_subset = value
         self._source_subset_label = value.label
         self._is_source_group = isinstance(value, SubsetGroup)
+        router = self.router
+        if router.is_registered(self):
+            router.register(self)
         if self._is_source_group:
             subset = next(
                 x for x in value.subsets if x.data == self._source_data)
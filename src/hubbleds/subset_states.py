@@ -0,0 +1,144 @@
+from base64 import b64decode, b64encode
+
+from glue.core.contracts import contract
+from glue.core.state import loader, saver
+from glue.core.subset import SubsetState
+from numpy import (arange, asarray, bitwise_or, concatenate, cumsum, diff, flatnonzero,
+                   frombuffer, int64, isin, searchsorted, uint8, uint64, unique, zeros,
+                   zeros_like)
+
+
+class IdSetSubsetState(SubsetState):
+    """
+    A subset state selecting the rows whose value of ``att`` is one of
+    a set of integer ids.
+
+    The ids are stored as a sorted, unique array. When the ids are dense
+    enough, membership is evaluated with a boolean lookup table (bitmap),
+    otherwise with a binary search into the sorted array. Either way the
+    mask is computed in a single vectorized pass, rather than once per
+    contiguous range as with a ``MultiRangeSubsetState``.
+
+    Parameters
+    ----------
+    ids : iterable of int
+        The ids to select
+    att : `~glue.core.component_id.ComponentID`
+        The component to compare the ids against
+    """
+
+    # Use a bitmap when it would be at most this many times larger
+    # than the sorted id array
+    BITMAP_DENSITY_FACTOR = 64
+
+    def __init__(self, ids, att):
+        super(IdSetSubsetState, self).__init__()
+        self._ids = unique(asarray(ids, dtype=int64))
+        self._att = att
+        self._bitmap = None
+
+    @property
+    def ids(self):
+        return self._ids
+
+    @property
+    def att(self):
+        return self._att
+
+    @property
+    def attributes(self):
+        return (self._att,)
+
+    def _build_bitmap(self):
+        ids = self._ids
+        if ids.size == 0 or ids[0] < 0:
+            return None
+        top = int(ids[-1]) + 1
+        if top > self.BITMAP_DENSITY_FACTOR * ids.size:
+            return None
+        bitmap = zeros(top, dtype=bool)
+        bitmap[ids] = True
+        return bitmap
+
+    def _membership(self, values):
+        ids = self._ids
+        if ids.size == 0:
+            return zeros_like(values, dtype=bool)
+
+        if self._bitmap is None:
+            self._bitmap = self._build_bitmap()
+        bitmap = self._bitmap
+
+        if values.dtype.kind not in 'iu':
+            # e.g. ids stored in a float column
+            return isin(values, ids)
+
+        if bitmap is not None:
+            in_range = (values >= 0) & (values < bitmap.size)
+            mask = zeros(values.shape, dtype=bool)
+            mask[in_range] = bitmap[values[in_range]]
+            return mask
+
+        indices = searchsorted(ids, values)
+        indices[indices == ids.size] = 0
+        return ids[indices] == values
+
+    @contract(data='isinstance(Data)', view='array_view')
+    def to_mask(self, data, view=None):
+        values = asarray(data[self._att, view])
+        return self._membership(values)
+
+    def copy(self):
+        return IdSetSubsetState(self._ids, self._att)
+
+    def encoded_ids(self):
+        """
+        Return the ids as a base64 string of the varint encoding of their
+        deltas. Sorted ids have small gaps, which take one byte each for
+        gaps below 64, so dense id sets cost little more than a byte per id.
+        """
+        if self._ids.size == 0:
+            return ""
+        deltas = concatenate(([self._ids[0]], diff(self._ids)))
+        return b64encode(_encode_varints(deltas).tobytes()).decode("ascii")
+
+    @staticmethod
+    def decode_ids(encoded):
+        if not encoded:
+            return asarray([], dtype=int64)
+        deltas = _decode_varints(frombuffer(b64decode(encoded), dtype=uint8))
+        return cumsum(deltas)
+
+
+def _encode_varints(values):
+    # Zigzag encode so that small negative values are small too, then
+    # write 7 bits per byte, setting the high bit on all but the last
+    values = asarray(values, dtype=int64)
+    zigzag = (values << 1).view(uint64) ^ (values >> 63).view(uint64)
+    shifts = arange(0, 64, 7, dtype=uint64)
+    groups = ((zigzag[:, None] >> shifts) & uint64(0x7f)).astype(uint8)
+    lengths = 1 + ((zigzag[:, None] >> shifts[1:]) != 0).sum(axis=1)
+    positions = arange(shifts.size)
+    groups[positions < (lengths - 1)[:, None]] |= 0x80
+    return groups[positions < lengths[:, None]]
+
+
+def _decode_varints(data):
+    ends = (data & 0x80) == 0
+    value_index = concatenate(([0], cumsum(ends)[:-1]))
+    starts = concatenate(([0], flatnonzero(ends)[:-1] + 1))
+    shifts = (7 * (arange(data.size) - starts[value_index])).astype(uint64)
+    zigzag = zeros(int(ends.sum()), dtype=uint64)
+    bitwise_or.at(zigzag, value_index, (data & 0x7f).astype(uint64) << shifts)
+    return (zigzag >> uint64(1)).view(int64) ^ -(zigzag & uint64(1)).view(int64)
+
+
+@saver(IdSetSubsetState)
+def _save_id_set_subset_state(state, context):
+    return dict(att=context.id(state.att), ids=state.encoded_ids())
+
+
+@loader(IdSetSubsetState)
+def _load_id_set_subset_state(rec, context):
+    return IdSetSubsetState(IdSetSubsetState.decode_ids(rec['ids']),
+                            context.object(rec['att']))
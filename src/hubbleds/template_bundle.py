@@ -0,0 +1,250 @@
+"""
+A precompiled bundle of the package's Vue templates.
+
+At build time every ``.vue`` file in the package is written into one file,
+``templates.bundle``, next to this module. At import, the bundle is mapped
+read-only and each template is decoded once per process, the first time it
+is asked for. Since the mapping is backed by the file, the operating system
+shares its pages between every kernel on a node that uses the same bundle;
+``HUBBLEDS_TEMPLATE_BUNDLE`` can point all of them at one copy.
+
+Without a bundle, or for a template that has been modified since the bundle
+was written, templates are read from their files as before.
+
+This module only imports the standard library at the top level, so the
+build can use it without importing the package.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+from pathlib import Path
+import struct
+
+__all__ = ['TemplateBundle', 'build_bundle', 'load_template', 'register_components',
+           'template_bundle']
+
+PACKAGE_DIR = Path(__file__).parent
+BUNDLE_NAME = "templates.bundle"
+BUNDLE_ENV = "HUBBLEDS_TEMPLATE_BUNDLE"
+
+_MAGIC = b"HDSTPL1\n"
+_LENGTH = struct.Struct("<Q")
+
+_bundle = None
+_bundle_loaded = False
+_templates = {}
+_registered = set()
+
+
+def _fingerprint(entries):
+    digest = hashlib.sha256()
+    for path, content in entries:
+        digest.update(path.encode("utf-8") + b"\0")
+        digest.update(content + b"\0")
+    return digest.hexdigest()
+
+
+def build_bundle(package_dir=PACKAGE_DIR, output=None):
+    """
+    Write every ``.vue`` file under ``package_dir`` into one bundle.
+
+    Parameters
+    ----------
+    package_dir : str or `~pathlib.Path`
+        The package directory to collect templates from
+    output : str or `~pathlib.Path`, optional
+        Where to write the bundle. Defaults to ``BUNDLE_NAME`` in
+        ``package_dir``.
+
+    Returns
+    -------
+    str
+        The fingerprint of the bundle
+    """
+    package_dir = Path(package_dir)
+    output = Path(output) if output is not None else package_dir / BUNDLE_NAME
+    entries = sorted((path.relative_to(package_dir).as_posix(), path.read_bytes())
+                     for path in package_dir.rglob("*.vue") if path.is_file())
+
+    templates = {}
+    offset = 0
+    for path, content in entries:
+        templates[path] = [offset, len(content)]
+        offset += len(content)
+    fingerprint = _fingerprint(entries)
+    index = json.dumps({"fingerprint": fingerprint, "templates": templates}).encode("utf-8")
+
+    with open(output, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(_LENGTH.pack(len(index)))
+        f.write(index)
+        for _, content in entries:
+            f.write(content)
+
+    # The fingerprint is only checked here, so that loading the bundle
+    # doesn't need to read all of it
+    TemplateBundle(output, verify=True).close()
+    return fingerprint
+
+
+class TemplateBundle:
+    """
+    A read-only mapping of a bundle written by `build_bundle`.
+
+    Parameters
+    ----------
+    path : str or `~pathlib.Path`
+        The bundle file
+    verify : bool
+        Whether to check the templates against the bundle's fingerprint,
+        which reads the whole bundle
+
+    Raises
+    ------
+    ValueError
+        If the file isn't a bundle, or doesn't match its fingerprint
+    """
+
+    def __init__(self, path, verify=False):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self.mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = len(_MAGIC) + _LENGTH.size
+        if self._map[:len(_MAGIC)] != _MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a template bundle")
+        index_length, = _LENGTH.unpack(self._map[len(_MAGIC):header])
+        index = json.loads(self._map[header:header + index_length].decode("utf-8"))
+        self.fingerprint = index["fingerprint"]
+        self._start = header + index_length
+        self._templates = index["templates"]
+
+        if verify and _fingerprint((path, self._bytes(path)) for path in sorted(self._templates)) \
+                != self.fingerprint:
+            self.close()
+            raise ValueError(f"{self.path} doesn't match its fingerprint")
+
+    def __contains__(self, path):
+        return path in self._templates
+
+    def __iter__(self):
+        return iter(self._templates)
+
+    def _bytes(self, path):
+        offset, length = self._templates[path]
+        start = self._start + offset
+        return self._map[start:start + length]
+
+    def size(self, path):
+        return self._templates[path][1]
+
+    def is_current(self, path, file_path):
+        """
+        Whether the bundled template at ``path`` can stand in for
+        ``file_path``, i.e. the file is missing, or has the same size and
+        hasn't been modified since the bundle was written
+        """
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return True
+        return stat.st_size == self.size(path) and stat.st_mtime_ns <= self.mtime_ns
+
+    def read(self, path):
+        """The text of the template at ``path``, relative to the package directory"""
+        return self._bytes(path).decode("utf-8")
+
+    def close(self):
+        self._map.close()
+
+
+def template_bundle():
+    """
+    The process's template bundle, or None if there isn't a usable one.
+    The bundle is only looked for once.
+    """
+    global _bundle, _bundle_loaded
+    if not _bundle_loaded:
+        _bundle_loaded = True
+        path = os.environ.get(BUNDLE_ENV, PACKAGE_DIR / BUNDLE_NAME)
+        try:
+            _bundle = TemplateBundle(path)
+        except (OSError, ValueError, KeyError):
+            _bundle = None
+    return _bundle
+
+
+def _read_template(file_path):
+    file_path = Path(os.path.normpath(file_path))
+    try:
+        key = file_path.relative_to(PACKAGE_DIR).as_posix()
+    except ValueError:
+        return file_path.read_text()
+
+    template = _templates.get(key, None)
+    if template is not None:
+        return template
+
+    bundle = template_bundle()
+    if bundle is not None and key in bundle and bundle.is_current(key, file_path):
+        template = bundle.read(key)
+    else:
+        template = file_path.read_text()
+    _templates[key] = template
+    return template
+
+
+def load_template(file_name, path=None, traitlet=False):
+    """
+    Load a template, from the bundle if possible.
+
+    This has the signature of `cosmicds.utils.load_template`: ``file_name``
+    is relative to the directory of ``path``, usually the caller's
+    ``__file__``, and with ``traitlet`` the template is returned as a
+    `~traitlets.Unicode` trait.
+    """
+    file_path = file_name if path is None else os.path.join(os.path.dirname(path), file_name)
+    template = _read_template(file_path)
+    if traitlet:
+        from traitlets import Unicode
+        return Unicode(template)
+    return template
+
+
+def register_components(directory):
+    """
+    Register each ``.vue`` file under ``directory`` with ipyvue, named after
+    its file with underscores replaced by dashes. Each component is only
+    registered once per process.
+    """
+    import ipyvue
+
+    directory = Path(directory)
+    bundle = template_bundle()
+    try:
+        prefix = directory.relative_to(PACKAGE_DIR).as_posix() + "/"
+    except ValueError:
+        prefix = None
+    if bundle is not None and prefix is not None:
+        # The bundle already lists the templates, so the directory needn't be walked
+        comp_paths = [PACKAGE_DIR / key for key in sorted(bundle) if key.startswith(prefix)]
+    else:
+        comp_paths = sorted(path for path in directory.rglob("*.vue") if path.is_file())
+
+    for comp_path in comp_paths:
+        if comp_path in _registered:
+            continue
+        ipyvue.register_component_from_string(
+            name=comp_path.stem.replace('_', '-'),
+            value=_read_template(comp_path))
+        _registered.add(comp_path)
+
+
+if __name__ == "__main__":
+    import sys
+    output = sys.argv[1] if len(sys.argv) > 1 else None
+    print(build_bundle(output=output))
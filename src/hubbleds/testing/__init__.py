@@ -0,0 +1,2 @@
+from .synthetic import *
+from .api_server import *
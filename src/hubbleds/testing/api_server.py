@@ -0,0 +1,273 @@
+import json
+import re
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import parse_qs, unquote, urlparse
+
+import cosmicds.utils
+
+from ..data_management import *
+from ..utils import HUBBLE_ROUTE_PATH
+from .synthetic import SyntheticDataset
+
+__all__ = [
+    'HubbleAPIServer', 'use_local_api',
+]
+
+
+def use_local_api(url):
+    """
+    Point the cosmicds API URL at ``url``. hubbleds builds its API URLs
+    with `~hubbleds.utils.hubble_api_url`, which reads it on every call.
+    Returns the previous URL.
+    """
+    previous = cosmicds.utils.API_URL
+    cosmicds.utils.API_URL = url
+    return previous
+
+
+class HubbleAPIServer:
+    """
+    A localhost stand-in for the hubbles_law routes of the CosmicDS API,
+    serving a `~hubbleds.testing.synthetic.SyntheticDataset`.
+
+    The server runs on a background thread. Writes (submitted measurements,
+    deletions) are kept in memory so that subsequent reads see them.
+
+    Parameters
+    ----------
+    dataset : SyntheticDataset, optional
+        The data to serve. A default-sized dataset is created if not given.
+    latency : float
+        Seconds to wait before answering each request
+    bandwidth : float, optional
+        Bytes per second used to throttle response bodies. No throttling
+        if None.
+    host : str
+        Host to bind to
+    port : int
+        Port to bind to. 0 picks a free port.
+    """
+
+    def __init__(self, dataset=None, latency=0, bandwidth=None,
+                 host="127.0.0.1", port=0):
+        self.dataset = dataset if dataset is not None else SyntheticDataset()
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.request_counts = Counter()
+        self.bytes_sent = 0
+        self.flagged = []
+        self._lock = Lock()
+        self._started = None
+
+        server = self
+
+        class Handler(_RequestHandler):
+            api = server
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def total_requests(self):
+        return sum(self.request_counts.values())
+
+    def request_rate(self):
+        """Requests per second since the server was started"""
+        if self._started is None:
+            return 0
+        elapsed = time.perf_counter() - self._started
+        return self.total_requests / elapsed if elapsed > 0 else 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = Thread(target=self._httpd.serve_forever, daemon=True)
+            self._thread.start()
+            self._started = time.perf_counter()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def reset_stats(self):
+        with self._lock:
+            self.request_counts.clear()
+            self.bytes_sent = 0
+            self._started = time.perf_counter()
+
+    def touch_class(self, class_id):
+        """
+        Bump the last-modified time of a class's measurements, so that the
+        next stage-3-data poll returns them as updated.
+        """
+        now = self.dataset.format_time(datetime.utcnow())
+        for m in self.dataset.measurements(class_id=class_id):
+            m[DB_LAST_MODIFIED_FIELD] = now
+
+    def _record(self, route, nbytes):
+        with self._lock:
+            self.request_counts[route] += 1
+            self.bytes_sent += nbytes
+
+    # Route handlers. Each returns the response body, either as bytes or as
+    # an object to be JSON-encoded.
+
+    def galaxies(self, query):
+        types = query.get("types", [None])[0]
+        return self.dataset.galaxies(types.split(",") if types else None)
+
+    def all_data(self, query):
+        return self.dataset.all_data()
+
+    def sample_galaxy(self, query):
+        return self.dataset.sample_galaxy()
+
+    def sample_measurements(self, query, student_id=None):
+        if student_id is None:
+            return self.dataset.sample_measurements()
+        return {"measurements": self.dataset.sample_measurements(int(student_id))[:2]}
+
+    def measurements(self, query, student_id):
+        return {"measurements": self.dataset.measurements(student_id=int(student_id))}
+
+    def stage_3_data(self, query, student_id, class_id):
+        measurements = self.dataset.measurements(class_id=int(class_id))
+        last_checked = query.get("last_checked", [None])[0]
+        if last_checked is not None:
+            checked = datetime.utcfromtimestamp(int(last_checked) / 1000)
+            parse = self.dataset.parse_time
+            measurements = [m for m in measurements
+                            if parse(m[DB_LAST_MODIFIED_FIELD]) > checked]
+        return {"measurements": measurements}
+
+    def spectra(self, query, folder, filename):
+        return self.dataset.spectrum_bytes(filename)
+
+    def submit_measurement(self, query, body):
+        galaxy = self.dataset.galaxy_by_name(body.get(DB_GALNAME_FIELD, ""))
+        student_id = body.get(DB_STUDENT_ID_FIELD)
+        name = body.get(DB_GALNAME_FIELD)
+        with self._lock:
+            existing = [m for m in self.dataset.measurements(student_id=student_id)
+                        if m.get(DB_GALNAME_FIELD) == name]
+            record = existing[0] if existing else {CLASS_ID_COMPONENT: None}
+            record.update(body)
+            record["galaxy"] = dict(galaxy or {DB_NAME_FIELD: name})
+            record["galaxy_id"] = record["galaxy"].get("id")
+            record[DB_LAST_MODIFIED_FIELD] = self.dataset.format_time(datetime.utcnow())
+            if not existing:
+                self.dataset.add_measurement(record)
+        return {"status": "success"}
+
+    def delete_measurement(self, query, student_id, name):
+        student_id = int(student_id)
+        with self._lock:
+            self.dataset.remove_measurements(
+                lambda m: m[DB_STUDENT_ID_FIELD] == student_id and
+                          m.get(DB_GALNAME_FIELD) == name)
+        return {"status": "success"}
+
+    def mark_bad(self, query, body, kind):
+        with self._lock:
+            self.flagged.append((kind, body))
+        return {"status": "success"}
+
+
+_ROUTES = [
+    ("GET", r"galaxies", "galaxies"),
+    ("GET", r"all-data", "all_data"),
+    ("GET", r"sample-galaxy", "sample_galaxy"),
+    ("GET", r"sample-measurements(?:/(?P<student_id>\d+))?", "sample_measurements"),
+    ("GET", r"measurements/(?P<student_id>\d+)", "measurements"),
+    ("GET", r"stage-3-data/(?P<student_id>\d+)/(?P<class_id>\d+)", "stage_3_data"),
+    ("GET", r"spectra/(?P<folder>[^/]+)/(?P<filename>[^/]+)", "spectra"),
+    ("PUT", r"submit-measurement", "submit_measurement"),
+    ("PUT", r"sample-measurement", "submit_measurement"),
+    ("DELETE", r"measurement/(?P<student_id>\d+)/(?P<name>[^/]+)", "delete_measurement"),
+    ("PUT", r"mark-(?P<kind>galaxy|spectrum|tileload)-bad", "mark_bad"),
+    ("POST", r"mark-(?P<kind>galaxy|spectrum|tileload)-bad", "mark_bad"),
+]
+
+_COMPILED_ROUTES = [
+    (method, re.compile(f"^/{HUBBLE_ROUTE_PATH}/{pattern}$"), handler)
+    for method, pattern, handler in _ROUTES
+]
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+    api = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        for route_method, pattern, handler in _COMPILED_ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.match(parsed.path)
+            if match is None:
+                continue
+            kwargs = {k: unquote(v) for k, v in match.groupdict().items() if v is not None}
+            if method in ("PUT", "POST"):
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length) if length else b""
+                kwargs["body"] = json.loads(raw) if raw else {}
+            result = getattr(self.api, handler)(query, **kwargs)
+            self._respond(handler, result)
+            return
+        self._respond(None, {"error": "Not found"}, status=404)
+
+    def _respond(self, route, result, status=200):
+        if isinstance(result, bytes):
+            body, content_type = result, "application/fits"
+        else:
+            body, content_type = json.dumps(result).encode(), "application/json"
+
+        api = self.api
+        delay = api.latency
+        if api.bandwidth:
+            delay += len(body) / api.bandwidth
+        if delay > 0:
+            time.sleep(delay)
+        api._record(route, len(body))
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
@@ -0,0 +1,260 @@
+"""
+Headless load test for the Hubble's Law story.
+
+Creates N sessions of the story against a local `HubbleAPIServer`, scripts
+student actions through the stage APIs, and reports per-action latency
+percentiles, memory per session, thread count and API request rate as JSON.
+
+Usage::
+
+    python -m hubbleds.testing.load_test --sessions 20 --rounds 3 \\
+        --latency 0.02 --output load_test.json
+"""
+
+import argparse
+import json
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+
+from ..data_management import *
+from .api_server import HubbleAPIServer, use_local_api
+from .synthetic import SyntheticDataset
+
+__all__ = [
+    'LoadTest', 'current_rss',
+]
+
+PERCENTILES = (50, 95, 99)
+
+
+def current_rss():
+    """Resident set size of this process, in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize()
+    except OSError:
+        # ru_maxrss is the peak, in kB on Linux and bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def default_session_factory(student_id, class_id):
+    """
+    Create an application for the given student and return it along with
+    its `HubblesLaw` story.
+    """
+    from cosmicds.app import Application
+    app = Application(story='hubbles_law', update_db=False,
+                      show_team_interface=False, allow_advancing=True,
+                      create_new_student=False, student_id=student_id)
+    story = app.story_state
+    story.student_user = {"id": student_id}
+    story.classroom = {"id": class_id}
+    return app, story
+
+
+class LoadTest:
+    """
+    Parameters
+    ----------
+    n_sessions : int
+        Number of concurrent story sessions to hold
+    rounds : int
+        Number of times the scripted student actions are run per session
+    dataset : SyntheticDataset, optional
+        Data for the stand-in API server
+    latency : float
+        Latency injected by the API server, in seconds
+    bandwidth : float, optional
+        Bandwidth cap of the API server, in bytes per second
+    session_factory : callable, optional
+        Called as ``session_factory(student_id, class_id)`` and returns
+        ``(app, story)``. Defaults to creating a cosmicds ``Application``.
+    seed : int
+        Seed for choosing the galaxies and measured values
+    """
+
+    def __init__(self, n_sessions=10, rounds=3, dataset=None, latency=0,
+                 bandwidth=None, session_factory=None, seed=0):
+        self.n_sessions = n_sessions
+        self.rounds = rounds
+        self.dataset = dataset if dataset is not None else SyntheticDataset()
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.session_factory = session_factory or default_session_factory
+        self.rng = np.random.default_rng(seed)
+        self.timings = defaultdict(list)
+        self.sessions = []
+
+    @contextmanager
+    def timed(self, action):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[action].append(time.perf_counter() - start)
+
+    def _student(self, index):
+        per_class = self.dataset.students_per_class
+        student_id = self.dataset.n_students + index + 1
+        class_id = index // per_class + 1
+        return student_id, class_id
+
+    def create_sessions(self):
+        rss = []
+        for index in range(self.n_sessions):
+            student_id, class_id = self._student(index)
+            before = current_rss()
+            # Creating the application also sets the story up for the student
+            with self.timed("create_session"):
+                app, story = self.session_factory(student_id, class_id)
+            rss.append(current_rss() - before)
+            self.sessions.append((app, story, story.stage_instances))
+        return rss
+
+    def _galaxy(self):
+        galaxies = self.dataset.galaxies()
+        galaxy = dict(galaxies[self.rng.integers(len(galaxies))])
+        galaxy["name"] = galaxy["name"][:-len(SPECTRUM_EXTENSION)]
+        return galaxy
+
+    def run_round(self, app, story, stages):
+        stage_one = stages.get(1)
+        if stage_one is not None:
+            galaxy = self._galaxy()
+            # Selecting a galaxy only starts its spectrum loading, so the
+            # timing runs until the spectrum is ready to be shown
+            with self.timed("select_galaxy"):
+                stage_one._on_galaxy_selected(galaxy)
+                story.load_spectrum_data(galaxy["name"], galaxy["type"])
+
+            measurements = story.data_collection[STUDENT_MEASUREMENTS_LABEL]
+            index = measurements.size - 1
+            if index >= 0:
+                measwave = float(self.rng.uniform(6600, 7200))
+                with self.timed("measure_wavelength"):
+                    stage_one.update_data_value(STUDENT_MEASUREMENTS_LABEL,
+                                                MEASWAVE_COMPONENT, measwave, index)
+
+                angsize = float(self.rng.uniform(10, 60))
+                with self.timed("measure_angular_size"):
+                    stage_one.update_data_value(STUDENT_MEASUREMENTS_LABEL,
+                                                ANGULAR_SIZE_COMPONENT, angsize, index)
+
+        with self.timed("fetch_class_data"):
+            story.fetch_class_data()
+
+    def run(self):
+        with HubbleAPIServer(self.dataset, latency=self.latency,
+                             bandwidth=self.bandwidth) as server:
+            previous_url = use_local_api(server.url)
+            try:
+                baseline_rss = current_rss()
+                baseline_threads = threading.active_count()
+                session_rss = self.create_sessions()
+                setup_requests = server.total_requests
+
+                server.reset_stats()
+                start = time.perf_counter()
+                for _ in range(self.rounds):
+                    for app, story, stages in self.sessions:
+                        self.run_round(app, story, stages)
+                        # Simulate classmates submitting new measurements
+                        server.touch_class(story.classroom["id"])
+                elapsed = time.perf_counter() - start
+
+                return self.report(
+                    baseline_rss=baseline_rss,
+                    session_rss=session_rss,
+                    threads=threading.active_count() - baseline_threads,
+                    setup_requests=setup_requests,
+                    requests=dict(server.request_counts),
+                    request_rate=server.total_requests / elapsed if elapsed > 0 else 0,
+                    elapsed=elapsed,
+                )
+            finally:
+                self.close()
+                use_local_api(previous_url)
+
+    def close(self):
+        for app, story, stages in self.sessions:
+            timer = getattr(story, "class_data_timer", None)
+            if timer is not None:
+                timer.stop()
+        self.sessions = []
+
+    def report(self, baseline_rss, session_rss, threads, setup_requests,
+               requests, request_rate, elapsed):
+        actions = {}
+        for action, times in self.timings.items():
+            ms = np.asarray(times) * 1000
+            stats = {f"p{p}_ms": float(np.percentile(ms, p)) for p in PERCENTILES}
+            stats.update(count=len(times), mean_ms=float(ms.mean()))
+            actions[action] = stats
+
+        total_rss = current_rss() - baseline_rss
+        return {
+            "sessions": self.n_sessions,
+            "rounds": self.rounds,
+            "latency_s": self.latency,
+            "bandwidth_bps": self.bandwidth,
+            "dataset": {
+                "galaxies": self.dataset.n_galaxies,
+                "classes": self.dataset.n_classes,
+                "students_per_class": self.dataset.students_per_class,
+                "measurements_per_student": self.dataset.measurements_per_student,
+            },
+            "actions": actions,
+            "rss_bytes": {
+                "baseline": baseline_rss,
+                "total_increase": total_rss,
+                "per_session_mean": total_rss / max(self.n_sessions, 1),
+                "per_session_at_creation": session_rss,
+            },
+            "threads_added": threads,
+            "api": {
+                "setup_requests": setup_requests,
+                "requests": requests,
+                "requests_per_second": request_rate,
+                "elapsed_s": elapsed,
+            },
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--bandwidth", type=float, default=None)
+    parser.add_argument("--galaxies", type=int, default=1000)
+    parser.add_argument("--classes", type=int, default=50)
+    parser.add_argument("--students-per-class", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None,
+                        help="File to write the JSON report to (default: stdout)")
+    args = parser.parse_args(argv)
+
+    dataset = SyntheticDataset(n_galaxies=args.galaxies, n_classes=args.classes,
+                               students_per_class=args.students_per_class,
+                               seed=args.seed)
+    load_test = LoadTest(n_sessions=args.sessions, rounds=args.rounds,
+                         dataset=dataset, latency=args.latency,
+                         bandwidth=args.bandwidth, seed=args.seed)
+    report = json.dumps(load_test.run(), indent=2)
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, "w") as f:
+            f.write(report)
+
+
+if __name__ == "__main__":
+    main()
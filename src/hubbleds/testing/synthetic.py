@@ -0,0 +1,252 @@
+from datetime import datetime, timedelta
+from io import BytesIO
+from zlib import crc32
+
+import numpy as np
+from astropy.io import fits
+
+from ..data_management import *
+from ..utils import AGE_CONSTANT, DISTANCE_CONSTANT, H_ALPHA_REST_LAMBDA, \
+    MG_REST_LAMBDA, SPEED_OF_LIGHT
+
+__all__ = [
+    'SyntheticDataset',
+]
+
+_GALAXY_TYPES = ["Sp", "E", "Ir"]
+_ELEMENTS = {"Sp": "H-α", "E": "Mg-I", "Ir": "H-α"}
+_REST_WAVES = {"H-α": H_ALPHA_REST_LAMBDA, "Mg-I": MG_REST_LAMBDA}
+_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+
+
+class SyntheticDataset:
+    """
+    Synthetic galaxies, measurements, summaries and spectra shaped like the
+    responses of the hubbles_law API routes.
+
+    Everything is generated deterministically from ``seed``, so that two
+    datasets with the same parameters are identical.
+
+    Parameters
+    ----------
+    n_galaxies : int
+        Number of galaxies in the catalog
+    n_classes : int
+        Number of classes in the all-data response
+    students_per_class : int
+        Number of students in each class
+    measurements_per_student : int
+        Number of measurements made by each student
+    n_sample_measurements : int
+        Number of seed measurements of the example galaxy
+    spectrum_points : int
+        Number of wavelength samples in each spectrum
+    seed : int
+        Seed for the random number generator
+    """
+
+    H0 = 70  # km/s/Mpc
+
+    def __init__(self, n_galaxies=1000, n_classes=50, students_per_class=25,
+                 measurements_per_student=5, n_sample_measurements=200,
+                 spectrum_points=3800, seed=42):
+        self.n_galaxies = n_galaxies
+        self.n_classes = n_classes
+        self.students_per_class = students_per_class
+        self.measurements_per_student = measurements_per_student
+        self.n_sample_measurements = n_sample_measurements
+        self.spectrum_points = spectrum_points
+        self.seed = seed
+        self.base_time = datetime(2023, 1, 1)
+
+        rng = np.random.default_rng(seed)
+        self._galaxies = self._make_galaxies(rng)
+        self._measurements = self._make_measurements(rng)
+        self._spectrum_cache = {}
+
+    @property
+    def n_students(self):
+        return self.n_classes * self.students_per_class
+
+    def _make_galaxies(self, rng):
+        n = self.n_galaxies
+        types = rng.choice(_GALAXY_TYPES, size=n, p=[0.6, 0.3, 0.1])
+        plates = rng.integers(266, 3000, size=n)
+        mjds = rng.integers(51600, 54600, size=n)
+        fibers = rng.integers(1, 640, size=n)
+        ras = rng.uniform(0, 360, size=n)
+        decs = np.degrees(np.arcsin(rng.uniform(-0.2, 1, size=n)))
+        zs = rng.uniform(0.005, 0.1, size=n)
+        return [
+            {
+                "id": i + 1,
+                "name": f"spec-{plates[i]:04d}-{mjds[i]}-{fibers[i]:04d}.fits",
+                "ra": float(ras[i]),
+                "decl": float(decs[i]),
+                "z": float(zs[i]),
+                "type": str(types[i]),
+                "element": _ELEMENTS[str(types[i])],
+            }
+            for i in range(n)
+        ]
+
+    def _measurement(self, rng, student_id, class_id, galaxy, minutes):
+        rest = _REST_WAVES[galaxy["element"]]
+        z = galaxy["z"] * (1 + rng.normal(0, 0.02))
+        velocity = round(z * SPEED_OF_LIGHT)
+        distance = round(velocity / self.H0 * (1 + rng.normal(0, 0.1)))
+        ang_size = max(1, round(DISTANCE_CONSTANT / max(distance, 1)))
+        return {
+            DB_STUDENT_ID_FIELD: student_id,
+            CLASS_ID_COMPONENT: class_id,
+            "galaxy_id": galaxy["id"],
+            DB_GALNAME_FIELD: galaxy["name"],
+            DB_RESTWAVE_FIELD: rest,
+            DB_RESTWAVE_UNIT_FIELD: "angstrom",
+            DB_MEASWAVE_FIELD: round(rest * (1 + z)),
+            DB_MEASWAVE_UNIT_FIELD: "angstrom",
+            DB_VELOCITY_FIELD: velocity,
+            DB_VELOCITY_UNIT_FIELD: "km / s",
+            DB_ANGSIZE_FIELD: ang_size,
+            DB_ANGSIZE_UNIT_FIELD: "arcsecond",
+            DB_DISTANCE_FIELD: distance,
+            DB_DISTANCE_UNIT_FIELD: "Mpc",
+            DB_LAST_MODIFIED_FIELD: self.timestamp(minutes),
+            "galaxy": dict(galaxy),
+        }
+
+    def _make_measurements(self, rng):
+        measurements = []
+        nper = self.measurements_per_student
+        student_id = 0
+        for class_id in range(1, self.n_classes + 1):
+            for _ in range(self.students_per_class):
+                student_id += 1
+                indices = rng.choice(self.n_galaxies, size=nper, replace=False)
+                for index in indices:
+                    minutes = int(rng.integers(0, 60 * 24 * 30))
+                    measurements.append(self._measurement(
+                        rng, student_id, class_id, self._galaxies[index], minutes))
+        return measurements
+
+    def timestamp(self, minutes=0):
+        return self.format_time(self.base_time + timedelta(minutes=minutes))
+
+    @staticmethod
+    def format_time(time):
+        return time.strftime(_TIME_FORMAT)
+
+    @staticmethod
+    def parse_time(text):
+        return datetime.strptime(text, _TIME_FORMAT)
+
+    def galaxies(self, types=None):
+        if types is None:
+            return self._galaxies
+        types = set(types)
+        return [g for g in self._galaxies if g["type"] in types]
+
+    def galaxy_by_name(self, name):
+        if not name.endswith(SPECTRUM_EXTENSION):
+            name += SPECTRUM_EXTENSION
+        return next((g for g in self._galaxies if g["name"] == name), None)
+
+    def measurements(self, student_id=None, class_id=None):
+        return [
+            m for m in self._measurements
+            if (student_id is None or m[DB_STUDENT_ID_FIELD] == student_id) and
+               (class_id is None or m[CLASS_ID_COMPONENT] == class_id)
+        ]
+
+    def add_measurement(self, measurement):
+        self._measurements.append(measurement)
+
+    def remove_measurements(self, predicate):
+        self._measurements[:] = [m for m in self._measurements if not predicate(m)]
+
+    def _summaries(self, key):
+        dists, vels = {}, {}
+        for m in self._measurements:
+            k = m[key]
+            dists.setdefault(k, []).append(m[DB_DISTANCE_FIELD])
+            vels.setdefault(k, []).append(m[DB_VELOCITY_FIELD])
+        summaries = []
+        for k in dists:
+            d = np.asarray(dists[k], dtype=float)
+            v = np.asarray(vels[k], dtype=float)
+            h0 = float((d * v).sum() / (d * d).sum())
+            summaries.append({
+                key: k,
+                DB_H0_FIELD: round(h0, 2),
+                DB_AGE_FIELD: round(AGE_CONSTANT / h0, 2),
+            })
+        return summaries
+
+    def all_data(self):
+        measurements = []
+        for m in self._measurements:
+            measurements.append({
+                DB_STUDENT_ID_FIELD: m[DB_STUDENT_ID_FIELD],
+                CLASS_ID_COMPONENT: m[CLASS_ID_COMPONENT],
+                DB_VELOCITY_FIELD: m[DB_VELOCITY_FIELD],
+                DB_DISTANCE_FIELD: m[DB_DISTANCE_FIELD],
+                "galaxy": {"id": m["galaxy_id"]},
+                "student": {"id": m[DB_STUDENT_ID_FIELD]},
+            })
+        return {
+            "measurements": measurements,
+            "studentData": self._summaries(DB_STUDENT_ID_FIELD),
+            "classData": self._summaries(CLASS_ID_COMPONENT),
+        }
+
+    def sample_galaxy(self):
+        return dict(next(g for g in self._galaxies if g["type"] == "Sp"))
+
+    def sample_measurements(self, student_id=None):
+        rng = np.random.default_rng(self.seed + 1)
+        galaxy = self.sample_galaxy()
+        records = []
+        n = self.n_sample_measurements
+        for i in range(n):
+            sid = student_id if student_id is not None else 100000 + i // 2
+            m = self._measurement(rng, sid, 0, galaxy, i)
+            m.update({
+                "id": sid,
+                DB_MEASNUM_FIELD: "first" if i % 2 == 0 else "second",
+                DB_BRIGHT_FIELD: 1.0,
+            })
+            records.append(m)
+        return records
+
+    def spectrum_bytes(self, name):
+        """
+        Return an SDSS-style spectrum FITS file for the named galaxy, with
+        the emission line placed at the galaxy's redshift.
+        """
+        if name in self._spectrum_cache:
+            return self._spectrum_cache[name]
+
+        galaxy = self.galaxy_by_name(name)
+        z = galaxy["z"] if galaxy is not None else 0.03
+        element = galaxy["element"] if galaxy is not None else "H-α"
+        rng = np.random.default_rng(crc32(name.encode()))
+
+        loglam = np.linspace(3.58, 3.96, self.spectrum_points).astype(np.float32)
+        lam = 10 ** loglam.astype(float)
+        line = _REST_WAVES[element] * (1 + z)
+        flux = 10 + 0.002 * (lam - lam[0]) + rng.normal(0, 0.5, lam.size)
+        flux += 40 * np.exp(-0.5 * ((lam - line) / 3) ** 2)
+        ivar = np.full(lam.size, 4, dtype=np.float32)
+
+        coadd = fits.BinTableHDU.from_columns([
+            fits.Column(name="flux", format="E", array=flux.astype(np.float32)),
+            fits.Column(name="loglam", format="E", array=loglam),
+            fits.Column(name="ivar", format="E", array=ivar),
+            fits.Column(name="model", format="E", array=flux.astype(np.float32)),
+        ], name="COADD")
+        hdulist = fits.HDUList([fits.PrimaryHDU(), coadd])
+        f = BytesIO()
+        hdulist.writeto(f)
+        content = f.getvalue()
+        self._spectrum_cache[name] = content
+        return content
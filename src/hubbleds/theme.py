@@ -0,0 +1,95 @@
+from contextlib import ExitStack
+from functools import lru_cache
+from weakref import WeakKeyDictionary
+
+from echo import add_callback
+
+from .attached import attached
+from .data.styles import load_style
+
+__all__ = ['ThemeService']
+
+
+@lru_cache(maxsize=None)
+def _style_payload(viewer_type, dark):
+    """
+    The traits that a style sets, as ``(figure, axes, marks, layer_state)``:
+    the figure's traits, a list of traits for each axis, the traits of each
+    layer artist mark by attribute name, and the traits of each layer state.
+    Each payload is built once per process and never modified.
+    """
+    theme_name = "dark" if dark else "light"
+    style = load_style(f"default_{viewer_type}_{theme_name}")
+    if style is None:
+        return None
+    figure = dict(style.get("figure", {}))
+    axes = figure.pop("axes", [])
+    marks = dict(style.get("viewer", {}))
+    layer_state = marks.pop("state", {})
+    return figure, axes, marks, layer_state
+
+
+class ThemeService:
+    """
+    Applies the light and dark viewer styles for an application.
+
+    Stages register their viewers with `style_viewers`. When the app's
+    ``dark_mode`` changes, the service restyles every registered viewer in
+    one pass, holding the sync of all of the figures, axes and marks so
+    that each widget sends a single update. The traits each style sets are
+    worked out once per (viewer type, theme), and shared by every viewer.
+    """
+
+    _APP_STATE_ATTRIBUTE = "_hubbleds_theme_service"
+
+    def __init__(self, app_state):
+        self._viewers = WeakKeyDictionary()
+        add_callback(app_state, 'dark_mode', self._on_dark_mode_change)
+
+    @classmethod
+    def for_app_state(cls, app_state):
+        return attached(app_state, cls._APP_STATE_ATTRIBUTE, cls)
+
+    def style_viewers(self, viewers, viewer_types, dark):
+        """
+        Register ``viewers`` with the service and apply the theme to them,
+        including any layers added since they were last styled.
+        """
+        for viewer, viewer_type in zip(viewers, viewer_types):
+            self._viewers[viewer] = viewer_type
+        self._apply(viewers, dark)
+
+    def _apply(self, viewers, dark):
+        styled = []
+        for viewer in viewers:
+            payload = _style_payload(self._viewers[viewer], dark)
+            if payload is not None:
+                styled.append((viewer, payload))
+
+        with ExitStack() as stack:
+            for viewer, (_, _, marks, _) in styled:
+                widgets = [viewer.figure] + list(viewer.figure.axes)
+                for layer in viewer.layers:
+                    widgets.extend(getattr(layer, name, None) for name in marks)
+                for widget in widgets:
+                    if widget is not None:
+                        stack.enter_context(widget.hold_sync())
+
+            for viewer, (figure, axes, marks, layer_state) in styled:
+                self._set(viewer.figure, figure)
+                for axis, traits in zip(viewer.figure.axes, axes):
+                    self._set(axis, traits)
+                for layer in viewer.layers:
+                    for name, traits in marks.items():
+                        self._set(getattr(layer, name, None), traits)
+                    self._set(layer.state, layer_state)
+
+    @staticmethod
+    def _set(target, traits):
+        if target is None:
+            return
+        for name, value in traits.items():
+            setattr(target, name, value)
+
+    def _on_dark_mode_change(self, dark):
+        self._apply(list(self._viewers), dark)
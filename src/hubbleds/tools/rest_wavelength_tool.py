@@ -3,6 +3,7 @@ from echo import add_callback, CallbackProperty
 from glue.config import viewer_tool
 from glue.viewers.common.tool import CheckableTool
 
+from ..mark_manager import FigureMarkManager
 from ..utils import H_ALPHA_REST_LAMBDA, MG_REST_LAMBDA
 
 
@@ -64,13 +65,12 @@ class RestWavelengthTool(CheckableTool):
             element_string + self.observed_text]
         self.active = True
         self._on_view_change()
-        self.viewer.figure.marks = self.viewer.figure.marks + self.marks
+        FigureMarkManager.for_figure(self.viewer.figure).add(self.marks)
         self.lambda_used = True
         self.lambda_on = True
 
     def deactivate(self):
-        self.viewer.figure.marks = [mark for mark in self.viewer.figure.marks
-                                    if mark not in self.marks]
+        FigureMarkManager.for_figure(self.viewer.figure).remove(self.marks)
         self.viewer.element_label.text = [f"{self.viewer.element} (observed)"]
         self.active = False
         self.lambda_on = False
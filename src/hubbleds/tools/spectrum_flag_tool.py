@@ -1,10 +1,9 @@
 import requests
-from cosmicds.utils import API_URL
 from echo import CallbackProperty
 from glue.config import viewer_tool
 from glue.viewers.common.tool import Tool
 
-from ..utils import HUBBLE_ROUTE_PATH
+from ..utils import hubble_api_url
 
 
 @viewer_tool
@@ -21,6 +20,6 @@ class SpectrumFlagTool(Tool):
         if not galaxy_name.endswith(".fits"):
             galaxy_name += ".fits"
         data = {"galaxy_name": galaxy_name}
-        requests.post(f"{API_URL}/{HUBBLE_ROUTE_PATH}/mark-spectrum-bad",
+        requests.post(f"{hubble_api_url()}/mark-spectrum-bad",
                       json=data)
         self.flagged = True
@@ -3,6 +3,7 @@ from astropy.modeling import models, fitting
 from numpy import pi
 from bqplot.marks import Lines
 from bqplot.scales import LinearScale
+import cosmicds.utils
 from glue_jupyter.bqplot.histogram.layer_artist import \
     BqplotHistogramLayerArtist
 from glue_jupyter.bqplot.scatter.layer_artist import BqplotScatterLayerArtist
@@ -13,7 +14,7 @@ except ImportError:
     from astropy.cosmology import Planck15 as planck
 
 __all__ = [
-    'HUBBLE_ROUTE_PATH',
+    'HUBBLE_ROUTE_PATH', 'hubble_api_url',
     'MILKY_WAY_SIZE_MPC', 'H_ALPHA_REST_LAMBDA',
     'MG_REST_LAMBDA', 'GALAXY_FOV', 'FULL_FOV',
     'angle_to_json', 'angle_from_json',
@@ -23,6 +24,15 @@ __all__ = [
 
 HUBBLE_ROUTE_PATH = "hubbles_law"
 
+
+def hubble_api_url():
+    """
+    The base URL of the Hubble's Law API routes. The cosmicds API URL is
+    read on every call, so pointing it elsewhere takes effect everywhere.
+    """
+    return f"{cosmicds.utils.API_URL}/{HUBBLE_ROUTE_PATH}"
+
+
 MILKY_WAY_SIZE_LTYR = 100000 * u.lightyear
 MILKY_WAY_SIZE_MPC = MILKY_WAY_SIZE_LTYR.to(u.Mpc).value
 DISTANCE_CONSTANT = round(
@@ -0,0 +1,91 @@
+import weakref
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from glue.core import HubListener
+from glue.core.exceptions import IncompatibleAttribute
+from glue.core.message import ComponentsChangedMessage, NumericalDataChangedMessage, \
+    SubsetUpdateMessage
+
+from ..attached import attached
+
+__all__ = ['DataVersions']
+
+
+class DataVersions(HubListener):
+    """
+    Counts the changes the hub reports to each of its datasets, so that
+    results computed from a dataset can be reused until its version changes.
+
+    A dataset's version is bumped whenever its values or components change,
+    or the state of one of its subsets does. Use `for_hub` or `for_data` to
+    get the instance for a hub. The minimum, maximum and count of a layer's
+    values are kept until its data's version changes, see `statistics`.
+    """
+
+    _HUB_ATTRIBUTE = "_hubbleds_data_versions"
+
+    def __init__(self, hub):
+        self._versions = WeakKeyDictionary()
+        self._statistics = WeakKeyDictionary()
+        # Versions need to be bumped before any other handlers use them
+        hub.subscribe(self, NumericalDataChangedMessage, handler=self._bump, priority=1000)
+        hub.subscribe(self, ComponentsChangedMessage, handler=self._bump, priority=1000)
+        hub.subscribe(self, SubsetUpdateMessage, handler=self._bump_subset,
+                      filter=lambda message: message.attribute == 'subset_state',
+                      priority=1000)
+
+    @classmethod
+    def for_hub(cls, hub):
+        return attached(hub, cls._HUB_ATTRIBUTE, cls)
+
+    @classmethod
+    def for_data(cls, data):
+        """
+        The instance for the hub of ``data``, or None if ``data`` isn't
+        attached to a hub, in which case its changes can't be tracked.
+        """
+        if data.hub is None:
+            return None
+        return cls.for_hub(data.hub)
+
+    def _bump(self, message):
+        self._versions[message.data] = self.version(message.data) + 1
+
+    def _bump_subset(self, message):
+        data = message.subset.data
+        self._versions[data] = self.version(data) + 1
+
+    def version(self, data):
+        return self._versions.get(data, 0)
+
+    def statistics(self, layer, attribute, positive=False):
+        """
+        Return ``(minimum, maximum, count)`` of the finite values of
+        ``attribute`` in ``layer``, a dataset or subset attached to this hub.
+        Only positive values are counted if ``positive`` is True. The
+        minimum and maximum are None if there are no such values.
+        """
+        version = self.version(layer.data)
+        entries = self._statistics.setdefault(layer, {})
+        key = (id(attribute), positive)
+        entry = entries.get(key, None)
+        if entry is not None:
+            ref, cached_version, statistics = entry
+            if cached_version == version and ref() is attribute:
+                return statistics
+
+        try:
+            values = np.asarray(layer[attribute], dtype=float)
+        except IncompatibleAttribute:
+            values = np.empty(0)
+        keep = np.isfinite(values)
+        if positive:
+            keep &= values > 0
+        values = values[keep]
+        if values.size == 0:
+            statistics = (None, None, 0)
+        else:
+            statistics = (float(values.min()), float(values.max()), int(values.size))
+        entries[key] = (weakref.ref(attribute), version, statistics)
+        return statistics
@@ -0,0 +1,170 @@
+from collections import OrderedDict
+from functools import partial
+import weakref
+
+from echo import delay_callback
+import numpy as np
+
+from .data_versions import DataVersions
+
+__all__ = ['LinkedDotPlotBinning']
+
+
+class LinkedDotPlotBinning:
+    """
+    Shared binning for dot plots whose x axes are linked, either directly or
+    through the reciprocal transform ``x -> constant / x`` (e.g. distance and
+    angular size).
+
+    A change to the x limits of any linked viewer state is converted to the
+    primary axis once and then pushed to every other state in a single
+    delayed update, so that each viewer rebins once per limits change rather
+    than once per linked limit. Bin edges are cached per set of limits and
+    shared between the states that have the same binning, and so are the
+    histograms of layers that are shown on more than one of those states.
+
+    Histograms aren't mapped between reciprocal axes: the stored distances
+    are rounded from the angular sizes, so the counts of one axis can't be
+    found exactly from those of the other.
+
+    Parameters
+    ----------
+    primary : `~glue.viewers.histogram.state.HistogramViewerState`
+        The state whose x axis the others are defined relative to
+    constant : float
+        The constant of the reciprocal transform
+    max_cached : int
+        The number of sets of bin edges, and of histograms, to keep
+    """
+
+    def __init__(self, primary, constant, max_cached=16):
+        self.primary = primary
+        self.constant = constant
+        self.max_cached = max_cached
+        self._reciprocal = {}
+        self._states = []
+        self._edges = {}
+        self._histograms = OrderedDict()
+        self._syncing = False
+        self.hits = 0
+        self.misses = 0
+        self._attach(primary, reciprocal=False)
+
+    def _attach(self, state, reciprocal):
+        self._states.append(state)
+        self._reciprocal[id(state)] = reciprocal
+        state.binning = self
+        callback = partial(self._on_limits_changed, state)
+        state.add_callback('x_min', callback)
+        state.add_callback('x_max', callback)
+
+    def link(self, state, reciprocal=False):
+        """
+        Link the x limits of ``state`` to those of the primary state.
+        ``state`` immediately takes on the primary's limits.
+        """
+        self._attach(state, reciprocal)
+        self._push(self.primary)
+
+    def _transform(self, state, xmin, xmax):
+        if not self._reciprocal[id(state)]:
+            return xmin, xmax
+        # Reciprocal limits swap ends; a non-positive limit has no image
+        if xmin is None or xmax is None or xmin <= 0 or xmax <= 0:
+            return None
+        return self.constant / xmax, self.constant / xmin
+
+    def _on_limits_changed(self, source, *args):
+        if not self._syncing:
+            self._push(source)
+
+    def _push(self, source):
+        # The transform is its own inverse, so the source limits can be
+        # taken to the primary axis and from there to every other state
+        limits = self._transform(source, source.x_min, source.x_max)
+        if limits is None or None in limits:
+            return
+        self._syncing = True
+        try:
+            for state in self._states:
+                if state is source:
+                    continue
+                target = self._transform(state, *limits)
+                if target is None or target == (state.x_min, state.x_max):
+                    continue
+                with delay_callback(state, 'x_min', 'x_max'):
+                    state.x_min, state.x_max = target
+        finally:
+            self._syncing = False
+
+    @staticmethod
+    def _key(state):
+        return (state.hist_x_min, state.hist_x_max, state.hist_n_bin, state.x_log)
+
+    def bins(self, state, compute):
+        """
+        Return the bin edges of ``state``. ``compute`` is only called if no
+        linked state has used the same binning since it last changed.
+        """
+        key = self._key(state)
+        edges = self._edges.get(key, None)
+        if edges is not None:
+            self.hits += 1
+            return edges
+        self.misses += 1
+        if len(self._edges) >= self.max_cached:
+            self._edges.pop(next(iter(self._edges)))
+        edges = np.array(compute())
+        edges.setflags(write=False)
+        self._edges[key] = edges
+        return edges
+
+    def histogram(self, layer_state, compute):
+        """
+        Return the ``(edges, counts)`` histogram of a dot plot layer.
+        ``compute`` is only called if no linked state has shown the same
+        layer, with the same attribute and binning, since its data changed.
+        """
+        state = layer_state.viewer_state
+        layer = layer_state.layer
+        versions = DataVersions.for_data(layer.data)
+        if versions is None:
+            self.misses += 1
+            return compute()
+
+        refs = (layer, state.x_att)
+        key = (tuple(id(ref) for ref in refs), self._key(state),
+               getattr(state, 'random_subset', None))
+        version = versions.version(layer.data)
+        entry = self._histograms.get(key, None)
+        if entry is not None:
+            cached_refs, cached_version, histogram = entry
+            if cached_version == version and all(cached() is ref for cached, ref in zip(cached_refs, refs)):
+                self._histograms.move_to_end(key)
+                self.hits += 1
+                return histogram
+
+        self.misses += 1
+        histogram = compute()
+        self._histograms[key] = (tuple(weakref.ref(ref) for ref in refs), version, histogram)
+        while len(self._histograms) > self.max_cached:
+            self._histograms.popitem(last=False)
+        return histogram
+
+    @staticmethod
+    def bin_center(bins, x):
+        """
+        Return the centre of the bin of ``bins`` containing ``x``, assuming
+        uniform bins. Values outside of the bins are placed on the same grid.
+        """
+        bin_width = bins[1] - bins[0]
+        index = int((x - bins[0]) / bin_width)
+        return bins[0] + bin_width * (index + 1/2)
+
+    def binned_x(self, state, x):
+        """Place ``x`` at the centre of its bin in ``state``'s binning"""
+        bins = state.bins
+        if state.x_log:
+            index = np.clip(np.searchsorted(bins, x, side='right') - 1, 0, len(bins) - 2)
+            return np.sqrt(bins[index] * bins[index + 1])
+        return self.bin_center(bins, x)
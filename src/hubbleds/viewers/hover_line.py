@@ -0,0 +1,149 @@
+import time
+
+from echo import add_callback
+from ipyvuetify import VuetifyTemplate
+from ipywidgets import DOMWidget, widget_serialization
+from traitlets import Bool, Dict, Float, Instance, Int, Unicode, dlink
+
+from ..mark_manager import FigureMarkManager
+from ..template_bundle import load_template
+
+__all__ = ['HoverLineOverlay', 'HoverLineViewerMixin']
+
+
+class HoverLineOverlay(VuetifyTemplate):
+    """
+    Wraps a viewer's figure and draws a vertical line and label that follow
+    the cursor. The line is drawn entirely in the browser; Python only
+    sends the axis limits and figure margins when they change. When the
+    cursor isn't over the figure, the line is drawn at ``value``, if set.
+    """
+
+    template = load_template("hover_line.vue", __file__, traitlet=True).tag(sync=True)
+    figure = Instance(DOMWidget).tag(sync=True, **widget_serialization)
+    enabled = Bool(False).tag(sync=True)
+    visible = Bool(True).tag(sync=True)
+    value = Float(None, allow_none=True).tag(sync=True)
+    show_label = Bool(True).tag(sync=True)
+    color = Unicode("#000000").tag(sync=True)
+    x_min = Float(None, allow_none=True).tag(sync=True)
+    x_max = Float(None, allow_none=True).tag(sync=True)
+    margin = Dict({"top": 0, "bottom": 0, "left": 0, "right": 0}).tag(sync=True)
+    precision = Int(0).tag(sync=True)
+    unit = Unicode("").tag(sync=True)
+
+    def __init__(self, viewer, *args, **kwargs):
+        super().__init__(*args, figure=viewer.figure, **kwargs)
+        self.viewer = viewer
+        add_callback(viewer.state, 'x_min', self._update_limits)
+        add_callback(viewer.state, 'x_max', self._update_limits)
+        viewer.figure.observe(self._update_margin, names=['fig_margin'])
+        self._update_limits()
+        self._update_margin()
+
+    def _update_limits(self, *args):
+        state = self.viewer.state
+        with self.hold_sync():
+            self.x_min = state.x_min
+            self.x_max = state.x_max
+
+    def _update_margin(self, *args):
+        self.margin = dict(self.viewer.figure.fig_margin)
+
+
+class HoverLineViewerMixin:
+    """
+    A mixin for viewers with a ``LineHoverViewerMixin`` measuring line.
+
+    In the default ``'client'`` hover mode the line follows the cursor in
+    the browser (see `HoverLineOverlay`), so the ``mousemove`` callback for
+    ``_on_mouse_moved`` is never registered and only clicks reach Python.
+    The Python ``line`` and ``line_label`` marks are then kept off the
+    figure, and their ``visible`` traits show and hide the overlay's line
+    and label instead. `place_hover_line` moves the marks and the overlay's
+    line together, and clicks place the line before they are handled, so
+    click handling that reads the marks' position sees the click.
+    In ``'server'`` mode the callback is registered as before, but moves
+    closer together than ``hover_throttle`` seconds are dropped.
+    """
+
+    hover_mode = 'client'
+    hover_throttle = 0.1
+    hover_unit = ''
+    hover_precision = 0
+
+    _hover_overlay = None
+    _last_hover_time = 0
+
+    @property
+    def hover_overlay(self):
+        if self._hover_overlay is None:
+            line = getattr(self, 'line', None)
+            color = line.colors[0] if line is not None and len(line.colors) > 0 else "#000000"
+            self._hover_overlay = HoverLineOverlay(self, color=color, unit=self.hover_unit,
+                                                   precision=self.hover_precision)
+            if self.hover_mode == 'client':
+                FigureMarkManager.for_figure(self.figure).remove(self._hover_marks())
+                if line is not None:
+                    dlink((line, 'visible'), (self._hover_overlay, 'visible'))
+                label = getattr(self, 'line_label', None)
+                if label is not None:
+                    dlink((label, 'visible'), (self._hover_overlay, 'show_label'))
+        return self._hover_overlay
+
+    def _hover_marks(self):
+        marks = [getattr(self, 'line', None), getattr(self, 'line_label', None)]
+        return [mark for mark in marks if mark is not None]
+
+    def figure_marks(self, marks):
+        """
+        The marks of ``marks`` that should be put on the figure, which in
+        ``'client'`` mode excludes the measuring line
+        """
+        if self.hover_mode != 'client':
+            return marks
+        hover_marks = self._hover_marks()
+        return [mark for mark in marks if not any(mark is m for m in hover_marks)]
+
+    @property
+    def figure_widget(self):
+        if self.hover_mode == 'client':
+            return self.hover_overlay
+        return super().figure_widget
+
+    def _is_hover_callback(self, callback, events):
+        return (self.hover_mode == 'client' and callback == self._on_mouse_moved
+                and list(events or []) == ['mousemove'])
+
+    def add_event_callback(self, callback, events=None):
+        if self._is_hover_callback(callback, events):
+            self.hover_overlay.enabled = True
+            return
+        super().add_event_callback(callback, events=events)
+
+    def remove_event_callback(self, callback):
+        if self.hover_mode == 'client' and callback == self._on_mouse_moved:
+            self.hover_overlay.enabled = False
+            return
+        super().remove_event_callback(callback)
+
+    def place_hover_line(self, x):
+        """Put the measuring line at ``x``, as if the cursor were there"""
+        with self.line.hold_sync(), self.line_label.hold_sync():
+            self.line.x = [x, x]
+            self._update_x_locations()
+            self.line_label.text = [self._label_text(x)]
+        if self.hover_mode == 'client':
+            self.hover_overlay.value = x
+
+    def _on_click(self, event):
+        if self.hover_mode == 'client':
+            self.place_hover_line(event['domain']['x'])
+        super()._on_click(event)
+
+    def _on_mouse_moved(self, event):
+        now = time.monotonic()
+        if now - self._last_hover_time < self.hover_throttle:
+            return
+        self._last_hover_time = now
+        super()._on_mouse_moved(event)
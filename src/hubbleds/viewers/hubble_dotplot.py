@@ -4,23 +4,67 @@ from cosmicds.viewers.dotplot.state import DotPlotViewerState
 
 from cosmicds.mixins import LineHoverStateMixin, LineHoverViewerMixin
 
-__all__ = [ 'HubbleDotPlotView', 'HubbleDotPlotViewer', 'HubbleDotPlotViewerState']
+from ..mark_manager import FigureMarkManager
+from .hover_line import HoverLineViewerMixin
+
+__all__ = [ 'HubbleDotPlotView', 'HubbleDotPlotViewer', 'HubbleDotPlotViewerState',
+            'HubbleDotPlotLayerState', 'HubbleDotPlotLayerArtist']
+
+_DotPlotLayerArtist = BqplotDotPlotView._data_artist_cls
 
 
 class HubbleDotPlotViewerState(LineHoverStateMixin,DotPlotViewerState):
     
+    # Set by a LinkedDotPlotBinning that shares its bins with other viewers
+    binning = None
+    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
     
+    @property
+    def bins(self):
+        if self.binning is None:
+            return super().bins
+        return self.binning.bins(self, lambda: super(HubbleDotPlotViewerState, self).bins)
+    
     def reset_limits(self):
         DotPlotViewerState.reset_limits(self)
         # LineHoverStateMixin.reset_limits(self)
     
         
 
-class HubbleDotPlotViewer(LineHoverViewerMixin,BqplotDotPlotView):
+class HubbleDotPlotLayerState(_DotPlotLayerArtist._layer_state_cls):
+    """
+    A dot plot layer state that takes its histogram from its viewer's
+    `~hubbleds.viewers.dotplot_binning.LinkedDotPlotBinning`, if it has one,
+    so that a layer shown on several linked viewers is only binned once.
+    """
+
+    def update_histogram(self):
+        binning = getattr(self.viewer_state, 'binning', None)
+        if binning is None:
+            return super().update_histogram()
+
+        def compute():
+            super(HubbleDotPlotLayerState, self).update_histogram()
+            return self._histogram_cache[1]
+
+        histogram = binning.histogram(self, compute)
+        # The histogram property reads the base class's cache
+        self._histogram_cache = (None, histogram)
+        return histogram
+
+
+class HubbleDotPlotLayerArtist(_DotPlotLayerArtist):
+    _layer_state_cls = HubbleDotPlotLayerState
+
+
+class HubbleDotPlotViewer(HoverLineViewerMixin, LineHoverViewerMixin,BqplotDotPlotView):
     
     _state_cls = HubbleDotPlotViewerState
+    _data_artist_cls = HubbleDotPlotLayerArtist
+    _subset_artist_cls = HubbleDotPlotLayerArtist
+    hover_unit = " km/s"
     
     def __init__(self, *args, **kwargs):
         super(HubbleDotPlotViewer, self).__init__(*args, **kwargs)
@@ -29,20 +73,18 @@ class HubbleDotPlotViewer(LineHoverViewerMixin,BqplotDotPlotView):
     def _label_text(value):
         return f"{value:.0f} km/s"
     
+    @property
+    def mark_manager(self):
+        return FigureMarkManager.for_figure(self.figure)
+    
     def add_marks(self, new_marks):
-        marks = []
-        for new_mark in new_marks:
-            if new_mark not in self.figure.marks:
-                marks += [new_mark]
-        
-        if len(marks) > 0:
-            self.figure.marks = self.figure.marks + marks
+        self.mark_manager.add(new_marks)
         
     def show_line(self, show = True, show_label = False):
         self.line.visible = show
         self.line_label.visible = show_label
         lines = [self.line, self.line_label]
-        self.add_marks(lines)
+        self.add_marks(self.figure_marks(lines))
         
     def show_previous_line(self, show = True, show_label = True):
         self.previous_line.visible = False
@@ -57,12 +99,7 @@ class HubbleDotPlotViewer(LineHoverViewerMixin,BqplotDotPlotView):
             self.show_previous_line(show = self.previous_line.visible, show_label = self.previous_line_label.visible)
     
     def remove_marks(self, marks):
-        # make sure marks is a list
-        if not isinstance(marks, list):
-            marks = [marks]
-
-        keep_marks = [m for m in self.figure.marks if m not in marks]
-        self.figure.marks = keep_marks
+        self.mark_manager.remove(marks)
         
     def remove_lines_from_figure(self, line = True, previous_line = True):
         if line:
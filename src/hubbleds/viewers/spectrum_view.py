@@ -3,6 +3,7 @@ from bqplot.marks import Lines
 from cosmicds.components.toolbar import Toolbar
 from echo import delay_callback, CallbackProperty
 from glue.config import viewer_tool
+from glue.core.subset import Subset
 from glue.viewers.common.utils import get_viewer_tools
 from glue.viewers.scatter.state import ScatterViewerState
 from glue_jupyter.bqplot.scatter import BqplotScatterView, \
@@ -11,6 +12,8 @@ import numpy as np
 
 from cosmicds.mixins import LineHoverStateMixin, LineHoverViewerMixin
 from cosmicds.viewers.cds_viewer import cds_viewer
+from ..mark_manager import FigureMarkManager
+from ..spectrum_index import range_index_for
 from ..utils import H_ALPHA_REST_LAMBDA, MG_REST_LAMBDA
 
 __all__ = ['SpectrumView', 'SpectrumViewLayerArtist', 'SpectrumViewerState']
@@ -21,6 +24,20 @@ class SpectrumViewerState(LineHoverStateMixin, ScatterViewerState):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+    def _layer_extrema(self, layer):
+        index = None
+        if not isinstance(layer, Subset):
+            index = range_index_for(layer, self.x_att, self.y_att)
+        if index is not None:
+            return index.extrema(self.x_min, self.x_max)
+
+        x_values = layer[self.x_att]
+        y_values = layer[self.y_att]
+        y_values = y_values[np.where((x_values >= self.x_min) & (x_values <= self.x_max))]
+        if np.all(np.isnan(y_values)):
+            return None
+        return np.nanmin(y_values), np.nanmax(y_values)
+
     def reset_y_limits_for_view(self):
         with delay_callback(self, 'y_min', 'y_max'):
             ymin, ymax = self.y_min, self.y_max
@@ -29,12 +46,14 @@ class SpectrumViewerState(LineHoverStateMixin, ScatterViewerState):
                 new_ymin, new_ymax = 0, 1
             else:
                 new_ymin, new_ymax = np.inf, -np.inf
-                for layer in layers: 
-                    x_values = layer.layer[self.x_att]
-                    y_values = layer.layer[self.y_att]
-                    y_values = y_values[np.where((x_values >= self.x_min) & (x_values <= self.x_max))]
-                    new_ymin = min(new_ymin, np.nanmin(y_values))
-                    new_ymax = max(new_ymax, np.nanmax(y_values))
+                for layer in layers:
+                    extrema = self._layer_extrema(layer.layer)
+                    if extrema is None:
+                        continue
+                    new_ymin = min(new_ymin, extrema[0])
+                    new_ymax = max(new_ymax, extrema[1])
+                if not np.isfinite(new_ymin):
+                    new_ymin, new_ymax = 0, 1
 
             self.y_min = new_ymin
             self.y_max = self._YMAX_FACTOR * new_ymax
@@ -49,9 +68,9 @@ class SpectrumViewLayerArtist(BqplotScatterLayerArtist):
         old_scatter = self.scatter
         self.scatter = Lines(scales=self.scales, x=[0, 1], y=[0, 1],
                              marker=None, colors=['#507FB6'], stroke_width=1.8)
-        self.view.figure.marks = list(
-            filter(lambda x: x is not old_scatter, self.view.figure.marks)) + [
-                                     self.scatter]
+        manager = FigureMarkManager.for_figure(self.view.figure)
+        manager.remove(old_scatter)
+        manager.add(self.scatter)
 
 
 class SpecView(LineHoverViewerMixin, BqplotScatterView):
@@ -95,7 +114,7 @@ class SpecView(LineHoverViewerMixin, BqplotScatterView):
                 'y': self.scales['y'],
             })
         
-        self.figure.marks += [self.element_tick, self.element_label]
+        FigureMarkManager.for_figure(self.figure).add([self.element_tick, self.element_label])
 
         self.toolbar.observe(self._active_tool_change, names=['active_tool'])
 
@@ -166,8 +185,7 @@ class SpecView(LineHoverViewerMixin, BqplotScatterView):
             self.previous_line_label,
             self.label_background, self.line, self.line_label
         ]
-        marks = [x for x in self.figure.marks if x not in bring_to_front]
-        self.figure.marks = marks + bring_to_front
+        FigureMarkManager.for_figure(self.figure).bring_to_front(bring_to_front)
 
     def initialize_toolbar(self):
         self.toolbar = Toolbar(self)
@@ -6,8 +6,12 @@ from cosmicds.viewers.cds_viewer import CDSHistogramViewerState, CDSScatterViewe
 from cosmicds.viewers.cds_viewer import cds_viewer
 from cosmicds.viewers.dotplot.viewer import BqplotDotPlotView
 from .hubble_dotplot import HubbleDotPlotView
+from .hover_line import HoverLineViewerMixin
+from .data_versions import DataVersions
+from ..mark_manager import FigureMarkManager
 
 from cosmicds.mixins import LineHoverStateMixin, LineHoverViewerMixin
+import numpy as np
 
 __all__ = [
     "HubbleScatterViewerState", "HubbleFitViewerState",
@@ -18,9 +22,36 @@ __all__ = [
 
 class HubbleScatterViewerState(CDSScatterViewerState):
 
+    def _merged_limits(self, attribute, log, visible_only):
+        """
+        The smallest and largest values of ``attribute`` over the layers,
+        from the statistics `DataVersions` keeps for each layer. None if a
+        layer's changes can't be tracked or no layer has any values.
+        """
+        lower, upper, count = np.inf, -np.inf, 0
+        for state in self.layers:
+            if visible_only and not state.visible:
+                continue
+            versions = DataVersions.for_data(state.layer.data)
+            if versions is None:
+                return None
+            layer_min, layer_max, layer_count = \
+                versions.statistics(state.layer, attribute, positive=log)
+            if layer_count:
+                lower, upper = min(lower, layer_min), max(upper, layer_max)
+                count += layer_count
+        return (lower, upper) if count else None
+
     def reset_limits(self, visible_only=True):
         with delay_callback(self, 'x_min', 'x_max', 'y_min', 'y_max'):
-            super().reset_limits(visible_only=visible_only)
+            x_limits = y_limits = None
+            if self.x_att is not None and self.y_att is not None:
+                x_limits = self._merged_limits(self.x_att, self.x_log, visible_only)
+                y_limits = self._merged_limits(self.y_att, self.y_log, visible_only)
+            if x_limits is None or y_limits is None:
+                super().reset_limits(visible_only=visible_only)
+            else:
+                (self.x_min, self.x_max), (self.y_min, self.y_max) = x_limits, y_limits
             self.x_min = min(self.x_min, 0) if self.x_min is not None else 0
             self.y_min = min(self.y_min, 0) if self.y_min is not None else 0
 
@@ -63,10 +94,10 @@ class HubleHistogramLayerArtist(BqplotHistogramLayerArtist):
         
         if hasattr(self.view, 'line') and hasattr(self.view, 'line_label'):
             if getattr(self.view,'line_visible', False):
-                self.view.figure.marks = self.view.figure.marks + [self.view.line, self.view.line_label]
+                FigureMarkManager.for_figure(self.view.figure).add(self.view.figure_marks([self.view.line, self.view.line_label]))
     
     
-class HubbleHistogramViewer(LineHoverViewerMixin, BqplotHistogramView):
+class HubbleHistogramViewer(HoverLineViewerMixin, LineHoverViewerMixin, BqplotHistogramView):
     
     _state_cls = HubbleHistogramViewerState
     _data_artist_cls = HubleHistogramLayerArtist
@@ -80,11 +111,13 @@ class HubbleHistogramViewer(LineHoverViewerMixin, BqplotHistogramView):
         
         
     
+    @property
+    def mark_manager(self):
+        return FigureMarkManager.for_figure(self.figure)
+    
     def _add_marks(self, *args):
         if not self.measuring_line_visible:
-            marks = [self.line, self.line_label]
-            marks = [m for m in marks if m not in self.figure.marks]
-            self.figure.marks = self.figure.marks + marks
+            self.mark_manager.add(self.figure_marks([self.line, self.line_label]))
 
     
     def _update_visibility(self, val):
@@ -102,7 +135,7 @@ class HubbleHistogramViewer(LineHoverViewerMixin, BqplotHistogramView):
     
     def remove_measuring_line(self):
         if self.measuring_line_visible:
-            self.figure.marks = [m for m in self.figure.marks if m not in [self.line, self.line_label]]
+            self.mark_manager.remove([self.line, self.line_label])
             self.remove_event_callback(self._on_mouse_moved)
             if self.state.show_line:
                 self.state.show_line = False
@@ -110,7 +143,10 @@ class HubbleHistogramViewer(LineHoverViewerMixin, BqplotHistogramView):
     
     @property
     def measuring_line_visible(self):
-        in_marks = all([mark in self.figure.marks for mark in [self.line, self.line_label]])
+        if self.hover_mode == 'client':
+            return self.hover_overlay.enabled
+        marks = self.mark_manager.marks
+        in_marks = all([mark in marks for mark in [self.line, self.line_label]])
         # visible = all([mark.visible for mark in [self.line, self.line_label]])
         # has_callback = self._on_mouse_moved in self._event_callbacks
         # print(f"{self.LABEL}: Measuring line visible: in_marks: {in_marks}, visible: {visible}, callback: {has_callback}, line_visible: {self.line_visible}")
@@ -0,0 +1,342 @@
+"""
+Warm-start kernels for Hubble's Law sessions.
+
+Most of the time taken to start a session goes to importing astropy, glue,
+pywwt and bqplot, and to loading the immutable catalogs. A `ForkServer`
+does that once, in a parent process, and then forks a kernel for each
+session that asks for one. The forks share the parent's memory
+copy-on-write: the modules, the catalogs (see `hubbleds.catalogs`) and the
+template bundle are only copied if they're written to, and the garbage
+collector is told to leave the preloaded objects alone so that it doesn't
+write to them either. A forked session only fetches what is particular to
+its student.
+
+The catalogs that come from the API, i.e. the SDSS galaxies and the example
+galaxy with its seed measurements, are fetched once, when the server
+starts, and every kernel it forks uses that copy. Restart the server to
+pick up changes to them.
+
+Jupyter starts a kernel by running the command in its kernel spec, so the
+spec installed by `install_kernel_spec` runs a small client, `connect`,
+which asks the server for a kernel and stays in place of it: it passes on
+signals, and exits with the kernel's exit code. If the client is killed,
+the server kills its kernel.
+
+Usage::
+
+    python -m hubbleds.warm_start serve --socket /tmp/hubbleds.sock
+    python -m hubbleds.warm_start install --socket /tmp/hubbleds.sock
+
+This module only imports the standard library at the top level, so that
+the client starts quickly; it's run from its file rather than with ``-m``,
+which would import the package.
+"""
+
+import argparse
+import gc
+import json
+import os
+from pathlib import Path
+import select
+import signal
+import socket
+import sys
+import tempfile
+
+__all__ = ['ForkServer', 'connect', 'install_kernel_spec', 'preload']
+
+KERNEL_NAME = "hubbleds-warm"
+DEFAULT_SOCKET = Path(tempfile.gettempdir()) / "hubbleds-warm.sock"
+
+
+def preload():
+    """
+    Import everything a session needs and load the immutable catalogs,
+    then move the loaded objects out of the garbage collector's reach.
+    The catalogs fetched from the API aren't fetched again for the life
+    of the process.
+    """
+    import astropy.coordinates  # noqa: F401
+    import astropy.units  # noqa: F401
+    import bqplot  # noqa: F401
+    import cosmicds.app  # noqa: F401
+    import glue_jupyter  # noqa: F401
+    import ipykernel.kernelapp  # noqa: F401
+    import pywwt.jupyter  # noqa: F401
+
+    import hubbleds  # noqa: F401
+    from hubbleds.catalogs import preload_catalogs
+    from hubbleds.template_bundle import template_bundle
+    preload_catalogs()
+    template_bundle()
+
+    gc.collect()
+    gc.freeze()
+
+
+class ForkServer:
+    """
+    Forks a kernel for each client that connects to a Unix socket.
+
+    Each client sends one line of JSON with the ``connection_file`` the
+    kernel should use, and the ``cwd`` and ``env`` to run it with. The
+    server replies with a line giving the kernel's ``pid``, and, when the
+    kernel exits, a line with its exit ``status``. If the kernel can't be
+    forked, the reply is a line with an ``error`` instead.
+
+    The server is single-threaded, so that nothing else is running when it
+    forks.
+
+    Parameters
+    ----------
+    socket_path : str or `~pathlib.Path`
+        The socket to listen on
+    """
+
+    POLL_INTERVAL = 0.5  # seconds
+
+    def __init__(self, socket_path=DEFAULT_SOCKET):
+        self.socket_path = Path(socket_path)
+        self._listener = None
+        self._clients = {}
+        self._children = {}
+        self._running = False
+
+    def serve_forever(self):
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        self._listener.listen()
+        self._running = True
+        try:
+            while self._running:
+                sockets = [self._listener] + list(self._clients)
+                readable, _, _ = select.select(sockets, [], [], self.POLL_INTERVAL)
+                for sock in readable:
+                    if sock is self._listener:
+                        client, _ = self._listener.accept()
+                        self._clients[client] = b""
+                    else:
+                        self._read(sock)
+                self._check_clients()
+                self._reap()
+        finally:
+            self._close()
+
+    def stop(self):
+        self._running = False
+
+    def _read(self, client):
+        try:
+            chunk = client.recv(65536)
+        except OSError:
+            chunk = b""
+        if not chunk:
+            self._drop(client)
+            return
+        buffer = self._clients[client] + chunk
+        if b"\n" not in buffer:
+            self._clients[client] = buffer
+            return
+        line, _, _ = buffer.partition(b"\n")
+        # The client has nothing more to say, so stop listening to it
+        # until its kernel exits
+        del self._clients[client]
+        try:
+            request = json.loads(line)
+        except ValueError:
+            client.close()
+            return
+        try:
+            pid = os.fork()
+        except OSError as e:
+            # e.g. out of memory or processes; the other sessions carry on
+            self._send(client, {"error": str(e)})
+            client.close()
+            return
+        if pid == 0:
+            self._run_kernel(request, client)
+        self._children[pid] = client
+        self._send(client, {"pid": pid})
+
+    def _drop(self, client):
+        del self._clients[client]
+        client.close()
+
+    def _run_kernel(self, request, client):
+        status = 1
+        try:
+            self._listener.close()
+            for sock in [client] + list(self._clients) + list(self._children.values()):
+                sock.close()
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            os.setsid()
+            os.chdir(request.get("cwd", os.getcwd()))
+            os.environ.clear()
+            os.environ.update(request.get("env", {}))
+
+            # Every fork starts with the parent's random state
+            import random
+            import numpy as np
+            random.seed()
+            np.random.seed()
+
+            from ipykernel.kernelapp import IPKernelApp
+            IPKernelApp.launch_instance(argv=["-f", request["connection_file"]])
+            status = 0
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else 0
+        finally:
+            os._exit(status)
+
+    def _reap(self):
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            client = self._children.pop(pid, None)
+            if client is not None:
+                self._send(client, {"status": os.waitstatus_to_exitcode(status)})
+                client.close()
+
+    def _check_clients(self):
+        # Kill the kernels of clients that have gone away
+        for pid, client in list(self._children.items()):
+            try:
+                gone = client.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+            except BlockingIOError:
+                gone = False
+            except OSError:
+                gone = True
+            if gone:
+                self._kill(pid)
+
+    @staticmethod
+    def _kill(pid, signum=signal.SIGKILL):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    @staticmethod
+    def _send(client, message):
+        try:
+            client.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        except OSError:
+            pass
+
+    def _close(self):
+        for pid in list(self._children):
+            self._kill(pid, signal.SIGTERM)
+        for client in list(self._clients):
+            client.close()
+        self._clients = {}
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+
+def connect(connection_file, socket_path=DEFAULT_SOCKET):
+    """
+    Ask the server at ``socket_path`` for a kernel using ``connection_file``
+    and wait for it to exit. Interrupts and terminations are passed on to
+    the kernel.
+
+    Returns
+    -------
+    int
+        The kernel's exit code
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(str(socket_path))
+    request = {"connection_file": os.path.abspath(connection_file),
+               "cwd": os.getcwd(), "env": dict(os.environ)}
+    client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+    reader = client.makefile('r')
+
+    line = reader.readline()
+    if not line:
+        return 1
+    reply = json.loads(line)
+    if "error" in reply:
+        client.close()
+        print(f"Unable to start a kernel: {reply['error']}", file=sys.stderr)
+        return 1
+    pid = reply["pid"]
+
+    def forward(signum, frame):
+        ForkServer._kill(pid, signum)
+    for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+        signal.signal(signum, forward)
+
+    line = reader.readline()
+    client.close()
+    return json.loads(line)["status"] if line else 1
+
+
+def install_kernel_spec(socket_path=DEFAULT_SOCKET, user=True, prefix=None):
+    """
+    Install a kernel spec, named ``hubbleds-warm``, whose kernels are
+    forked by the server at ``socket_path``
+
+    Returns
+    -------
+    str
+        The directory the spec was installed to
+    """
+    from jupyter_client.kernelspec import KernelSpecManager
+
+    spec = {
+        "argv": [sys.executable, os.path.abspath(__file__), "connect",
+                 "--socket", str(socket_path), "{connection_file}"],
+        "display_name": "Python 3 (hubbleds, warm start)",
+        "language": "python",
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        with open(Path(directory) / "kernel.json", 'w') as f:
+            json.dump(spec, f, indent=2)
+        return KernelSpecManager().install_kernel_spec(directory, KERNEL_NAME,
+                                                       user=user, prefix=prefix)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Preload hubbleds and fork kernels on demand")
+    serve.add_argument("--socket", default=DEFAULT_SOCKET)
+    client = commands.add_parser("connect", help="Start a kernel from a running server")
+    client.add_argument("--socket", default=DEFAULT_SOCKET)
+    client.add_argument("connection_file")
+    install = commands.add_parser("install", help="Install a kernel spec that uses the server")
+    install.add_argument("--socket", default=DEFAULT_SOCKET)
+    install.add_argument("--sys-prefix", action="store_true",
+                         help="Install into sys.prefix rather than for the user")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        preload()
+        server = ForkServer(args.socket)
+        signal.signal(signal.SIGTERM, lambda signum, frame: server.stop())
+        server.serve_forever()
+        return 0
+    if args.command == "connect":
+        return connect(args.connection_file, args.socket)
+    if args.sys_prefix:
+        print(install_kernel_spec(args.socket, user=False, prefix=sys.prefix))
+    else:
+        print(install_kernel_spec(args.socket))
+    return 0
+
+
+if __name__ == "__main__":
+    # Run from its file, this module's directory would shadow top-level modules
+    if sys.path and sys.path[0] == os.path.dirname(os.path.abspath(__file__)):
+        del sys.path[0]
+    sys.exit(main())
@@ -0,0 +1,328 @@
+import astropy.units as u
+from astropy.table import Table, vstack
+import numpy as np
+from pandas import DataFrame
+
+from .sky_index import SkyZoneIndex, angular_separation
+
+__all__ = ['ColumnarBuffer', 'IncrementalTableLayer', 'ViewportCatalogLayer']
+
+
+class ColumnarBuffer:
+    """
+    A growable table of rows stored as one preallocated numpy array per
+    column. Appending a row writes into the arrays in place, and they
+    double in size only when they are full, so a run of appends costs
+    amortized O(1) per row rather than the copy of a DataFrame concat.
+
+    A column takes the dtype of its first values and is upcast (e.g. int to
+    float, or to object) if a later value doesn't fit. Strings are stored
+    in object columns. ``version`` is bumped by every change to the rows.
+
+    Parameters
+    ----------
+    capacity : int
+        The number of rows to allocate room for up front
+    """
+
+    def __init__(self, capacity=8):
+        self.capacity = max(int(capacity), 1)
+        self.size = 0
+        self.version = 0
+        self._columns = {}
+
+    @classmethod
+    def from_dataframe(cls, df, capacity=8):
+        buffer = cls(capacity=max(capacity, len(df)))
+        for name in df.columns:
+            values = df[name].to_numpy()
+            column = buffer._allocate(values.dtype)
+            column[:len(values)] = values
+            buffer._columns[name] = column
+        buffer.size = len(df)
+        return buffer
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @staticmethod
+    def _dtype(value):
+        dtype = np.asarray(value).dtype
+        return np.dtype(object) if dtype.kind in 'OUS' else dtype
+
+    def _allocate(self, dtype):
+        dtype = np.dtype(object) if dtype.kind in 'OUS' else dtype
+        if dtype.kind == 'f':
+            return np.full(self.capacity, np.nan, dtype=dtype)
+        if dtype.kind == 'O':
+            return np.full(self.capacity, None, dtype=dtype)
+        return np.zeros(self.capacity, dtype=dtype)
+
+    def _grow(self, capacity):
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self._columns[name] = grown
+        self.capacity = capacity
+
+    def _store(self, name, index, value):
+        column = self._columns.get(name, None)
+        dtype = self._dtype(value)
+        if column is None:
+            column = self._allocate(dtype)
+            if self.size > 0 and column.dtype.kind not in 'fO':
+                # Earlier rows have no value, so the column has to allow one
+                column = column.astype(object)
+                column[:] = None
+            self._columns[name] = column
+        elif np.result_type(column.dtype, dtype) != column.dtype:
+            column = column.astype(np.result_type(column.dtype, dtype))
+            self._columns[name] = column
+        column[index] = value
+
+    def append(self, row):
+        """Add a row, given as a dict of column name to value"""
+        if self.size == self.capacity:
+            self._grow(2 * self.capacity)
+        for name, value in row.items():
+            self._store(name, self.size, value)
+        for name, column in self._columns.items():
+            if name not in row:
+                column[self.size] = np.nan if column.dtype.kind == 'f' else None
+        self.size += 1
+        self.version += 1
+
+    def remove(self, index):
+        """Remove the row at ``index``, shifting the later rows back"""
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(f"Row {index} is out of range for {self.size} rows")
+        for column in self._columns.values():
+            column[index:self.size - 1] = column[index + 1:self.size]
+        self.size -= 1
+        self.version += 1
+
+    def clear(self):
+        self.size = 0
+        self.version += 1
+
+    def index_of(self, name, value):
+        """Return the index of the first row whose ``name`` is ``value``, or None"""
+        column = self._columns.get(name, None)
+        if column is None:
+            return None
+        matches = np.flatnonzero(column[:self.size] == value)
+        return int(matches[0]) if len(matches) > 0 else None
+
+    def column(self, name):
+        """A read-only view of a column's values"""
+        view = self._columns[name][:self.size]
+        view.flags.writeable = False
+        return view
+
+    def row(self, index):
+        return {name: column[index] for name, column in self._columns.items()}
+
+    def to_dataframe(self):
+        return DataFrame({name: column[:self.size].copy()
+                          for name, column in self._columns.items()})
+
+    def to_table(self, start=0, stop=None):
+        """An astropy `~astropy.table.Table` of the rows from ``start`` to ``stop``"""
+        stop = self.size if stop is None else min(stop, self.size)
+        columns = {}
+        for name, column in self._columns.items():
+            values = column[start:stop]
+            if values.dtype.kind == 'O' and all(isinstance(x, str) for x in values):
+                values = values.astype(str)
+            columns[name] = values
+        return Table(columns)
+
+
+class IncrementalTableLayer:
+    """
+    A set of WWT table layers that together show a table whose rows can be
+    appended to.
+
+    pywwt's table layers can only have their data replaced as a whole, so
+    showing one more row on a single layer resends the whole table.
+    Appended rows are instead added as a layer of their own, with the same
+    settings, so that only they are sent. Once there are ``max_layers``
+    layers, the next append merges them all into one. `replace` resends the
+    full table over the first layer and removes the others. Layers are
+    created when there are rows to show, and removed when there are none.
+
+    Parameters
+    ----------
+    widget : `~pywwt.jupyter.WWTJupyterWidget`
+        The WWT widget to show the layers in
+    max_layers : int
+        The most layers to split the rows between
+    settings
+        Attributes to set on each layer when it's created, e.g. ``color``
+    """
+
+    def __init__(self, widget, max_layers=8, **settings):
+        self.widget = widget
+        self.max_layers = max_layers
+        self.settings = settings
+        self.layers = []
+        self._tables = []
+        self.rows_sent = 0
+        self.updates = 0
+
+    @property
+    def rows(self):
+        return sum(len(table) for table in self._tables)
+
+    def _create(self, table):
+        layer = self.widget.layers.add_table_layer(table)
+        for name, value in self.settings.items():
+            setattr(layer, name, value)
+        return layer
+
+    def append(self, table):
+        """Add the rows of ``table``, sending only those rows"""
+        if len(table) == 0:
+            return
+        if len(self.layers) >= self.max_layers:
+            self.replace(vstack(self._tables + [table]))
+            return
+        self.layers.append(self._create(table))
+        self._tables.append(table)
+        self.rows_sent += len(table)
+        self.updates += 1
+
+    def replace(self, table):
+        """Show exactly the rows of ``table``"""
+        if len(table) == 0:
+            self.remove()
+            return
+        if self.layers:
+            for layer in self.layers[1:]:
+                self.widget.layers.remove_layer(layer)
+            del self.layers[1:]
+            self.layers[0].update_data(table=table)
+        else:
+            self.layers.append(self._create(table))
+        self._tables = [table]
+        self.rows_sent += len(table)
+        self.updates += 1
+
+    def remove(self):
+        for layer in self.layers:
+            self.widget.layers.remove_layer(layer)
+        self.layers = []
+        self._tables = []
+
+
+class ViewportCatalogLayer:
+    """
+    A WWT table layer that shows only the rows of a catalog that are in
+    view, so the traffic and memory in the frontend are bounded by what can
+    be seen rather than by the size of the catalog.
+
+    The rows are found with a `~hubbleds.sky_index.SkyZoneIndex` cone
+    search around the view centre, padded so that small pans and zooms out
+    don't need a new search. If more than ``max_sources`` rows are in view,
+    only the ``max_sources`` with the smallest ``rank_column`` values (e.g.
+    the brightest magnitudes) are shown, so the cut tightens as the field
+    of view widens. Without a rank column the rows get a fixed random
+    priority, which thins the catalog evenly. When the new rows include all
+    of those shown, only the new ones are sent.
+
+    Parameters
+    ----------
+    widget : `~pywwt.jupyter.WWTJupyterWidget`
+        The WWT widget to show the layer in
+    table : `~astropy.table.Table`
+        The catalog
+    ra_column, dec_column : str
+        The catalog columns with the coordinates, in degrees
+    rank_column : str, optional
+        The column to rank rows by when there are too many in view
+    max_sources : int
+        The most rows to show at once
+    padding : float
+        The ratio of the searched radius to the radius of the view
+    settings
+        Attributes to set on the WWT layer, e.g. ``color``
+    """
+
+    # The radius of a view as a fraction of its (vertical) field of view,
+    # enough to reach the corners of a 16:9 viewer
+    VIEW_RADIUS = 1.02
+
+    def __init__(self, widget, table, ra_column='ra', dec_column='decl',
+                 rank_column=None, max_sources=1000, padding=2.0, **settings):
+        self.table = table
+        self.max_sources = max_sources
+        self.padding = padding
+        self.index = SkyZoneIndex(table[ra_column], table[dec_column])
+        if rank_column is not None:
+            self._rank = np.asarray(table[rank_column], dtype=float)
+        else:
+            self._rank = np.random.default_rng(0).permutation(len(table)).astype(float)
+        self.layer = IncrementalTableLayer(widget, **settings)
+        self.visible = False
+        self._region = None
+        self._shown = np.empty(0, dtype=int)
+        self.queries = 0
+
+    def _covers(self, ra, dec, radius):
+        if self._region is None:
+            return False
+        region_ra, region_dec, region_radius = self._region
+        # Zooming in far enough can bring back rows that were cut
+        if self._shown.size >= self.max_sources and radius * self.padding < region_radius / self.padding:
+            return False
+        return angular_separation(ra, dec, region_ra, region_dec) + radius <= region_radius
+
+    def _select(self, indices):
+        if indices.size <= self.max_sources:
+            return indices
+        keep = np.argpartition(self._rank[indices], self.max_sources - 1)[:self.max_sources]
+        return np.sort(indices[keep])
+
+    def update(self, ra, dec, fov):
+        """
+        Show the rows in a view centred on (``ra``, ``dec``) with a field of
+        view of ``fov``, all in degrees
+        """
+        if not self.visible:
+            return
+        radius = fov * self.VIEW_RADIUS
+        if self._covers(ra, dec, radius):
+            return
+        search_radius = min(radius * self.padding, 180)
+        indices = self._select(self.index.query(ra, dec, search_radius))
+        self.queries += 1
+        self._region = (ra, dec, search_radius)
+        if np.array_equal(indices, self._shown):
+            return
+        added = np.setdiff1d(indices, self._shown, assume_unique=True)
+        if added.size + self._shown.size == indices.size and self.layer.layers:
+            self.layer.append(self.table[added])
+        else:
+            self.layer.replace(self.table[indices])
+        self._shown = indices
+
+    def update_from_widget(self, widget):
+        center = widget.get_center()
+        self.update(center.ra.deg, center.dec.deg, widget.get_fov().to_value(u.deg))
+
+    def show(self, widget=None):
+        self.visible = True
+        if widget is not None:
+            self.update_from_widget(widget)
+
+    def hide(self):
+        self.visible = False
+        self.layer.remove()
+        self._region = None
+        self._shown = np.empty(0, dtype=int)
@@ -0,0 +1,105 @@
+"""
+Benchmark configuration.
+
+Each benchmark records the best time over several repeats and the peak
+traced memory of a single call, at every scale given by ``--bench-scales``.
+Results are compared against a baseline file; a benchmark fails if either
+quantity exceeds the baseline by more than ``--bench-threshold``.
+
+The benchmarks only run with ``--bench``. Timings depend on the machine, so
+the baseline is written on the machine the comparisons will be made on:
+
+    pytest tests/benchmarks --bench --bench-scales 100,1000,10000 --bench-save
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import pytest
+
+
+def pytest_generate_tests(metafunc):
+    if "scale" in metafunc.fixturenames:
+        scales = metafunc.config.getoption("--bench-scales")
+        metafunc.parametrize("scale", [int(x) for x in scales.split(",")])
+
+
+class BenchmarkRecorder:
+
+    def __init__(self, config):
+        self.repeats = config.getoption("--bench-repeats")
+        self.threshold = config.getoption("--bench-threshold")
+        self.baseline_path = Path(config.getoption("--bench-baseline"))
+        self.save = config.getoption("--bench-save")
+        self.baseline = {}
+        if self.baseline_path.exists():
+            self.baseline = json.loads(self.baseline_path.read_text())
+        self.results = {}
+
+    def __call__(self, name, scale, func, setup=None):
+        """
+        Benchmark ``func(*setup())``. ``setup`` is called before every
+        repeat and is not included in the timings.
+        """
+        setup = setup or (lambda: ())
+        times = []
+        for _ in range(self.repeats):
+            args = setup()
+            gc.collect()
+            start = time.perf_counter()
+            func(*args)
+            times.append(time.perf_counter() - start)
+
+        args = setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        key = f"{name}[{scale}]"
+        result = {"time_s": min(times), "peak_bytes": peak}
+        self.results[key] = result
+        self.check(key, result)
+        return result
+
+    def check(self, key, result):
+        if self.save:
+            return
+        if key not in self.baseline:
+            warnings.warn(f"{key}: no baseline in {self.baseline_path}, so it wasn't "
+                          f"checked for regressions. Write one with --bench-save.")
+            return
+        base = self.baseline[key]
+        for field in ("time_s", "peak_bytes"):
+            if base[field] <= 0:
+                continue
+            ratio = result[field] / base[field]
+            if ratio > self.threshold:
+                pytest.fail(f"{key}: {field} regressed {ratio:.2f}x "
+                            f"({result[field]:.4g} vs baseline {base[field]:.4g})")
+
+    def write(self):
+        if not self.save or not self.results:
+            return
+        merged = dict(self.baseline)
+        merged.update(self.results)
+        self.baseline_path.write_text(json.dumps(merged, indent=2, sort_keys=True))
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder(request):
+    recorder = BenchmarkRecorder(request.config)
+    yield recorder
+    recorder.write()
+
+
+@pytest.fixture
+def bench(benchmark_recorder):
+    return benchmark_recorder
@@ -0,0 +1,247 @@
+"""
+Benchmarks for data-handling hot paths, run at each of ``--bench-scales``.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("glue")
+pytest.importorskip("cosmicds")
+
+from glue.core import Data, DataCollection
+from glue.core.component import CategoricalComponent, Component
+from glue.viewers.scatter.state import ScatterLayerState
+
+from hubbleds.components.id_slider import IDSlider
+from hubbleds.data_management import *
+from hubbleds.histogram_listener import HistogramListener
+from hubbleds.story import HubblesLaw
+from hubbleds.testing import HubbleAPIServer, SyntheticDataset, use_local_api
+from hubbleds.utils import AGE_CONSTANT
+from hubbleds.viewers.spectrum_view import SpectrumViewerState
+
+pytestmark = pytest.mark.benchmark
+
+MEASUREMENTS_PER_STUDENT = 5
+
+
+class StoryStub:
+    """
+    Just enough of `HubblesLaw` to run its data methods without creating
+    an application.
+    """
+    name_ext = HubblesLaw.name_ext
+    prune_none = staticmethod(HubblesLaw.prune_none)
+    make_data_writeable = staticmethod(HubblesLaw.make_data_writeable)
+    add_new_row = HubblesLaw.add_new_row
+    add_data_values = HubblesLaw.add_data_values
+    data_from_measurements = HubblesLaw.data_from_measurements
+    data_from_summaries = HubblesLaw.data_from_summaries
+    fetch_measurements = HubblesLaw.fetch_measurements
+    fetch_measurement_data_and_update = HubblesLaw.fetch_measurement_data_and_update
+    create_single_summary = HubblesLaw.create_single_summary
+    update_summary_data = HubblesLaw.update_summary_data
+    fetch_class_data = HubblesLaw.fetch_class_data
+    load_spectrum_data = HubblesLaw.load_spectrum_data
+
+    def __init__(self, data_collection=None, student_id=1, class_id=1):
+        self.data_collection = data_collection if data_collection is not None else DataCollection()
+        self.student_user = {"id": student_id}
+        self.classroom = {"id": class_id}
+        self.class_last_modified = None
+        self.base_all_dict = None
+
+
+def dataset_for_scale(scale, **kwargs):
+    """A synthetic dataset with roughly ``scale`` measurements"""
+    students = max(1, scale // MEASUREMENTS_PER_STUDENT)
+    per_class = min(students, 25)
+    return SyntheticDataset(n_galaxies=max(50, min(scale, 5000)),
+                            n_classes=max(1, students // per_class),
+                            students_per_class=per_class,
+                            measurements_per_student=MEASUREMENTS_PER_STUDENT,
+                            **kwargs)
+
+
+def measurement_data(scale, none_fraction=0, seed=0, label="measurements"):
+    rng = np.random.default_rng(seed)
+    distances = rng.uniform(10, 500, scale)
+    velocities = distances * rng.normal(70, 10, scale)
+    student_ids = np.arange(scale) // MEASUREMENTS_PER_STUDENT + 1
+    columns = {
+        DISTANCE_COMPONENT: list(distances),
+        VELOCITY_COMPONENT: list(velocities),
+        STUDENT_ID_COMPONENT: list(student_ids),
+    }
+    if none_fraction > 0:
+        for values in columns.values():
+            for index in np.flatnonzero(rng.random(scale) < none_fraction):
+                values[index] = None
+    return Data(label=label, **columns)
+
+
+def summary_data(n_students, seed=0, label=CLASS_SUMMARY_LABEL):
+    rng = np.random.default_rng(seed)
+    h0s = rng.normal(70, 10, n_students)
+    return Data(label=label, **{
+        STUDENT_ID_COMPONENT: np.arange(1, n_students + 1),
+        H0_COMPONENT: h0s,
+        AGE_COMPONENT: AGE_CONSTANT / h0s,
+    })
+
+
+def empty_measurement_data(label):
+    data = Data(label=label)
+    categorical = [NAME_COMPONENT, ELEMENT_COMPONENT, GALTYPE_COMPONENT]
+    for col in [NAME_COMPONENT, RA_COMPONENT, DEC_COMPONENT, Z_COMPONENT,
+                GALTYPE_COMPONENT, MEASWAVE_COMPONENT, RESTWAVE_COMPONENT,
+                STUDENT_ID_COMPONENT, VELOCITY_COMPONENT, DISTANCE_COMPONENT,
+                ELEMENT_COMPONENT, ANGULAR_SIZE_COMPONENT]:
+        if col in categorical:
+            data.add_component(CategoricalComponent(np.array(['X'])), col)
+        else:
+            data.add_component(Component(np.array([0])), col)
+    return data
+
+
+def class_data_collection(dataset):
+    """The data that `HubblesLaw.fetch_class_data` reads and updates"""
+    stub = StoryStub()
+    all_json = dataset.all_data()
+    measurements = all_json["measurements"]
+    for measurement in measurements:
+        measurement.update({"galaxy_id": measurement["galaxy"]["id"]})
+        measurement.pop("galaxy")
+        measurement.pop("student")
+    all_data = Data(label=ALL_DATA_LABEL,
+                    **{STATE_TO_MEAS.get(k, k): [x[k] for x in measurements]
+                       for k in measurements[0]})
+    class_summaries = stub.data_from_summaries(all_json["classData"],
+                                               label=ALL_CLASS_SUMMARIES_LABEL,
+                                               id_key=CLASS_ID_COMPONENT)
+    summary = summary_data(1)
+    dc = DataCollection([all_data, class_summaries, summary,
+                         empty_measurement_data(CLASS_DATA_LABEL)])
+    for data in dc:
+        HubblesLaw.make_data_writeable(data)
+    return dc
+
+
+@pytest.fixture(scope="module")
+def api_server():
+    server = HubbleAPIServer(dataset_for_scale(100)).start()
+    previous = use_local_api(server.url)
+    yield server
+    use_local_api(previous)
+    server.stop()
+
+
+def test_prune_none(bench, scale):
+    bench("prune_none", scale, HubblesLaw.prune_none,
+          setup=lambda: (measurement_data(scale, none_fraction=0.1),))
+
+
+def test_add_data_values(bench, scale):
+    stub = StoryStub()
+    values = {DISTANCE_COMPONENT: 100, VELOCITY_COMPONENT: 7000,
+              STUDENT_ID_COMPONENT: 1}
+    bench("add_data_values", scale, stub.add_data_values,
+          setup=lambda: (measurement_data(scale), values))
+
+
+def test_update_summary_data(bench, scale):
+    def setup():
+        measurements = measurement_data(scale)
+        summary = summary_data(1)
+        return StoryStub(DataCollection([summary])), measurements
+
+    bench("update_summary_data", scale,
+          lambda stub, meas: stub.update_summary_data(meas, CLASS_SUMMARY_LABEL,
+                                                      STUDENT_ID_COMPONENT),
+          setup=setup)
+
+
+def test_fetch_class_data_merge(bench, scale, api_server):
+    api_server.dataset = dataset_for_scale(scale)
+    dataset = api_server.dataset
+
+    def setup():
+        return StoryStub(class_data_collection(dataset)),
+
+    bench("fetch_class_data", scale, lambda stub: stub.fetch_class_data(),
+          setup=setup)
+
+
+def test_data_from_measurements(bench, scale):
+    records = dataset_for_scale(scale).measurements()
+    stub = StoryStub()
+
+    def setup():
+        return [dict(m, galaxy=dict(m["galaxy"])) for m in records],
+
+    bench("data_from_measurements", scale, stub.data_from_measurements,
+          setup=setup)
+
+
+def test_id_slider_refresh(bench, scale):
+    summary = summary_data(scale)
+    slider = IDSlider(summary, STUDENT_ID_COMPONENT, AGE_COMPONENT)
+    bench("id_slider_refresh", scale, slider.refresh)
+
+
+def test_histogram_subset_state(bench, scale):
+    n_students = max(1, scale // MEASUREMENTS_PER_STUDENT)
+    class_data = measurement_data(scale, label=CLASS_DATA_LABEL)
+    summary = summary_data(n_students)
+    listener = HistogramListener(None, None, summary, None, class_data,
+                                 listen=False)
+    rng = np.random.default_rng(0)
+    selected = Data(**{STUDENT_ID_COMPONENT: rng.choice(
+        np.arange(1, n_students + 1), size=max(1, n_students // 2), replace=False)})
+
+    def create_and_evaluate():
+        state = listener._create_subset_state(selected)
+        state.to_mask(class_data)
+
+    bench("histogram_subset_state", scale, create_and_evaluate)
+
+
+def test_load_spectrum_data(bench, scale, api_server):
+    api_server.dataset = SyntheticDataset(n_galaxies=10, n_classes=1,
+                                          students_per_class=1,
+                                          spectrum_points=scale)
+    galaxy = api_server.dataset.galaxies()[0]
+    bench("load_spectrum_data", scale,
+          lambda stub: stub.load_spectrum_data(galaxy["name"], galaxy["type"]),
+          setup=lambda: (StoryStub(),))
+
+
+def test_reset_y_limits_for_view(bench, scale):
+    rng = np.random.default_rng(0)
+    lam = np.linspace(3800, 9200, scale)
+    data = Data(label="spectrum", **{"lambda": lam,
+                                     "flux": 10 + rng.normal(0, 1, scale)})
+    DataCollection([data])
+    state = SpectrumViewerState()
+    state.layers.append(ScatterLayerState(viewer_state=state, layer=data))
+    state.x_att = data.id["lambda"]
+    state.y_att = data.id["flux"]
+
+    def reset():
+        state.y_min, state.y_max = 0, 1
+        state.x_min, state.x_max = 6400, 6800
+        state.reset_y_limits_for_view()
+
+    bench("reset_y_limits_for_view", scale, reset)
+
+
+def test_simulate_class(bench, scale, tmp_path):
+    pytest.importorskip("matplotlib")
+    from hubbleds.data.hubble_simulation.simulate import (DATAFILE, OPTIONS,
+                                                          read_galaxy_data,
+                                                          simulate_class)
+    options = dict(OPTIONS, output_dir=str(tmp_path), class_id=1,
+                   galaxy_data=read_galaxy_data(DATAFILE),
+                   n_students=max(1, scale // MEASUREMENTS_PER_STUDENT),
+                   n_per_student=MEASUREMENTS_PER_STUDENT)
+    bench("simulate_class", scale, lambda: simulate_class(options))
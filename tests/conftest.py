@@ -1,10 +1,44 @@
 """
-    Dummy conftest.py for hubbleds.
+    conftest.py for hubbleds.
 
-    If you don't know what this is for, just leave it empty.
+    Adds the options for the benchmarks in ``tests/benchmarks``, which only
+    run with ``--bench``.
     Read more about conftest.py under:
     - https://docs.pytest.org/en/stable/fixture.html
     - https://docs.pytest.org/en/stable/writing_plugins.html
 """
 
-# import pytest
+from pathlib import Path
+
+import pytest
+
+DEFAULT_BASELINE = Path(__file__).parent / "benchmarks" / "baseline.json"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("hubbleds benchmarks")
+    group.addoption("--bench", action="store_true",
+                    help="Run the benchmarks in tests/benchmarks")
+    group.addoption("--bench-scales", default="100,1000,10000",
+                    help="Comma-separated data sizes to benchmark at")
+    group.addoption("--bench-repeats", type=int, default=5,
+                    help="Number of timed repeats per case")
+    group.addoption("--bench-threshold", type=float, default=1.5,
+                    help="Allowed ratio of new to baseline time and memory")
+    group.addoption("--bench-baseline", default=str(DEFAULT_BASELINE),
+                    help="Baseline results file")
+    group.addoption("--bench-save", action="store_true",
+                    help="Write the results to the baseline file")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: only run with --bench")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--bench"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks only run with --bench")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
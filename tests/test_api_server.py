@@ -0,0 +1,76 @@
+import json
+from io import BytesIO
+from urllib.request import Request, urlopen
+
+import cosmicds.utils
+from astropy.io import fits
+
+from hubbleds.data_management import *
+from hubbleds.testing import HubbleAPIServer, SyntheticDataset, use_local_api
+from hubbleds.utils import HUBBLE_ROUTE_PATH, hubble_api_url
+
+
+def small_dataset(seed=1):
+    return SyntheticDataset(n_galaxies=50, n_classes=3, students_per_class=4,
+                            measurements_per_student=5, n_sample_measurements=6,
+                            spectrum_points=100, seed=seed)
+
+
+def test_dataset_is_deterministic():
+    first, second = small_dataset(), small_dataset()
+    assert first.galaxies() == second.galaxies()
+    assert first.measurements() == second.measurements()
+    assert first.spectrum_bytes("a") == second.spectrum_bytes("a")
+    assert small_dataset(seed=2).galaxies() != first.galaxies()
+
+
+def test_dataset_measurements():
+    dataset = small_dataset()
+    assert len(dataset.measurements()) == dataset.n_students * 5
+    assert len(dataset.measurements(student_id=3)) == 5
+    assert len(dataset.measurements(class_id=2)) == 4 * 5
+
+    dataset.remove_measurements(lambda m: m[DB_STUDENT_ID_FIELD] == 3)
+    assert dataset.measurements(student_id=3) == []
+
+    data = dataset.all_data()
+    assert len(data["measurements"]) == (dataset.n_students - 1) * 5
+    assert len(data["studentData"]) == dataset.n_students - 1
+    assert len(data["classData"]) == 3
+
+    samples = dataset.sample_measurements()
+    assert [m[DB_MEASNUM_FIELD] for m in samples[:2]] == ["first", "second"]
+    assert samples[0]["id"] == samples[1]["id"]
+
+
+def test_spectrum_bytes():
+    dataset = small_dataset()
+    name = dataset.galaxies()[0]["name"]
+    content = dataset.spectrum_bytes(name)
+    assert dataset.spectrum_bytes(name) is content
+    with fits.open(BytesIO(content)) as hdulist:
+        assert len(hdulist["COADD"].data) == 100
+
+
+def test_use_local_api():
+    with HubbleAPIServer(small_dataset()) as server:
+        previous = use_local_api(server.url)
+        try:
+            assert hubble_api_url() == f"{server.url}/{HUBBLE_ROUTE_PATH}"
+            with urlopen(f"{hubble_api_url()}/galaxies?types=E") as response:
+                galaxies = json.load(response)
+            assert galaxies == server.dataset.galaxies(["E"])
+
+            body = json.dumps({DB_STUDENT_ID_FIELD: 1, DB_GALNAME_FIELD: "new"}).encode()
+            request = Request(f"{hubble_api_url()}/submit-measurement",
+                              data=body, method="PUT")
+            with urlopen(request):
+                pass
+            with urlopen(f"{hubble_api_url()}/measurements/1") as response:
+                measurements = json.load(response)["measurements"]
+            assert len(measurements) == 6
+        finally:
+            assert use_local_api(previous) == server.url
+    assert cosmicds.utils.API_URL == previous
+    assert server.request_counts == {"galaxies": 1, "submit_measurement": 1,
+                                     "measurements": 1}
@@ -0,0 +1,27 @@
+import gc
+import weakref
+
+from hubbleds.attached import attached
+
+
+class Owner:
+    pass
+
+
+class Helper:
+
+    def __init__(self, owner):
+        self.owner = owner
+
+
+def test_attached():
+    owner = Owner()
+    helper = attached(owner, "_helper", Helper)
+    assert attached(owner, "_helper", Helper) is helper
+    assert helper.owner is owner
+
+    # The helper references its owner, but lives on it, so both are freed
+    refs = [weakref.ref(owner), weakref.ref(helper)]
+    del owner, helper
+    gc.collect()
+    assert all(ref() is None for ref in refs)
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import numpy as np
+from glue.core import Data, DataCollection
+
+from hubbleds.data_management import BEST_FIT_SUBSET_LABEL
+from hubbleds.story import HubblesLaw
+
+
+def update(story, data, values):
+    data.update_values_from_data(Data(x=np.array(values, dtype=float), label=data.label))
+    HubblesLaw._update_best_fit_subset(story, data, data.size - 1)
+    return story._best_fit_subset
+
+
+def test_follows_last_row():
+    data = Data(x=[1., 2., 3.], label="student")
+    DataCollection([data])
+    story = SimpleNamespace(_best_fit_subset=None, _best_fit_index=None)
+
+    subset = update(story, data, [1, 2, 3])
+    assert subset.label == BEST_FIT_SUBSET_LABEL
+    assert list(data.subsets) == [subset]
+    np.testing.assert_array_equal(subset.to_mask(), [False, False, True])
+
+    state = subset.subset_state
+    assert update(story, data, [1, 2, 4]) is subset
+    assert subset.subset_state is state
+
+    assert update(story, data, [1, 2, 3, 4]) is subset
+    np.testing.assert_array_equal(subset.to_mask(), [False, False, False, True])
+
+    assert update(story, data, [1, 2]) is subset
+    np.testing.assert_array_equal(subset.to_mask(), [False, True])
+    assert len(data.subsets) == 1
+
+
+def test_found_by_label():
+    data = Data(x=[1., 2.], label="student")
+    DataCollection([data])
+    existing = data.new_subset(label=BEST_FIT_SUBSET_LABEL)
+    story = SimpleNamespace(_best_fit_subset=None, _best_fit_index=None)
+    assert update(story, data, [1, 2]) is existing
+    np.testing.assert_array_equal(existing.to_mask(), [False, True])
+
+
+def test_empty_data():
+    data = Data(x=[1., 2.], label="student")
+    DataCollection([data])
+    story = SimpleNamespace(_best_fit_subset=None, _best_fit_index=None)
+    subset = update(story, data, [1, 2])
+    assert update(story, data, []) is subset
+    assert story._best_fit_index == -1
+    assert subset.to_mask().size == 0
+
+    assert update(story, data, [5]) is subset
+    np.testing.assert_array_equal(subset.to_mask(), [True])
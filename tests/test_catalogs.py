@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from hubbleds import catalogs
+from hubbleds.catalogs import catalog, csv_catalog, sdss_galaxies
+
+
+def test_loaded_once():
+    calls = []
+
+    def load():
+        calls.append(None)
+        return {"x": [1, 2, 3], "name": ["a", "b", "c"]}
+
+    columns = catalog("test_loaded_once", load)
+    assert catalog("test_loaded_once", load) is columns
+    assert len(calls) == 1
+    np.testing.assert_array_equal(columns["x"], [1, 2, 3])
+    with pytest.raises(ValueError):
+        columns["x"][0] = 0
+
+
+def test_csv_catalog(tmp_path):
+    path = tmp_path / "galaxies.csv"
+    path.write_text("name,velocity\na,100\nb,200\n")
+    columns = csv_catalog(path)
+    assert csv_catalog(path) is columns
+    np.testing.assert_array_equal(columns["velocity"], [100, 200])
+    assert not columns["velocity"].flags.writeable
+
+
+def test_sdss_galaxies_by_name_ext(monkeypatch):
+    requested = []
+
+    class Response:
+
+        def json(self):
+            return [{"name": "a.fits", "ra": 1.0}, {"name": "b.fits", "ra": 2.0}]
+
+    def get(url):
+        requested.append(url)
+        return Response()
+
+    monkeypatch.setattr(catalogs, "_catalogs", {})
+    monkeypatch.setattr(catalogs.requests, "get", get)
+    assert list(sdss_galaxies()["name"]) == ["a", "b"]
+    assert list(sdss_galaxies("")["name"]) == ["a.fits", "b.fits"]
+    assert sdss_galaxies() is sdss_galaxies(".fits")
+    assert len(requested) == 2
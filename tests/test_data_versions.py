@@ -0,0 +1,50 @@
+import numpy as np
+from glue.core import Data, DataCollection
+
+from hubbleds.viewers.data_versions import DataVersions
+
+
+def test_version_bumps():
+    data = Data(x=np.arange(10), label="d")
+    dc = DataCollection([data])
+    versions = DataVersions.for_data(data)
+    assert versions is DataVersions.for_hub(dc.hub)
+    assert versions.version(data) == 0
+
+    data.update_components({data.id['x']: np.arange(10) * 2})
+    after_update = versions.version(data)
+    assert after_update > 0
+
+    subset = data.new_subset(label="s")
+    subset.subset_state = data.id['x'] > 4
+    assert versions.version(data) > after_update
+
+    before_style = versions.version(data)
+    subset.style.color = "#ff0000"
+    assert versions.version(data) == before_style
+
+
+def test_untracked_data():
+    assert DataVersions.for_data(Data(x=[1, 2], label="d")) is None
+
+
+
+def test_statistics():
+    data = Data(x=np.array([-1., 2., np.nan, 5.]), label="d")
+    other = Data(y=[1, 2], label="o")
+    dc = DataCollection([data, other])
+    versions = DataVersions.for_hub(dc.hub)
+    x = data.id['x']
+    assert versions.statistics(data, x) == (-1, 5, 3)
+    assert versions.statistics(data, x, positive=True) == (2, 5, 2)
+    assert versions.statistics(other, x) == (None, None, 0)
+
+    subset = data.new_subset(label="s")
+    subset.subset_state = x < 3
+    assert versions.statistics(subset, x) == (-1, 2, 2)
+    subset.subset_state = x > 3
+    assert versions.statistics(subset, x) == (5, 5, 1)
+
+    data.update_components({x: np.array([0., 1., 2., 10.])})
+    assert versions.statistics(data, x) == (0, 10, 4)
+    assert versions.statistics(subset, x) == (10, 10, 1)
@@ -0,0 +1,56 @@
+import numpy as np
+from glue.core import Data, DataCollection
+from glue.viewers.histogram.state import HistogramLayerState, HistogramViewerState
+
+from hubbleds.viewers.dotplot_binning import LinkedDotPlotBinning
+
+
+def make_states():
+    data = Data(distance=np.array([100., 200., 400., 800.]),
+                angsize=np.array([80., 40., 20., 10.]), label="d")
+    dc = DataCollection([data])
+    states = []
+    for att in ('distance', 'distance', 'angsize'):
+        state = HistogramViewerState()
+        state.layers.append(HistogramLayerState(viewer_state=state, layer=data))
+        state.x_att = data.id[att]
+        state.hist_n_bin = 10
+        states.append(state)
+    binning = LinkedDotPlotBinning(states[0], 8000)
+    binning.link(states[1])
+    binning.link(states[2], reciprocal=True)
+    return dc, data, states, binning
+
+
+def test_limits_are_linked():
+    dc, data, states, binning = make_states()
+    states[0].x_min, states[0].x_max = 100, 400
+    assert (states[1].x_min, states[1].x_max) == (100, 400)
+    assert (states[2].x_min, states[2].x_max) == (20, 80)
+
+    states[2].x_max = 40
+    assert states[0].x_min == states[1].x_min == 200
+
+
+def test_histograms_are_shared():
+    dc, data, states, binning = make_states()
+    calls = []
+
+    def histogram(state):
+        layer_state = state.layers[0]
+
+        def compute():
+            calls.append(state)
+            layer_state.update_histogram()
+            return layer_state._histogram_cache[1]
+        return binning.histogram(layer_state, compute)
+
+    first = histogram(states[0])
+    assert histogram(states[1]) is first
+    histogram(states[2])
+    assert calls == [states[0], states[2]]
+
+    data.update_components({data.id['distance']: data['distance'] * 2})
+    states[0].layers[0].reset_cache()
+    histogram(states[1])
+    assert calls == [states[0], states[2], states[1]]
@@ -0,0 +1,99 @@
+from bqplot import Figure, Label, Lines
+from echo import CallbackProperty, HasCallbackProperties
+
+from hubbleds.viewers.hover_line import HoverLineViewerMixin
+
+
+class State(HasCallbackProperties):
+    x_min = CallbackProperty(0)
+    x_max = CallbackProperty(10)
+
+
+class BaseViewer:
+
+    def __init__(self):
+        self.state = State()
+        self.line = Lines(x=[0, 0], y=[0, 1], colors=['#ff0000'])
+        self.line_label = Label(text=[""], x=[0], y=[0])
+        self.figure = Figure(marks=[self.line, self.line_label])
+        self.callbacks = []
+        self.moves = []
+        self.clicks = []
+
+    @property
+    def figure_widget(self):
+        return self.figure
+
+    def add_event_callback(self, callback, events=None):
+        self.callbacks.append((callback, events))
+
+    def remove_event_callback(self, callback):
+        self.callbacks = [c for c in self.callbacks if c[0] != callback]
+
+    def _update_x_locations(self):
+        pass
+
+    def _label_text(self, x):
+        return f"{x:.0f}"
+
+    def _on_mouse_moved(self, event):
+        self.moves.append(event['domain']['x'])
+
+    def _on_click(self, event):
+        self.clicks.append(self.line.x[0])
+
+
+class Viewer(HoverLineViewerMixin, BaseViewer):
+    pass
+
+
+def test_overlay_follows_viewer():
+    viewer = Viewer()
+    overlay = viewer.figure_widget
+    assert overlay is viewer.hover_overlay
+    assert overlay.figure is viewer.figure
+    assert (overlay.x_min, overlay.x_max) == (0, 10)
+    assert overlay.color == '#ff0000'
+
+    viewer.state.x_min, viewer.state.x_max = 2, 8
+    assert (overlay.x_min, overlay.x_max) == (2, 8)
+    viewer.figure.fig_margin = {"top": 1, "bottom": 2, "left": 3, "right": 4}
+    assert overlay.margin == {"top": 1, "bottom": 2, "left": 3, "right": 4}
+
+    viewer.line.visible = False
+    viewer.line_label.visible = False
+    assert not overlay.visible
+    assert not overlay.show_label
+
+
+def test_client_mode():
+    viewer = Viewer()
+    viewer.hover_overlay
+    assert viewer.figure.marks == []
+    assert viewer.figure_marks([viewer.line, viewer.line_label]) == []
+
+    viewer.add_event_callback(viewer._on_mouse_moved, events=['mousemove'])
+    viewer.add_event_callback(viewer._on_click, events=['click'])
+    assert viewer.hover_overlay.enabled
+    assert viewer.callbacks == [(viewer._on_click, ['click'])]
+    viewer.remove_event_callback(viewer._on_mouse_moved)
+    assert not viewer.hover_overlay.enabled
+
+    viewer._on_click({'domain': {'x': 4.0}})
+    assert viewer.clicks == [4]
+    assert viewer.hover_overlay.value == 4
+    assert viewer.line_label.text == ["4"]
+
+
+def test_server_mode_is_throttled():
+    viewer = Viewer()
+    viewer.hover_mode = 'server'
+    assert viewer.figure_widget is viewer.figure
+    viewer.add_event_callback(viewer._on_mouse_moved, events=['mousemove'])
+    assert viewer.callbacks == [(viewer._on_mouse_moved, ['mousemove'])]
+
+    viewer.hover_throttle = 60
+    for x in range(5):
+        viewer._on_mouse_moved({'domain': {'x': x}})
+    assert viewer.moves == [0]
+    assert len(viewer.figure.marks) == 2
@@ -0,0 +1,127 @@
+import asyncio
+from threading import Thread
+
+from hubbleds.imagery_prefetch import ImageryLookahead, TileLoadTimings
+
+
+class Widget:
+
+    def __init__(self):
+        self.visits = []
+
+    def center_on_coordinates(self, coordinates, fov=None, instant=False):
+        self.visits.append((round(coordinates.ra.deg), round(coordinates.dec.deg)))
+
+
+def galaxy(name, ra):
+    return {"name": name, "ra": ra, "decl": 0}
+
+
+def test_timings_in_memory():
+    timings = TileLoadTimings(slow_seconds=5, max_samples=2)
+    assert timings.mean("a") is None
+    assert not timings.is_slow("a")
+
+    timings.record("a", 10)
+    assert timings.is_slow("a")
+    timings.record("a", 1)
+    timings.record("a", 3)
+    assert timings.mean("a") == 2
+    assert not timings.is_slow("a")
+
+
+def test_timings_persist_and_merge(tmp_path):
+    path = tmp_path / "timings" / "tile_timings.json"
+    first = TileLoadTimings(path)
+    second = TileLoadTimings(path)
+    first.record("a", 6)
+    second.record("b", 2)
+    first.record("b", 4)
+
+    # Each kernel's samples are kept, not just the last writer's
+    assert first.mean("b") == 3
+    assert TileLoadTimings(path).mean("a") == 6
+    assert TileLoadTimings(path).mean("b") == 3
+    assert sorted(p.name for p in path.parent.iterdir()) == ["tile_timings.json",
+                                                              "tile_timings.json.lock"]
+
+
+def test_concurrent_records(tmp_path):
+    path = tmp_path / "tile_timings.json"
+
+    def record(name):
+        timings = TileLoadTimings(path, max_samples=50)
+        for i in range(20):
+            timings.record(name, i)
+
+    threads = [Thread(target=record, args=(name,)) for name in "abcd"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    timings = TileLoadTimings(path)
+    assert all(len(timings._timings[name]) == 20 for name in "abcd")
+
+
+def test_unreadable_file(tmp_path):
+    path = tmp_path / "tile_timings.json"
+    path.write_text("{")
+    timings = TileLoadTimings(path)
+    assert timings.mean("a") is None
+    timings.record("a", 1)
+    assert TileLoadTimings(path).mean("a") == 1
+
+
+def test_slow_galaxies_warmed_last():
+    timings = TileLoadTimings()
+    timings.record("slow", 10)
+    timings.record("fast", 1)
+    lookahead = ImageryLookahead(Widget(), timings)
+    lookahead.warm([galaxy("slow", 1), galaxy("new", 2), galaxy("fast", 3)])
+    assert lookahead.queued == ["new", "fast", "slow"]
+    assert not lookahead.running
+
+    lookahead.warmed.add("new")
+    lookahead.warm([galaxy("slow", 1), galaxy("new", 2), galaxy("fast", 3)])
+    assert lookahead.queued == ["fast", "slow"]
+
+
+def test_visits_while_started():
+    widget = Widget()
+    lookahead = ImageryLookahead(widget, TileLoadTimings(), dwell=0.01)
+
+    async def run():
+        lookahead.warm([galaxy("a", 1), galaxy("b", 2), galaxy("c", 3)])
+        assert widget.visits == []
+
+        lookahead.start()
+        assert widget.visits == [(1, 0)]
+        assert lookahead.running
+        await asyncio.sleep(0.015)
+        assert widget.visits == [(1, 0), (2, 0)]
+        assert lookahead.stop()
+
+        # The rest of the queue waits for the next start
+        await asyncio.sleep(0.03)
+        assert lookahead.queued == ["c"]
+        lookahead.start()
+        while lookahead.running:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert widget.visits == [(1, 0), (2, 0), (3, 0)]
+    assert lookahead.warmed == {"a", "b", "c"}
+    assert lookahead.stop()
+
+    lookahead.start()
+    assert not lookahead.stop()
+
+
+def test_no_loop():
+    widget = Widget()
+    lookahead = ImageryLookahead(widget, TileLoadTimings())
+    lookahead.warm([galaxy("a", 1)])
+    lookahead.start()
+    assert widget.visits == [] and not lookahead.running
+    assert lookahead.queued == ["a"]
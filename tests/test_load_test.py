@@ -0,0 +1,82 @@
+import json
+from urllib.request import urlopen
+
+import numpy as np
+from glue.core import Data, DataCollection
+
+from hubbleds.data_management import *
+from hubbleds.testing import SyntheticDataset
+from hubbleds.testing.load_test import LoadTest, current_rss
+from hubbleds.utils import hubble_api_url
+
+
+class StageOne:
+
+    def __init__(self, story):
+        self.story = story
+        self.selected = []
+
+    def _on_galaxy_selected(self, galaxy):
+        self.selected.append(galaxy["name"])
+
+    def update_data_value(self, label, component, value, index):
+        self.story.updates.append((component, index))
+
+
+class Story:
+
+    def __init__(self, class_id):
+        self.classroom = {"id": class_id}
+        self.data_collection = DataCollection([Data(**{
+            MEASWAVE_COMPONENT: np.zeros(2), ANGULAR_SIZE_COMPONENT: np.zeros(2),
+            "label": STUDENT_MEASUREMENTS_LABEL})])
+        self.stage_instances = {1: StageOne(self)}
+        self.updates = []
+        self.spectra = []
+        self.class_data = []
+
+    def load_spectrum_data(self, name, gal_type):
+        self.spectra.append(name)
+
+    def fetch_class_data(self):
+        class_id = self.classroom["id"]
+        with urlopen(f"{hubble_api_url()}/stage-3-data/1/{class_id}") as response:
+            self.class_data.append(len(json.load(response)["measurements"]))
+
+
+def test_load_test():
+    dataset = SyntheticDataset(n_galaxies=20, n_classes=2, students_per_class=2,
+                               measurements_per_student=3, spectrum_points=100)
+    stories = []
+
+    def session_factory(student_id, class_id):
+        stories.append((student_id, Story(class_id)))
+        return None, stories[-1][1]
+
+    load_test = LoadTest(n_sessions=3, rounds=2, dataset=dataset,
+                         session_factory=session_factory)
+    report = load_test.run()
+
+    assert [(student_id, story.classroom["id"]) for student_id, story in stories] == \
+        [(5, 1), (6, 1), (7, 2)]
+    for _, story in stories:
+        stage = story.stage_instances[1]
+        assert len(stage.selected) == 2
+        assert all(not name.endswith(SPECTRUM_EXTENSION) for name in stage.selected)
+        assert story.spectra == stage.selected
+        assert story.updates == [(MEASWAVE_COMPONENT, 1), (ANGULAR_SIZE_COMPONENT, 1)] * 2
+        assert story.class_data[0] == 6
+    assert load_test.sessions == []
+
+    actions = report["actions"]
+    assert actions["create_session"]["count"] == 3
+    for action in ("select_galaxy", "measure_wavelength", "measure_angular_size",
+                   "fetch_class_data"):
+        assert actions[action]["count"] == 6
+        assert actions[action]["p50_ms"] <= actions[action]["p99_ms"]
+    assert report["api"]["requests"] == {"stage_3_data": 6}
+    assert len(report["rss_bytes"]["per_session_at_creation"]) == 3
+
+
+def test_current_rss():
+    assert current_rss() > 0
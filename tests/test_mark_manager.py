@@ -0,0 +1,61 @@
+import asyncio
+
+from hubbleds.mark_manager import FigureMarkManager
+
+
+class Figure:
+
+    def __init__(self, marks=()):
+        self.assignments = 0
+        self._marks = list(marks)
+
+    @property
+    def marks(self):
+        return self._marks
+
+    @marks.setter
+    def marks(self, marks):
+        self.assignments += 1
+        self._marks = list(marks)
+
+
+class Mark:
+    pass
+
+
+def test_applies_immediately_without_loop():
+    a, b = Mark(), Mark()
+    figure = Figure([a])
+    manager = FigureMarkManager.for_figure(figure)
+    assert FigureMarkManager.for_figure(figure) is manager
+
+    manager.add([b, a])
+    assert figure.marks == [a, b]
+    manager.bring_to_front(a)
+    assert figure.marks == [b, a]
+    manager.add(a)
+    assert figure.assignments == 2
+    assert manager.syncs_avoided == 0
+
+
+def test_batches_within_a_tick():
+    a, b, c = Mark(), Mark(), Mark()
+    figure = Figure([a])
+    manager = FigureMarkManager.for_figure(figure)
+
+    async def run():
+        manager.add(b)
+        manager.add(b)
+        manager.add(c)
+        manager.bring_to_front(a)
+        assert manager.marks == [b, c, a]
+        assert figure.marks == [a]
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert figure.marks == [b, c, a]
+    assert figure.assignments == 1
+    assert manager.syncs == 1
+    # The repeated add changed nothing, so it didn't avoid a sync
+    assert manager.syncs_avoided == 2
+
@@ -0,0 +1,108 @@
+import asyncio
+
+import numpy as np
+
+from hubbleds.components.spectrum_measurement_tutorial_sequence.selector_engine import \
+    SelectorEngine
+
+
+class ViewerState:
+
+    def __init__(self):
+        self.x_min, self.x_max = 0, 100
+        self.hist_x_min, self.hist_x_max, self.hist_n_bin = 0, 100, 10
+        self.bins_computed = 0
+
+    @property
+    def bins(self):
+        self.bins_computed += 1
+        return np.linspace(self.hist_x_min, self.hist_x_max, self.hist_n_bin + 1)
+
+
+class Viewer:
+
+    def __init__(self):
+        self.state = ViewerState()
+        self.lines = []
+
+    def place_hover_line(self, x):
+        self.lines.append(x)
+
+
+class SpectrumState:
+
+    def __init__(self):
+        self.x_min, self.x_max = 0, 200
+
+
+class SpectrumViewer(Viewer):
+
+    def __init__(self):
+        super().__init__()
+        self.state = SpectrumState()
+
+
+def make_engine():
+    dotplots = [Viewer(), Viewer()]
+    return SelectorEngine(dotplots, SpectrumViewer(), v2w=lambda v: v * 2, w2v=lambda w: w / 2)
+
+
+def test_bins_are_cached():
+    engine = make_engine()
+    viewer = engine.dotplots[0]
+    assert engine.bin_center(viewer, 25) == 25
+    assert engine.bin_center(viewer, 21) == 25
+    assert viewer.state.bins_computed == 1
+
+    viewer.state.hist_n_bin = 20
+    assert engine.bin_center(viewer, 26) == 27.5
+    assert viewer.state.bins_computed == 2
+
+
+def test_unbinned_viewer():
+    engine = make_engine()
+    assert engine.bins(engine.spectrum_viewer) is None
+    assert engine.bin_center(engine.spectrum_viewer, 33) == 33
+
+
+def test_move_without_loop():
+    engine = make_engine()
+    first, second = engine.dotplots
+
+    engine.move(engine.spectrum_viewer, 90)
+    assert first.lines == second.lines == [45]
+    assert engine.spectrum_viewer.lines == []
+
+    engine.move(first, 12)
+    assert first.lines == [45]
+    assert second.lines == [45, 12]
+    assert engine.spectrum_viewer.lines == [24]
+    assert engine.frames == 2
+
+
+def test_moves_are_coalesced():
+    engine = make_engine()
+
+    async def run():
+        for x in range(10, 30):
+            engine.move(engine.dotplots[0], x)
+        await asyncio.sleep(2 * engine.FRAME_TIME)
+
+    asyncio.run(run())
+    assert engine.moves == 20
+    assert engine.frames == 1
+    assert engine.dotplots[1].lines == [29]
+    assert engine.spectrum_viewer.lines == [58]
+
+
+def test_cancel():
+    engine = make_engine()
+
+    async def run():
+        engine.move(engine.dotplots[0], 10)
+        engine.cancel()
+        await asyncio.sleep(2 * engine.FRAME_TIME)
+
+    asyncio.run(run())
+    assert engine.frames == 0
+    assert engine.dotplots[1].lines == []
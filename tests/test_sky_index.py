@@ -0,0 +1,94 @@
+import numpy as np
+from astropy.table import Table
+from pywwt.layers import LayerManager
+
+from hubbleds.sky_index import SkyZoneIndex, angular_separation
+from hubbleds.wwt_layers import ViewportCatalogLayer
+
+
+class Widget:
+
+    def __init__(self):
+        self.layers = LayerManager(parent=self)
+
+    def _send_msg(self, **message):
+        pass
+
+
+def random_sky(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ra = rng.uniform(0, 360, n)
+    dec = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    return ra, dec
+
+
+def brute_force(ra, dec, centre_ra, centre_dec, radius):
+    return np.flatnonzero(angular_separation(ra, dec, centre_ra, centre_dec) <= radius)
+
+
+def test_query_matches_brute_force():
+    ra, dec = random_sky(5000)
+    index = SkyZoneIndex(ra, dec)
+    assert len(index) == 5000
+    cases = [
+        (120, 30, 5),
+        (0.5, -10, 3),       # wraps past RA 0
+        (359.5, 45, 2),      # wraps past RA 360
+        (-10, 0, 4),         # RA given outside [0, 360)
+        (30, 89, 3),         # over the north pole
+        (200, -88, 5),       # over the south pole
+        (10, 20, 0),
+        (10, 20, 200),
+    ]
+    for centre in cases:
+        np.testing.assert_array_equal(index.query(*centre), brute_force(ra, dec, *centre))
+
+
+def test_query_edges():
+    index = SkyZoneIndex([0, 359.9, 180, 10], [0, 0, 90, -90])
+    np.testing.assert_array_equal(index.query(0, 0, 0.2), [0, 1])
+    np.testing.assert_array_equal(index.query(45, 89.9, 0.2), [2])
+    np.testing.assert_array_equal(index.query(300, -89.9, 0.2), [3])
+    assert index.query(90, 0, 1).size == 0
+    assert SkyZoneIndex([], []).query(0, 0, 10).size == 0
+
+
+def test_viewport_layer():
+    ra, dec = random_sky(2000, seed=1)
+    table = Table({"ra": ra, "decl": dec, "mag": np.arange(2000.)})
+    widget = Widget()
+    layer = ViewportCatalogLayer(widget, table, rank_column="mag", max_sources=400,
+                                 color="#00FF00")
+
+    layer.update(0, 0, 10)
+    assert layer.queries == 0 and len(widget.layers) == 0
+
+    layer.show()
+    layer.update(0, 0, 10)
+    shown = np.concatenate([l.table["mag"] for l in widget.layers])
+    expected = brute_force(ra, dec, 0, 0, 10 * layer.VIEW_RADIUS * layer.padding)
+    np.testing.assert_array_equal(np.sort(shown), expected)
+    assert layer.queries == 1
+
+    # A small pan stays inside the searched region
+    layer.update(1, 1, 10)
+    assert layer.queries == 1
+
+    # Zooming out a little only sends the rows that come into view
+    layer.update(0, 0, 21)
+    assert len(widget.layers) == 2
+    shown = np.concatenate([l.table["mag"] for l in widget.layers])
+    expected = brute_force(ra, dec, 0, 0, 21 * layer.VIEW_RADIUS * layer.padding)
+    assert len(expected) <= 400
+    np.testing.assert_array_equal(np.sort(shown), expected)
+
+    # Zooming out past max_sources keeps the lowest ranked rows
+    layer.update(0, 0, 60)
+    shown = np.concatenate([l.table["mag"] for l in widget.layers])
+    expected = brute_force(ra, dec, 0, 0, 60 * layer.VIEW_RADIUS * layer.padding)
+    assert len(widget.layers) == 1
+    assert len(shown) == 400
+    np.testing.assert_array_equal(np.sort(shown), expected[:400])
+
+    layer.hide()
+    assert len(widget.layers) == 0
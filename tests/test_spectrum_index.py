@@ -0,0 +1,40 @@
+import numpy as np
+from glue.core import Data
+
+from hubbleds.spectrum_index import SpectrumRangeIndex, range_index_for
+
+
+def test_extrema():
+    x = np.arange(10.)
+    y = np.array([3, 1, 4, 1, 5, 9, 2, 6, 5, np.nan])
+    index = SpectrumRangeIndex(x, y)
+    assert index.extrema(0, 9) == (1, 9)
+    assert index.extrema(-5, 0) == (3, 3)
+    assert index.extrema(8, 20) == (5, 5)
+    assert index.extrema(5.5, 6.5) == (2, 2)
+    assert index.extrema(2, 4) == (1, 5)
+    for xmin, xmax in ((-5, -1), (20, 30), (1.2, 1.8), (3, 2)):
+        assert index.extrema(xmin, xmax) is None
+    assert index.extrema(9, 9) is None
+    assert SpectrumRangeIndex([], []).extrema(0, 1) is None
+
+
+def test_unsorted():
+    x = np.array([3., 0., 2., 1.])
+    y = np.array([30., 0., 20., 10.])
+    index = SpectrumRangeIndex(x, y)
+    np.testing.assert_array_equal(index.x, [0, 1, 2, 3])
+    np.testing.assert_array_equal(x[index.order], index.x)
+    assert index.extrema(0.5, 2.5) == (10, 20)
+    assert index.extrema(2.5, 3) == (30, 30)
+
+
+def test_kept_on_data():
+    data = Data(x=np.arange(5.), y=np.arange(5.) ** 2, label="d")
+    index = range_index_for(data, data.id['x'], data.id['y'])
+    assert range_index_for(data, data.id['x'], data.id['y']) is index
+    assert index.extrema(1, 3) == (1, 9)
+
+    data.update_components({data.id['y']: -np.arange(5.)})
+    index = range_index_for(data, data.id['x'], data.id['y'])
+    assert index.extrema(1, 3) == (-3, -1)
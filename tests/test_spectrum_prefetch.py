@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from hubbleds import spectrum_prefetch
+from hubbleds.spectrum_prefetch import SpectrumPrefetcher
+
+
+class Spectrum:
+
+    def __init__(self, label):
+        self.label = label
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """
+    The names and threads of the fetches made, and the names whose
+    background fetches fail
+    """
+    fetches = SimpleNamespace(made=[], failing=set())
+
+    def fetch_spectrum(name, filename, gal_type):
+        thread = threading.current_thread()
+        fetches.made.append((name, thread))
+        if name in fetches.failing and thread is not threading.main_thread():
+            raise OSError("Connection reset")
+        return Spectrum(name)
+
+    monkeypatch.setattr(spectrum_prefetch, "fetch_spectrum", fetch_spectrum)
+    return fetches
+
+
+def run_prefetches(prefetcher, requests):
+    calls = []
+
+    def callback(data):
+        calls.append((data.label, threading.current_thread()))
+
+    async def run():
+        for name in requests:
+            assert prefetcher.prefetch(name, f"{name}.fits", "Sp", callback=callback)
+        while any(prefetcher.pending(name) for name in requests):
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    return calls
+
+
+def test_deduplicated_and_delivered_on_main_thread(fetches):
+    delivered = []
+    prefetcher = SpectrumPrefetcher(delivered.append)
+    calls = run_prefetches(prefetcher, ["a", "a", "b"])
+
+    assert sorted(name for name, _ in fetches.made) == ["a", "b"]
+    assert all(thread is not threading.main_thread() for _, thread in fetches.made)
+    assert sorted(data.label for data in delivered) == ["a", "b"]
+    assert sorted(name for name, _ in calls) == ["a", "a", "b"]
+    assert all(thread is threading.main_thread() for _, thread in calls)
+
+
+def test_take_without_loop(fetches):
+    delivered = []
+    prefetcher = SpectrumPrefetcher(delivered.append)
+    assert not prefetcher.prefetch("a", "a.fits", "Sp")
+    assert prefetcher.pending("a")
+    data = prefetcher.take("a")
+    assert data.label == "a"
+    assert delivered == [data]
+    assert not prefetcher.pending("a")
+    assert prefetcher.take("a") is None
+
+
+def test_failed_fetch_is_retried(fetches):
+    fetches.failing.add("a")
+    delivered = []
+    prefetcher = SpectrumPrefetcher(delivered.append)
+    calls = run_prefetches(prefetcher, ["a"])
+
+    assert [thread is threading.main_thread() for _, thread in fetches.made] == [False, True]
+    assert [data.label for data in delivered] == ["a"]
+    assert [name for name, _ in calls] == ["a"]
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+import numpy as np
+from glue.core import Data, DataCollection
+
+from hubbleds.subset_modifier_listener import SubsetMessageRouter, SubsetModifierListener
+
+
+class CopyListener(SubsetModifierListener):
+
+    def _create_subset_state(self, subset):
+        return subset.subset_state.copy()
+
+
+def make_session():
+    data = Data(x=np.arange(10), label="source")
+    other = Data(x=np.arange(10), label="other")
+    modify = Data(x=np.arange(10), label="modify")
+    dc = DataCollection([data, other, modify])
+    state = SimpleNamespace(data_collection=dc)
+    return dc, state, data, other, modify
+
+
+def test_routes_only_to_matching_listeners():
+    dc, state, data, other, modify = make_session()
+    source = dc.new_subset_group(label="source")
+    unrelated = other.new_subset(label="unrelated")
+    listener = CopyListener(state, source, data, None, modify)
+    other_listener = CopyListener(state, unrelated, other, None, modify)
+
+    source.subset_state = data.id['x'] > 5
+    assert listener.message_count > 0
+    assert other_listener.message_count == 0
+    assert listener.modify_subset.subset_state.right == 5
+
+    listener.ignore()
+    count = listener.message_count
+    source.subset_state = data.id['x'] > 2
+    assert listener.message_count == count
+
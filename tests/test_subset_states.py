@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from glue.core import Data
+
+from hubbleds.subset_states import IdSetSubsetState
+
+
+@pytest.fixture
+def data():
+    return Data(x=np.array([0, 3, 5, 7, 100, -4]), label="d")
+
+
+@pytest.mark.parametrize("ids", [[3, 7], [100, -4, 5], []])
+def test_to_mask(data, ids):
+    """The mask matches numpy's isin, with and without the bitmap"""
+    state = IdSetSubsetState(ids, data.id['x'])
+    expected = np.isin(data['x'], ids)
+    np.testing.assert_array_equal(state.to_mask(data), expected)
+
+
+@pytest.mark.parametrize("ids", [
+    [],
+    [5],
+    [-3, 0, 1, 2, 1000, 2 ** 40, -2 ** 40],
+    list(range(0, 5000, 3)),
+])
+def test_encoded_ids_round_trip(ids):
+    state = IdSetSubsetState(ids, None)
+    decoded = IdSetSubsetState.decode_ids(state.encoded_ids())
+    np.testing.assert_array_equal(decoded, state.ids)
+
+
+def test_encoded_ids_compact():
+    """Dense ids take about a byte each, before base64"""
+    ids = np.arange(10000) * 3
+    state = IdSetSubsetState(ids, None)
+    assert len(state.encoded_ids()) < 1.4 * ids.size
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from hubbleds.template_bundle import PACKAGE_DIR, TemplateBundle, build_bundle
+
+
+def make_package(tmp_path):
+    package = tmp_path / "package"
+    (package / "components").mkdir(parents=True)
+    (package / "a.vue").write_text("<template>a</template>")
+    (package / "components" / "b.vue").write_text("<template>b</template>")
+    return package
+
+
+def test_round_trip(tmp_path):
+    package = make_package(tmp_path)
+    fingerprint = build_bundle(package)
+    bundle = TemplateBundle(package / "templates.bundle")
+    assert bundle.fingerprint == fingerprint
+    assert sorted(bundle) == ["a.vue", "components/b.vue"]
+    assert bundle.read("components/b.vue") == "<template>b</template>"
+    bundle.close()
+
+
+def test_verify(tmp_path):
+    package = make_package(tmp_path)
+    build_bundle(package)
+    path = package / "templates.bundle"
+    content = path.read_bytes()
+    path.write_bytes(content[:-3] + b"xyz")
+
+    # Without verification only the header is read
+    TemplateBundle(path).close()
+    with pytest.raises(ValueError):
+        TemplateBundle(path, verify=True)
+
+
+def test_edited_templates_are_stale(tmp_path):
+    package = make_package(tmp_path)
+    build_bundle(package)
+    bundle = TemplateBundle(package / "templates.bundle")
+    template = package / "a.vue"
+    assert bundle.is_current("a.vue", template)
+
+    # An edit that keeps the length still makes the bundled copy stale
+    template.write_text("<template>c</template>")
+    later = bundle.mtime_ns + 1_000_000_000
+    os.utime(template, ns=(later, later))
+    assert not bundle.is_current("a.vue", template)
+
+    template.unlink()
+    assert bundle.is_current("a.vue", template)
+    bundle.close()
+
+
+def test_package_loads_templates_from_bundle():
+    # Templates loaded with cosmicds' load_template never come from the bundle
+    modules = [path.relative_to(PACKAGE_DIR) for path in PACKAGE_DIR.rglob("*.py")
+               if "cosmicds.utils import load_template" in path.read_text()]
+    assert modules == []
@@ -0,0 +1,72 @@
+from contextlib import contextmanager
+
+from echo import CallbackProperty
+from glue.core.state_objects import State
+
+from hubbleds.theme import ThemeService
+
+
+class Widget:
+
+    def __init__(self):
+        self.syncs = 0
+
+    @contextmanager
+    def hold_sync(self):
+        yield
+        self.syncs += 1
+
+
+class LayerArtist:
+
+    def __init__(self):
+        self.scatter = Widget()
+        self.state = State()
+
+
+class Figure(Widget):
+
+    def __init__(self):
+        super().__init__()
+        self.axes = [Widget(), Widget()]
+
+
+class Viewer:
+
+    def __init__(self):
+        self.figure = Figure()
+        self.layers = [LayerArtist()]
+
+
+class AppState(State):
+    dark_mode = CallbackProperty(True)
+
+
+def test_restyles_on_dark_mode():
+    app_state = AppState()
+    service = ThemeService.for_app_state(app_state)
+    assert ThemeService.for_app_state(app_state) is service
+
+    viewer = Viewer()
+    service.style_viewers([viewer], ["scatter"], True)
+    dark_background = viewer.figure.background_style
+    assert viewer.figure.syncs == 1
+
+    app_state.dark_mode = False
+    assert viewer.figure.background_style != dark_background
+    assert viewer.figure.syncs == 2
+    assert viewer.layers[0].scatter.syncs == 2
+
+
+def test_explicit_calls_style_new_layers():
+    app_state = AppState(dark_mode=False)
+    service = ThemeService.for_app_state(app_state)
+    viewer = Viewer()
+    service.style_viewers([viewer], ["scatter"], False)
+
+    viewer.layers.append(LayerArtist())
+    service.style_viewers([viewer], ["scatter"], False)
+    first, second = viewer.layers
+    assert second.scatter.syncs == 1
+    assert second.scatter.enable_hover
+
@@ -0,0 +1,56 @@
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from hubbleds import warm_start
+from hubbleds.warm_start import ForkServer, connect
+
+
+class ExitServer(ForkServer):
+    """Forks a process that exits with the requested status, rather than a kernel"""
+
+    POLL_INTERVAL = 0.05
+
+    def _run_kernel(self, request, client):
+        os._exit(int(request["env"]["HUBBLEDS_TEST_STATUS"]))
+
+
+@pytest.fixture
+def server(tmp_path):
+    handlers = {signum: signal.getsignal(signum)
+                for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP)}
+    server = ExitServer(tmp_path / "warm.sock")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    while not server._running:
+        time.sleep(0.01)
+    yield server
+    server.stop()
+    thread.join()
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
+
+
+def test_kernel_status(server, tmp_path, monkeypatch):
+    monkeypatch.setenv("HUBBLEDS_TEST_STATUS", "3")
+    assert connect(tmp_path / "kernel.json", server.socket_path) == 3
+    monkeypatch.setenv("HUBBLEDS_TEST_STATUS", "0")
+    assert connect(tmp_path / "kernel.json", server.socket_path) == 0
+
+
+def test_fork_failure(server, tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("HUBBLEDS_TEST_STATUS", "0")
+    fork = os.fork
+
+    def fail():
+        raise OSError("Resource temporarily unavailable")
+    monkeypatch.setattr(warm_start.os, "fork", fail)
+    assert connect(tmp_path / "kernel.json", server.socket_path) == 1
+    assert "Resource temporarily unavailable" in capsys.readouterr().err
+
+    # The server keeps serving other clients
+    monkeypatch.setattr(warm_start.os, "fork", fork)
+    assert connect(tmp_path / "kernel.json", server.socket_path) == 0
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from astropy.table import Table, vstack
+from pandas import DataFrame
+from pywwt.layers import LayerManager
+
+from hubbleds.wwt_layers import ColumnarBuffer, IncrementalTableLayer
+
+
+class Widget:
+    """The parts of a WWT widget that its layer manager uses"""
+
+    def __init__(self):
+        self.messages = []
+        self.layers = LayerManager(parent=self)
+
+    def _send_msg(self, **message):
+        self.messages.append(message)
+
+    def events(self, event):
+        return [m for m in self.messages if m["event"] == event]
+
+
+def test_buffer_append_and_grow():
+    buffer = ColumnarBuffer(capacity=2)
+    buffer.append({"name": "a", "ra": 1})
+    buffer.append({"name": "b", "ra": 2})
+    assert buffer.capacity == 2
+    buffer.append({"name": "c", "ra": 2.5, "z": 0.1})
+    assert (len(buffer), buffer.capacity, buffer.version) == (3, 4, 3)
+
+    np.testing.assert_array_equal(buffer.column("ra"), [1, 2, 2.5])
+    assert buffer.column("ra").dtype.kind == 'f'
+    assert list(buffer.column("name")) == ["a", "b", "c"]
+    np.testing.assert_array_equal(buffer.column("z"), [np.nan, np.nan, 0.1])
+    with pytest.raises(ValueError):
+        buffer.column("ra")[0] = 0
+
+    buffer.append({"name": "d"})
+    assert np.isnan(buffer.column("ra")[3])
+    assert buffer.index_of("name", "c") == 2
+    assert buffer.index_of("name", "e") is None
+
+    buffer.remove(1)
+    assert list(buffer.column("name")) == ["a", "c", "d"]
+    with pytest.raises(IndexError):
+        buffer.remove(3)
+    assert buffer.row(1) == {"name": "c", "ra": 2.5, "z": 0.1}
+    buffer.append({"name": "e", "count": 3})
+    assert list(buffer.column("count")) == [None, None, None, 3]
+
+    table = buffer.to_table(start=1, stop=3)
+    assert list(table["name"]) == ["c", "d"]
+    assert table["name"].dtype.kind == 'U'
+
+
+def test_buffer_from_dataframe():
+    df = DataFrame({"name": ["a", "b"], "ra": [1.0, 2.0]})
+    buffer = ColumnarBuffer.from_dataframe(df, capacity=1)
+    assert (len(buffer), buffer.capacity) == (2, 2)
+    buffer.append({"name": "c", "ra": 3.0})
+    assert buffer.to_dataframe().equals(DataFrame({"name": ["a", "b", "c"],
+                                                   "ra": [1.0, 2.0, 3.0]}))
+
+
+def test_append_sends_only_new_rows():
+    widget = Widget()
+    layer = IncrementalTableLayer(widget, max_layers=2, color="#FF0000")
+    rows = [Table({"ra": [float(i)], "decl": [0.0]}) for i in range(4)]
+
+    layer.append(rows[0])
+    layer.append(rows[1])
+    assert len(widget.events("table_layer_create")) == 2
+    assert [len(l.table) for l in widget.layers] == [1, 1]
+    assert all(l.color == "#ff0000" for l in widget.layers)
+    assert (layer.rows, layer.rows_sent) == (2, 2)
+
+    # Past max_layers, the layers are merged into one
+    layer.append(rows[2])
+    assert len(widget.layers) == 1
+    assert list(widget.layers[0].table["ra"]) == [0, 1, 2]
+    assert len(widget.events("table_layer_remove")) == 1
+    assert len(widget.events("table_layer_update")) == 1
+
+    layer.append(rows[3])
+    assert sum(len(l.table) for l in widget.layers) == layer.rows == 4
+
+    layer.replace(vstack(rows[:2]))
+    assert [len(l.table) for l in widget.layers] == [2]
+    layer.replace(rows[0][:0])
+    assert len(widget.layers) == 0
+    assert layer.rows == 0